@@ -0,0 +1,165 @@
+import gzip
+import json
+import os
+import threading
+from typing import Callable
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from ..services.table_versions import current_version
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback: same output, several times slower
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# bodies smaller than this go out uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("RETAILFLOW_COMPRESS_MIN_BYTES", "1024"))
+# encoded list bodies above this size are rebuilt per request instead of cached
+BODY_CACHE_MAX_BYTES = int(os.getenv("RETAILFLOW_BODY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# all cached bodies together; the least recently used go first past this
+BODY_CACHE_TOTAL_BYTES = int(os.getenv("RETAILFLOW_BODY_CACHE_TOTAL_BYTES", str(64 * 1024 * 1024)))
+
+# Fast path for large list endpoints: the route selects plain columns (shaped
+# and defaulted in SQL to match the response model) and returns the encoded
+# body directly. Returning a Response makes FastAPI skip response_model
+# validation, which is safe here because every value comes straight from
+# typed DB columns; response_model stays on the route for the OpenAPI schema.
+
+
+def row_dicts(result) -> list[dict]:
+    """Result rows -> dicts keyed by the selected column labels."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def _default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def loads(data):
+    """Parse one JSON document (bytes or str); raises ValueError when malformed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_response(rows: list[dict]) -> Response:
+    return Response(content=dumps(rows), media_type="application/json")
+
+
+# ---------- versioned master-data lists (ETag + compression) ----------
+
+# (table, requested encoding) -> (version, body, applied encoding); one entry
+# per key, replaced when the table version moves. Kept in least recently used
+# order and held to BODY_CACHE_TOTAL_BYTES.
+_bodies: dict[tuple[str, str], tuple[int, bytes, str]] = {}
+_bodies_bytes = 0
+_bodies_lock = threading.Lock()
+
+
+def _cached_body(key: tuple[str, str], version: int) -> tuple[bytes, str] | None:
+    with _bodies_lock:
+        hit = _bodies.get(key)
+        if hit is None or hit[0] != version:
+            return None
+        _bodies[key] = _bodies.pop(key)  # most recently used last
+    return hit[1], hit[2]
+
+
+def _cache_body(key: tuple[str, str], version: int, body: bytes, encoding: str) -> None:
+    global _bodies_bytes
+    if len(body) > min(BODY_CACHE_MAX_BYTES, BODY_CACHE_TOTAL_BYTES):
+        return
+    with _bodies_lock:
+        old = _bodies.pop(key, None)
+        if old is not None:
+            _bodies_bytes -= len(old[1])
+        _bodies[key] = (version, body, encoding)
+        _bodies_bytes += len(body)
+        while _bodies_bytes > BODY_CACHE_TOTAL_BYTES:
+            evicted = _bodies.pop(next(iter(_bodies)))
+            _bodies_bytes -= len(evicted[1])
+
+
+def _accepted_encoding(request: Request) -> str:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def _compress(raw: bytes, encoding: str) -> tuple[bytes, str]:
+    if encoding == "identity" or len(raw) < COMPRESS_MIN_BYTES:
+        return raw, "identity"
+    if encoding == "br":
+        return brotli.compress(raw, quality=5), "br"
+    return gzip.compress(raw, compresslevel=6), "gzip"
+
+
+def _etag(table: str, version: int, encoding: str) -> str:
+    # strong validator per representation: the encoding is part of the tag
+    return f'"{table}-{version}"' if encoding == "identity" else f'"{table}-{version}+{encoding}"'
+
+
+def _fresh_tag(if_none_match: str | None, table: str, version: int) -> str | None:
+    """The client's tag for any representation of the current version, if it sent one."""
+    if not if_none_match:
+        return None
+    current = f"{table}-{version}"
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return _etag(table, version, "identity")
+        if tag.removeprefix("W/").strip('"').split("+", 1)[0] == current:
+            return tag.removeprefix("W/")
+    return None
+
+
+def versioned_json(
+    request: Request, db: Session, table: str, load: Callable[[], list[dict]]
+) -> Response:
+    """
+    JSON list of a versioned master table. A client holding the current ETag
+    gets a 304 after a single table_versions lookup; otherwise the body is
+    served from the per-version cache or built by `load()` and compressed.
+    """
+    version = current_version(db, table)
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+    fresh = _fresh_tag(request.headers.get("if-none-match"), table, version)
+    if fresh:
+        return Response(status_code=304, headers={**headers, "ETag": fresh})
+
+    encoding = _accepted_encoding(request)
+    hit = _cached_body((table, encoding), version)
+    if hit is not None:
+        body, applied = hit
+    else:
+        body, applied = _compress(dumps(load()), encoding)
+        _cache_body((table, encoding), version, body, applied)
+
+    headers["ETag"] = _etag(table, version, applied)
+    if applied != "identity":
+        headers["Content-Encoding"] = applied
+    return Response(content=body, media_type="application/json", headers=headers)
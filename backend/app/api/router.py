@@ -8,6 +8,11 @@ from .routes.purchase_orders import router as po_router
 from .routes.grn import router as grn_router
 from .routes.inventory import router as inventory_router  # ✅ NEW
 from .routes.sales import router as sales_router  # ✅ NEW
+from .routes.metrics import router as metrics_router
+from .routes.pricing import router as pricing_router
+from .routes.reports import router as reports_router
+from .routes.replenishment import router as replenishment_router
+from .routes.exports import router as exports_router
 
 api_router = APIRouter(prefix="/api")
 
@@ -19,3 +24,8 @@ api_router.include_router(po_router)
 api_router.include_router(grn_router)
 api_router.include_router(inventory_router)  # ✅ NEW
 api_router.include_router(sales_router)  # ✅ NEW
+api_router.include_router(metrics_router)
+api_router.include_router(pricing_router)
+api_router.include_router(reports_router)
+api_router.include_router(replenishment_router)
+api_router.include_router(exports_router)
@@ -0,0 +1,286 @@
+import csv
+import io
+import os
+import zlib
+from datetime import date
+from typing import Callable, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+
+from ...db import SessionLocal
+from ...models import (
+    GRN, GRNLine, HSNMaster, InventoryStock, ItemMaster, PurchaseOrder, PurchaseOrderLine, Sale,
+    SaleLine, VendorMaster,
+)
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+# Every export streams off a server-side cursor, EXPORT_CHUNK_SIZE rows per
+# fetch, and each chunk is written out (and gzipped, with `gzip=true`) before
+# the next is read, so memory stays flat whatever the row count.
+EXPORT_CHUNK_SIZE = int(os.getenv("RETAILFLOW_EXPORT_CHUNK_SIZE", "5000"))
+
+# unit quantity code on the GSTR-1 HSN summary; every SKU is sold by the piece
+GSTR1_UQC = "NOS"
+
+
+def _stream_csv(stmt, header: list[str], to_row: Optional[Callable], gzip: bool):
+    # Own session: the request-scoped one may be closed before the body is sent.
+    packer = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    buf = io.StringIO()
+    out = csv.writer(buf)
+
+    def emit() -> bytes:
+        data = buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+        return packer.compress(data) if packer else data
+
+    out.writerow(header)
+    yield emit()
+    with SessionLocal() as db:
+        result = db.connection().execute(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        for rows in result.partitions():
+            out.writerows(map(to_row, rows) if to_row else rows)
+            chunk = emit()
+            if chunk:
+                yield chunk
+    if packer:
+        yield packer.flush()
+
+
+def _csv_response(
+    stmt, header: list[str], name: str, gzip: bool,
+    date_from: Optional[date] = None, date_to: Optional[date] = None, to_row: Optional[Callable] = None,
+) -> StreamingResponse:
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+    span = "_".join(d.isoformat() for d in (date_from, date_to) if d)
+    filename = f"{name}{'_' + span if span else ''}.csv{'.gz' if gzip else ''}"
+    return StreamingResponse(
+        _stream_csv(stmt, header, to_row, gzip),
+        media_type="application/gzip" if gzip else "text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _in_range(stmt, column, date_from: Optional[date], date_to: Optional[date]):
+    if date_from:
+        stmt = stmt.where(column >= date_from)
+    if date_to:
+        stmt = stmt.where(column <= date_to)
+    return stmt
+
+
+@router.get("/inventory.csv")
+def export_inventory(
+    brand: Optional[str] = None,
+    category: Optional[str] = None,
+    gzip: bool = False,
+):
+    """Every SKU with its HSN code, threshold and current stock."""
+    stmt = (
+        select(
+            ItemMaster.sku_code,
+            ItemMaster.brand,
+            ItemMaster.category,
+            ItemMaster.style,
+            ItemMaster.color,
+            ItemMaster.size,
+            ItemMaster.hsn_code,
+            func.coalesce(ItemMaster.min_stock_level, 0),
+            func.coalesce(InventoryStock.available_qty, 0),
+        )
+        .outerjoin(InventoryStock, InventoryStock.sku_code == ItemMaster.sku_code)
+        .order_by(ItemMaster.sku_code)
+    )
+    if brand:
+        stmt = stmt.where(ItemMaster.brand == brand)
+    if category:
+        stmt = stmt.where(ItemMaster.category == category)
+    header = [
+        "sku_code", "brand", "category", "style", "color", "size", "hsn_code",
+        "min_stock_level", "available_qty",
+    ]
+    return _csv_response(stmt, header, "inventory", gzip)
+
+
+SALE_LINE_HEADER = [
+    "bill_number", "sale_date", "store_code", "customer_name", "sku_code", "hsn_code",
+    "qty", "rate", "cgst_rate", "sgst_rate", "igst_rate",
+    "line_subtotal", "line_tax", "line_total",
+]
+
+
+def _sale_lines_query(date_from: Optional[date], date_to: Optional[date], store_code: Optional[str]):
+    stmt = (
+        select(
+            Sale.bill_number,
+            Sale.sale_date,
+            Sale.store_code,
+            Sale.customer_name,
+            SaleLine.sku_code,
+            SaleLine.hsn_code,
+            SaleLine.qty,
+            SaleLine.rate,
+            SaleLine.cgst_rate,
+            SaleLine.sgst_rate,
+            SaleLine.igst_rate,
+            SaleLine.line_subtotal,
+            SaleLine.line_tax,
+            SaleLine.line_total,
+        )
+        .join(SaleLine, SaleLine.sale_id == Sale.id)
+        .order_by(Sale.sale_date, Sale.id, SaleLine.id)
+    )
+    stmt = _in_range(stmt, Sale.sale_date, date_from, date_to)
+    if store_code is not None:
+        stmt = stmt.where(Sale.store_code == store_code)
+    return stmt
+
+
+@router.get("/sale-lines.csv")
+def export_sale_lines(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    store_code: Optional[str] = None,
+    gzip: bool = False,
+):
+    """One row per sale line with its bill's number, date and store, in bill order."""
+    stmt = _sale_lines_query(date_from, date_to, store_code)
+    return _csv_response(stmt, SALE_LINE_HEADER, "sale-lines", gzip, date_from, date_to)
+
+
+@router.get("/po-lines.csv")
+def export_po_lines(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    vendor_id: Optional[int] = None,
+    status: Optional[str] = None,
+    gzip: bool = False,
+):
+    """One row per PO line with its PO header, vendor and receipt counters; by PO date."""
+    stmt = (
+        select(
+            PurchaseOrder.po_number,
+            PurchaseOrder.po_date,
+            PurchaseOrder.status,
+            PurchaseOrder.tax_mode,
+            VendorMaster.vendor_code,
+            VendorMaster.vendor_name,
+            PurchaseOrderLine.sku_code,
+            PurchaseOrderLine.hsn_code,
+            PurchaseOrderLine.qty,
+            PurchaseOrderLine.received_qty,
+            PurchaseOrderLine.accepted_qty,
+            PurchaseOrderLine.rate,
+            PurchaseOrderLine.cgst_rate,
+            PurchaseOrderLine.sgst_rate,
+            PurchaseOrderLine.igst_rate,
+            PurchaseOrderLine.line_subtotal,
+            PurchaseOrderLine.cgst_amount,
+            PurchaseOrderLine.sgst_amount,
+            PurchaseOrderLine.igst_amount,
+            PurchaseOrderLine.line_total,
+        )
+        .join(PurchaseOrderLine, PurchaseOrderLine.po_id == PurchaseOrder.id)
+        .outerjoin(VendorMaster, VendorMaster.id == PurchaseOrder.vendor_id)
+        .order_by(PurchaseOrder.po_date, PurchaseOrder.id, PurchaseOrderLine.id)
+    )
+    stmt = _in_range(stmt, PurchaseOrder.po_date, date_from, date_to)
+    if vendor_id is not None:
+        stmt = stmt.where(PurchaseOrder.vendor_id == vendor_id)
+    if status:
+        stmt = stmt.where(PurchaseOrder.status == status)
+    header = [
+        "po_number", "po_date", "status", "tax_mode", "vendor_code", "vendor_name",
+        "sku_code", "hsn_code", "qty", "received_qty", "accepted_qty", "rate",
+        "cgst_rate", "sgst_rate", "igst_rate",
+        "line_subtotal", "cgst_amount", "sgst_amount", "igst_amount", "line_total",
+    ]
+    return _csv_response(stmt, header, "po-lines", gzip, date_from, date_to)
+
+
+@router.get("/grn-lines.csv")
+def export_grn_lines(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    gzip: bool = False,
+):
+    """One row per GRN line with the GRN, its PO and vendor; by received date."""
+    stmt = (
+        select(
+            GRN.grn_number,
+            GRN.received_date,
+            PurchaseOrder.po_number,
+            VendorMaster.vendor_code,
+            GRNLine.sku_code,
+            GRNLine.received_qty,
+            GRNLine.accepted_qty,
+            GRNLine.rejected_qty,
+        )
+        .join(GRNLine, GRNLine.grn_id == GRN.id)
+        .outerjoin(PurchaseOrder, PurchaseOrder.id == GRN.po_id)
+        .outerjoin(VendorMaster, VendorMaster.id == PurchaseOrder.vendor_id)
+        .order_by(GRN.received_date, GRN.id, GRNLine.id)
+    )
+    stmt = _in_range(stmt, GRN.received_date, date_from, date_to)
+    header = [
+        "grn_number", "received_date", "po_number", "vendor_code", "sku_code",
+        "received_qty", "accepted_qty", "rejected_qty",
+    ]
+    return _csv_response(stmt, header, "grn-lines", gzip, date_from, date_to)
+
+
+def _gstr1_row(r) -> tuple:
+    # lines are grouped by rate, so each group's tax splits by its rates;
+    # SGST takes the rounding remainder so the three add up to the tax charged
+    rate = (r.cgst_rate or 0) + (r.sgst_rate or 0) + (r.igst_rate or 0)
+    tax = r.tax or 0
+    igst = round(tax * (r.igst_rate or 0) / rate, 2) if rate else 0.0
+    cgst = round(tax * (r.cgst_rate or 0) / rate, 2) if rate else 0.0
+    sgst = round(tax - igst - cgst, 2) if rate else 0.0
+    return (
+        r.hsn_code or "", r.description or "", GSTR1_UQC, r.qty or 0,
+        round(r.total or 0, 2), rate, round(r.taxable or 0, 2), igst, cgst, sgst, 0.0,
+    )
+
+
+@router.get("/gstr1-hsn.csv")
+def export_gstr1_hsn(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    gzip: bool = False,
+):
+    """
+    GSTR-1 HSN-wise summary of outward supplies (table 12): sale lines in
+    the date range grouped by HSN code and tax rate.
+    """
+    stmt = (
+        select(
+            SaleLine.hsn_code,
+            HSNMaster.description,
+            SaleLine.cgst_rate,
+            SaleLine.sgst_rate,
+            SaleLine.igst_rate,
+            func.sum(SaleLine.qty).label("qty"),
+            func.sum(SaleLine.line_total).label("total"),
+            func.sum(SaleLine.line_subtotal).label("taxable"),
+            func.sum(SaleLine.line_tax).label("tax"),
+        )
+        .join(Sale, Sale.id == SaleLine.sale_id)
+        .outerjoin(HSNMaster, HSNMaster.hsn_code == SaleLine.hsn_code)
+        .group_by(
+            SaleLine.hsn_code, HSNMaster.description,
+            SaleLine.cgst_rate, SaleLine.sgst_rate, SaleLine.igst_rate,
+        )
+        .order_by(SaleLine.hsn_code, SaleLine.cgst_rate, SaleLine.igst_rate)
+    )
+    stmt = _in_range(stmt, Sale.sale_date, date_from, date_to)
+    header = [
+        "HSN", "Description", "UQC", "Total Quantity", "Total Value", "Rate", "Taxable Value",
+        "Integrated Tax Amount", "Central Tax Amount", "State/UT Tax Amount", "Cess Amount",
+    ]
+    return _csv_response(stmt, header, "gstr1-hsn", gzip, date_from, date_to, to_row=_gstr1_row)
@@ -1,17 +1,25 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 
 from ...db import get_db
-from ...models import GRN, GRNLine, PurchaseOrder, InventoryStock
+from ...models import GRN, GRNLine, PurchaseOrder
 from ...schemas import GRNCreate, GRNOut
+from ...services.low_stock import refresh_low_stock
+from ...services.po_receipts import OPEN, OverReceipt, allocate, apply_receipt, line_index
+from ...services.sequences import next_number
+from ...services.stock import add_stock
+from ...services.stock_ledger import GRN_IN, document_movements, record_movements
+from ..fast_json import json_response, row_dicts
 
 router = APIRouter(prefix="/grn", tags=["GRN"])
 
 
 def _generate_grn_number(db: Session) -> str:
-    last = db.query(GRN).order_by(GRN.id.desc()).first()
-    next_id = 1 if not last else last.id + 1
-    return f"GRN{next_id:04d}"
+    return f"GRN{next_number(db, 'GRN'):04d}"
 
 
 @router.post("", response_model=GRNOut)
@@ -19,6 +27,8 @@ def create_grn(payload: GRNCreate, db: Session = Depends(get_db)):
     po = db.query(PurchaseOrder).filter(PurchaseOrder.id == payload.po_id).first()
     if not po:
         raise HTTPException(status_code=404, detail="PO not found")
+    if po.status != OPEN:
+        raise HTTPException(status_code=400, detail=f"PO is {po.status}; only OPEN POs can be received")
 
     if not payload.lines:
         raise HTTPException(status_code=400, detail="GRN must have at least one line")
@@ -30,58 +40,104 @@ def create_grn(payload: GRNCreate, db: Session = Depends(get_db)):
         remarks=payload.remarks,
     )
 
-    # Track accepted qty per SKU for stock update
+    # Track received / accepted qty per SKU for the PO counters and stock update
+    received_by_sku: dict[str, float] = {}
     accepted_by_sku: dict[str, float] = {}
+    line_rows = []
 
     for ln in payload.lines:
         if ln.received_qty <= 0:
             continue
-
-        grn.lines.append(
-            GRNLine(
-                sku_code=ln.sku_code,
-                received_qty=ln.received_qty,
-                accepted_qty=ln.accepted_qty,
-                rejected_qty=ln.rejected_qty,
+        if (ln.accepted_qty or 0) > ln.received_qty:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Accepted qty exceeds received qty for {ln.sku_code}",
             )
+
+        line_rows.append(
+            {
+                "sku_code": ln.sku_code,
+                "received_qty": ln.received_qty,
+                "accepted_qty": ln.accepted_qty,
+                "rejected_qty": ln.rejected_qty,
+            }
         )
 
+        received_by_sku[ln.sku_code] = received_by_sku.get(ln.sku_code, 0) + ln.received_qty
         if ln.accepted_qty and ln.accepted_qty > 0:
             accepted_by_sku[ln.sku_code] = (
                 accepted_by_sku.get(ln.sku_code, 0) + ln.accepted_qty
             )
 
-    if not grn.lines:
+    if not line_rows:
         raise HTTPException(status_code=400, detail="No valid GRN lines")
 
+    # checked against the PO's lines (one query, indexed by SKU) before any write
+    try:
+        allocations = allocate(line_index(db, po.id), received_by_sku, accepted_by_sku)
+    except OverReceipt as e:
+        raise HTTPException(status_code=400, detail=e.detail())
+
+    # GRN header/lines and the stock it moves commit together, or not at all
     db.add(grn)
+    db.flush()
+    # lines go in as one executemany rather than one ORM object per line
+    db.execute(insert(GRNLine), [{"grn_id": grn.id, **r} for r in line_rows])
+    try:
+        apply_receipt(db, po.id, allocations)
+    except OverReceipt as e:
+        raise HTTPException(status_code=409, detail=e.detail())
+    add_stock(db, accepted_by_sku)
+    record_movements(db, document_movements(grn.received_date, GRN_IN, grn.id, accepted_by_sku))
+    refresh_low_stock(db, accepted_by_sku.keys())
     db.commit()
     db.refresh(grn)
 
-    # ===================== STOCK UPDATE =====================
-    for sku, qty in accepted_by_sku.items():
-        stock = (
-            db.query(InventoryStock)
-            .filter(InventoryStock.sku_code == sku)
-            .first()
-        )
-
-        if stock:
-            stock.available_qty += qty
-        else:
-            db.add(
-                InventoryStock(
-                    sku_code=sku,
-                    available_qty=qty,
-                )
-            )
-
-    db.commit()
-    # ========================================================
-
     return grn
 
 
 @router.get("", response_model=list[GRNOut])
-def list_grns(db: Session = Depends(get_db)):
-    return db.query(GRN).order_by(GRN.id.desc()).all()
+def list_grns(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    conds = []
+    if date_from:
+        conds.append(GRN.received_date >= date_from)
+    if date_to:
+        conds.append(GRN.received_date <= date_to)
+
+    grns = row_dicts(
+        db.execute(
+            select(GRN.id, GRN.grn_number, GRN.po_id, GRN.received_date, GRN.remarks)
+            .where(*conds)
+            .order_by(GRN.id.desc())
+        )
+    )
+    # every line of the matching GRNs in one query (same filter, joined)
+    lines: dict[int, list[dict]] = {}
+    rows = db.execute(
+        select(
+            GRNLine.grn_id,
+            GRNLine.sku_code,
+            func.coalesce(GRNLine.received_qty, 0.0),
+            func.coalesce(GRNLine.accepted_qty, 0.0),
+            func.coalesce(GRNLine.rejected_qty, 0.0),
+        )
+        .join(GRN, GRN.id == GRNLine.grn_id)
+        .where(*conds)
+        .order_by(GRNLine.id)
+    )
+    for grn_id, sku, received, accepted, rejected in rows:
+        lines.setdefault(grn_id, []).append(
+            {
+                "sku_code": sku,
+                "received_qty": received,
+                "accepted_qty": accepted,
+                "rejected_qty": rejected,
+            }
+        )
+    for g in grns:
+        g["lines"] = lines.get(g["id"], [])
+    return json_response(grns)
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ...db import get_db
 from ...models import HSNMaster
 from ...schemas import HSNCreate, HSNOut
+from ...services import hsn_rates
+from ..fast_json import row_dicts, versioned_json
 
 router = APIRouter(prefix="/hsn", tags=["HSN Master"])
 
+# HSNOut as plain columns, NULL rates defaulted like the schema
+_HSN_LIST = select(
+    HSNMaster.hsn_code,
+    HSNMaster.description,
+    func.coalesce(HSNMaster.cgst_rate, 0.0).label("cgst_rate"),
+    func.coalesce(HSNMaster.sgst_rate, 0.0).label("sgst_rate"),
+    func.coalesce(HSNMaster.igst_rate, 0.0).label("igst_rate"),
+    HSNMaster.id,
+).order_by(HSNMaster.hsn_code)
+
 @router.get("", response_model=list[HSNOut])
-def list_hsn(db: Session = Depends(get_db)):
-    return db.query(HSNMaster).order_by(HSNMaster.hsn_code).all()
+def list_hsn(request: Request, db: Session = Depends(get_db)):
+    return versioned_json(request, db, "hsn_master", lambda: row_dicts(db.execute(_HSN_LIST)))
 
 @router.post("", response_model=HSNOut)
 def create_hsn(payload: HSNCreate, db: Session = Depends(get_db)):
@@ -20,6 +33,7 @@ def create_hsn(payload: HSNCreate, db: Session = Depends(get_db)):
     h = HSNMaster(**payload.model_dump())
     db.add(h)
     db.commit()
+    hsn_rates.invalidate()
     db.refresh(h)
     return h
 
@@ -33,6 +47,7 @@ def update_hsn(hsn_id: int, payload: HSNCreate, db: Session = Depends(get_db)):
         setattr(h, k, v)
 
     db.commit()
+    hsn_rates.invalidate()
     db.refresh(h)
     return h
 
@@ -43,4 +58,5 @@ def delete_hsn(hsn_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="HSN not found")
     db.delete(h)
     db.commit()
+    hsn_rates.invalidate()
     return {"ok": True}
\ No newline at end of file
@@ -1,59 +1,255 @@
-from fastapi import APIRouter, Depends
+import json
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ...db import get_db
-from ...models import ItemMaster, InventoryStock
+from ...db import ASYNC_ROUTES, AsyncSessionLocal, SessionLocal, get_async_db, get_db
+from ...models import ItemMaster, InventoryStock, LowStockItem
+from ...services.stock_ledger import (
+    as_of_query, latest_run_query, ledger_differences, stock_as_of, take_snapshot,
+)
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
+# rows pulled off the DB cursor per fetch when streaming
+STREAM_CHUNK_SIZE = 1000
+
+# rows per JSON page when the caller sends no `limit`; ndjson stays unbounded
+PAGE_SIZE = 1000
+
+
+def _inventory_query(
+    cursor: Optional[int],
+    limit: Optional[int],
+    brand: Optional[str],
+    category: Optional[str],
+    style: Optional[str],
+):
+    """
+    item_master LEFT JOIN inventory_stock, newest item first.
+    Keyset pagination on item_master.id (cursor = last id already seen).
+    """
+    stmt = (
+        select(
+            ItemMaster.id,
+            ItemMaster.sku_code,
+            ItemMaster.brand,
+            ItemMaster.category,
+            ItemMaster.style,
+            func.coalesce(ItemMaster.min_stock_level, 0).label("min_stock_level"),
+            func.coalesce(InventoryStock.available_qty, 0).label("available_qty"),
+        )
+        .select_from(ItemMaster)
+        .outerjoin(InventoryStock, InventoryStock.sku_code == ItemMaster.sku_code)
+    )
+
+    if cursor is not None:
+        stmt = stmt.where(ItemMaster.id < cursor)
+    if brand:
+        stmt = stmt.where(ItemMaster.brand == brand)
+    if category:
+        stmt = stmt.where(ItemMaster.category == category)
+    if style:
+        stmt = stmt.where(ItemMaster.style == style)
+
+    stmt = stmt.order_by(ItemMaster.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _inventory_row(r) -> dict:
+    return {
+        "id": r.id,
+        "sku_code": r.sku_code,
+        "brand": r.brand,
+        "category": r.category,
+        "style": r.style,
+        "min_stock_level": int(r.min_stock_level or 0),
+        "available_qty": float(r.available_qty or 0),
+    }
+
+
+def _stream_ndjson(stmt):
+    # Own session: the request-scoped one may be closed before the body is sent.
+    with SessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        for r in result:
+            yield json.dumps(_inventory_row(r)) + "\n"
+
 
-@router.get("")
-def list_inventory(db: Session = Depends(get_db)):
+async def _stream_ndjson_async(stmt):
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        async for r in result:
+            yield json.dumps(_inventory_row(r)) + "\n"
+
+
+def _inventory_params(
+    cursor: Optional[int] = Query(None, description="Last item id from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    brand: Optional[str] = None,
+    category: Optional[str] = None,
+    style: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+) -> dict:
+    if limit is None and format == "json":
+        limit = PAGE_SIZE
+    return {
+        "stmt": _inventory_query(cursor, limit, brand, category, style),
+        "limit": limit,
+        "format": format,
+    }
+
+
+def _page(response: Response, out: list[dict], limit: Optional[int]) -> list[dict]:
+    if limit is not None and len(out) == limit:
+        response.headers["X-Next-Cursor"] = str(out[-1]["id"])
+    return out
+
+
+def list_inventory(
+    response: Response,
+    params: dict = Depends(_inventory_params),
+    db: Session = Depends(get_db),
+):
     """
     Returns SKU master + current stock.
     Used by InventoryPage.
+
+    - `limit` (default PAGE_SIZE) + `cursor` page through the catalog; the next
+      cursor is sent back in the `X-Next-Cursor` header (absent on the last page).
+    - `format=ndjson` streams one JSON object per line straight off the DB cursor,
+      the whole catalog unless `limit` is given.
     """
-    items = db.query(ItemMaster).order_by(ItemMaster.id.desc()).all()
-
-    # build map: sku -> qty
-    stocks = db.query(InventoryStock).all()
-    stock_map = {s.sku_code: float(s.available_qty or 0) for s in stocks}
-
-    out = []
-    for it in items:
-        out.append(
-            {
-                "sku_code": it.sku_code,
-                "brand": it.brand,
-                "category": it.category,
-                "style": it.style,
-                "min_stock_level": int(it.min_stock_level or 0),
-                "available_qty": float(stock_map.get(it.sku_code, 0)),
-            }
+    if params["format"] == "ndjson":
+        return StreamingResponse(
+            _stream_ndjson(params["stmt"]), media_type="application/x-ndjson"
         )
-    return out
+    out = [_inventory_row(r) for r in db.execute(params["stmt"])]
+    return _page(response, out, params["limit"])
+
+
+async def list_inventory_async(
+    response: Response,
+    params: dict = Depends(_inventory_params),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if params["format"] == "ndjson":
+        return StreamingResponse(
+            _stream_ndjson_async(params["stmt"]), media_type="application/x-ndjson"
+        )
+    out = [_inventory_row(r) for r in await db.execute(params["stmt"])]
+    return _page(response, out, params["limit"])
+
+
+_LOW_STOCK_QUERY = select(LowStockItem).order_by(LowStockItem.sku_code)
+
+
+def _low_stock_rows(rows) -> list[dict]:
+    return [
+        {
+            "sku_code": r.sku_code,
+            "available_qty": float(r.available_qty or 0),
+            "min_stock_level": float(r.min_stock_level or 0),
+        }
+        for r in rows
+    ]
 
 
-@router.get("/low-stock")
 def low_stock(db: Session = Depends(get_db)):
     """
     Low stock = available_qty <= min_stock_level.
+    Reads the maintained low_stock_items set, so cost follows the number of low SKUs.
+    """
+    return _low_stock_rows(db.scalars(_LOW_STOCK_QUERY))
+
+
+async def low_stock_async(db: AsyncSession = Depends(get_async_db)):
+    return _low_stock_rows(await db.scalars(_LOW_STOCK_QUERY))
+
+
+router.add_api_route(
+    "", list_inventory_async if ASYNC_ROUTES else list_inventory, methods=["GET"]
+)
+router.add_api_route(
+    "/low-stock", low_stock_async if ASYNC_ROUTES else low_stock, methods=["GET"]
+)
+
+
+# ---------- point-in-time stock (movement ledger) ----------
+
+def _as_of_params(
+    as_of: date = Query(..., alias="date", description="Stock at the end of this day"),
+    sku_code: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Last sku_code from the previous page"),
+    limit: int = Query(PAGE_SIZE, ge=1, le=5000),
+) -> dict:
+    return {"as_of": as_of, "sku_code": sku_code, "cursor": cursor, "limit": limit}
+
+
+def _as_of_rows(rows) -> list[dict]:
+    return [{"sku_code": r.sku_code, "qty": float(r.qty or 0)} for r in rows]
+
+
+def _as_of_page(response: Response, out: list[dict], limit: int) -> list[dict]:
+    if len(out) == limit:
+        response.headers["X-Next-Cursor"] = out[-1]["sku_code"]
+    return out
+
+
+def inventory_as_of(
+    response: Response,
+    params: dict = Depends(_as_of_params),
+    db: Session = Depends(get_db),
+):
+    """
+    Stock per SKU at the end of `date`, from the nearest month-end snapshot
+    plus the movements after it, so cost does not grow with years of history.
+    SKUs with no movements up to that day are left out. Pages of `limit`
+    SKUs (default PAGE_SIZE), next cursor in `X-Next-Cursor`.
+    """
+    return _as_of_page(response, _as_of_rows(stock_as_of(db, **params)), params["limit"])
+
+
+async def inventory_as_of_async(
+    response: Response,
+    params: dict = Depends(_as_of_params),
+    db: AsyncSession = Depends(get_async_db),
+):
+    base = await db.scalar(latest_run_query(params["as_of"]))
+    rows = await db.execute(as_of_query(base=base, **params))
+    return _as_of_page(response, _as_of_rows(rows), params["limit"])
+
+
+router.add_api_route(
+    "/as-of", inventory_as_of_async if ASYNC_ROUTES else inventory_as_of, methods=["GET"]
+)
+
+
+@router.get("/reconcile")
+def reconcile(db: Session = Depends(get_db)):
+    """SKUs whose current stock differs from the movement ledger (should be none)."""
+    return ledger_differences(db)
+
+
+@router.post("/snapshots")
+def create_snapshot(
+    snapshot_date: Optional[date] = Query(None, alias="date", description="Defaults to yesterday"),
+    db: Session = Depends(get_db),
+):
+    """
+    Snapshot every SKU's stock at the end of `date`. Month ends are taken
+    automatically at startup; this is for extra points or a scheduler.
     """
-    items = db.query(ItemMaster).all()
-    stocks = db.query(InventoryStock).all()
-    stock_map = {s.sku_code: float(s.available_qty or 0) for s in stocks}
-
-    low = []
-    for it in items:
-        sku = it.sku_code
-        avail = float(stock_map.get(sku, 0))
-        min_lvl = float(it.min_stock_level or 0)
-        if avail <= min_lvl:
-            low.append(
-                {
-                    "sku_code": sku,
-                    "available_qty": avail,
-                    "min_stock_level": min_lvl,
-                }
-            )
-    return low
+    snapshot_date = snapshot_date or date.today() - timedelta(days=1)
+    if snapshot_date >= date.today():
+        raise HTTPException(status_code=400, detail="Only days that have ended can be snapshotted")
+    skus = take_snapshot(db.connection(), snapshot_date)
+    db.commit()
+    return {"snapshot_date": snapshot_date, "skus": skus}
@@ -1,15 +1,271 @@
-from fastapi import APIRouter, Depends, HTTPException
+import codecs
+import csv
+from typing import AsyncIterator, Optional, get_args
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ...db import get_db
+from ...db import SessionLocal, get_db, insert_for
 from ...models import ItemMaster
 from ...schemas import ItemCreate, ItemOut
+from ...services.item_search import index_item_rows, index_items, search_items, unindex_items
+from ...services.low_stock import add_low_stock_range, refresh_low_stock
+from ..fast_json import loads, row_dicts, versioned_json
 
 router = APIRouter(prefix="/items", tags=["Item Master"])
 
+# rows per validation + insert transaction in /items/bulk
+BULK_CHUNK_SIZE = 5000
+# per-row error entries returned before the report is truncated
+BULK_MAX_ERRORS = 1000
+
+# ItemOut as plain columns, in schema field order with its defaults for NULLs
+_ITEM_LIST = select(
+    ItemMaster.sku_code,
+    ItemMaster.brand,
+    ItemMaster.division,
+    ItemMaster.category,
+    ItemMaster.sub_category,
+    ItemMaster.style,
+    ItemMaster.color,
+    ItemMaster.size,
+    ItemMaster.hsn_code,
+    func.coalesce(ItemMaster.status, "DRAFT").label("status"),
+    ItemMaster.image_path,
+    func.coalesce(ItemMaster.min_stock_level, 10).label("min_stock_level"),
+    ItemMaster.id,
+).order_by(ItemMaster.sku_code)
+
 @router.get("", response_model=list[ItemOut])
-def list_items(db: Session = Depends(get_db)):
-    return db.query(ItemMaster).order_by(ItemMaster.sku_code).all()
+def list_items(request: Request, db: Session = Depends(get_db)):
+    return versioned_json(request, db, "item_master", lambda: row_dicts(db.execute(_ITEM_LIST)))
+
+async def _lines(request: Request) -> AsyncIterator[str]:
+    """Decoded text lines (newline kept) from the raw request body stream."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buf = ""
+    async for chunk in request.stream():
+        buf += decoder.decode(chunk)
+        *complete, buf = buf.split("\n")
+        for line in complete:
+            yield line + "\n"
+    buf += decoder.decode(b"", final=True)
+    if buf:
+        yield buf
+
+
+async def _ndjson_records(request: Request) -> AsyncIterator[tuple[int, object]]:
+    n = 0
+    async for line in _lines(request):
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            yield n, loads(line)
+        except ValueError as e:
+            yield n, e
+
+
+async def _csv_records(request: Request) -> AsyncIterator[tuple[int, object]]:
+    header = None
+    n = 0
+    record = ""
+    async for line in _lines(request):
+        record += line
+        if '"' not in record:
+            # no quoting: a plain split gives what csv.reader would, much cheaper
+            values = record.rstrip("\r\n").split(",")
+        elif record.count('"') % 2:
+            # an odd number of quotes means a quoted field continues on the next line
+            continue
+        else:
+            values = next(csv.reader([record]), [])
+        record = ""
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        n += 1
+        # blank cells fall back to the schema defaults
+        yield n, {k: v for k, v in zip(header, values) if v != ""}
+
+
+# ItemCreate fields as (name, default, required, nullable, is_int) for _plain_item
+_ITEM_FIELDS = [
+    (name, f.default, f.is_required(), type(None) in get_args(f.annotation), f.annotation in (int, Optional[int]))
+    for name, f in ItemCreate.model_fields.items()
+]
+_MISSING = object()
+
+
+def _plain_item(record) -> Optional[dict]:
+    """
+    ItemCreate.model_dump() for the common row: strings, ints (or plain digit
+    strings from CSV) and nulls where the schema allows them. Returns None for
+    anything else; the caller then runs the full pydantic validation, which
+    coerces or reports the error exactly as before.
+    """
+    if type(record) is not dict:
+        return None
+    item = {}
+    for name, default, required, nullable, is_int in _ITEM_FIELDS:
+        v = record.get(name, _MISSING)
+        if v is _MISSING:
+            if required:
+                return None
+            v = default
+        elif v is None:
+            if not nullable:
+                return None
+        elif is_int:
+            if type(v) is str and v.isascii() and v.isdigit():
+                v = int(v)
+            elif type(v) is not int:
+                return None
+        elif type(v) is not str:
+            return None
+        item[name] = v
+    return item
+
+
+# (dialect) -> INSERT ... ON CONFLICT (sku_code) DO NOTHING RETURNING id, sku_code
+_inserts: dict = {}
+
+
+def _insert_new_items(conn, rows: list[dict]) -> dict[str, int]:
+    """Insert the rows whose sku_code is not taken yet; returns {sku_code: id} of those inserted."""
+    stmt = _inserts.get(conn.dialect.name)
+    if stmt is None:
+        table = ItemMaster.__table__
+        stmt = _inserts[conn.dialect.name] = (
+            insert_for(conn)(table)
+            .on_conflict_do_nothing(index_elements=[table.c.sku_code])
+            .returning(table.c.id, table.c.sku_code)
+        )
+    return {sku: item_id for item_id, sku in conn.execute(stmt, rows)}
+
+
+def _id_runs(ids) -> list[tuple[int, int]]:
+    """
+    Ids as gap-free (first, last) runs. Ids are unique, so each run holds only
+    these rows and derived tables can be filled with one range query per run
+    (a single run on SQLite, where a multi-row insert takes consecutive ids).
+    """
+    runs: list[tuple[int, int]] = []
+    for i in sorted(ids):
+        if runs and runs[-1][1] == i - 1:
+            runs[-1] = (runs[-1][0], i)
+        else:
+            runs.append((i, i))
+    return runs
+
+
+def _import_chunk(chunk: list[tuple[int, object]], seen: set[str]) -> dict:
+    """Validate, dedupe and insert one chunk in its own transaction."""
+    errors = []
+    valid: dict[str, tuple[int, dict]] = {}
+
+    for row_no, record in chunk:
+        if isinstance(record, Exception):
+            errors.append({"row": row_no, "error": f"Invalid JSON: {record}"})
+            continue
+        item = _plain_item(record)
+        if item is None:
+            try:
+                item = ItemCreate.model_validate(record).model_dump()
+            except ValidationError as e:
+                errors.append({"row": row_no, "error": "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                )})
+                continue
+        sku = item["sku_code"] = item["sku_code"].strip()
+        if not sku:
+            errors.append({"row": row_no, "error": "sku_code is required"})
+            continue
+        if sku in seen or sku in valid:
+            errors.append({"row": row_no, "sku_code": sku, "error": "Duplicate SKU code in upload"})
+            continue
+        valid[sku] = (row_no, item)
+
+    inserted: dict[str, int] = {}
+    with SessionLocal() as db:
+        if valid:
+            # one set-based statement both checks and inserts: SKUs already in
+            # item_master are skipped by the unique index and left out of RETURNING
+            inserted = _insert_new_items(db.connection(), [row for _, row in valid.values()])
+        if inserted:
+            for first_id, last_id in _id_runs(inserted.values()):
+                add_low_stock_range(db, first_id, last_id)
+                index_item_rows(db, first_id, last_id)
+        db.commit()
+
+    duplicates = 0
+    for sku, (row_no, _) in valid.items():
+        if sku not in inserted:
+            errors.append({"row": row_no, "sku_code": sku, "error": "SKU code already exists"})
+            duplicates += 1
+
+    seen.update(valid)
+    errors.sort(key=lambda e: e["row"])
+    return {"inserted": len(inserted), "duplicates": duplicates, "errors": errors}
+
+
+@router.get("/search", response_model=list[ItemOut])
+def search_item_master(
+    q: str = Query(..., min_length=1, description="Prefix terms over SKU, brand, category, style, color, size"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Type-ahead search: every term must prefix-match some field; best bm25 rank first."""
+    return search_items(db, q, limit)
+
+
+@router.post("/bulk")
+async def bulk_import_items(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+):
+    """
+    Streamed catalog import. Body is CSV (header row of ItemCreate field names)
+    or NDJSON (one ItemCreate object per line); format comes from `format` or
+    the Content-Type. Rows are handled in chunks of BULK_CHUNK_SIZE, each with
+    one INSERT ... ON CONFLICT DO NOTHING (insert and duplicate check in one)
+    and its own commit, so earlier chunks stay imported if a later one fails.
+    """
+    fmt = format
+    if fmt is None:
+        ctype = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in ctype else "ndjson"
+    records = _csv_records(request) if fmt == "csv" else _ndjson_records(request)
+
+    report = {"rows": 0, "inserted": 0, "duplicates": 0, "failed": 0, "errors": []}
+    seen: set[str] = set()
+    chunk: list[tuple[int, object]] = []
+
+    async def flush():
+        res = await run_in_threadpool(_import_chunk, chunk, seen)
+        report["rows"] += len(chunk)
+        report["inserted"] += res["inserted"]
+        report["duplicates"] += res["duplicates"]
+        report["failed"] += len(res["errors"])
+        room = BULK_MAX_ERRORS - len(report["errors"])
+        report["errors"].extend(res["errors"][:room])
+        chunk.clear()
+
+    async for rec in records:
+        chunk.append(rec)
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
+
 
 @router.post("", response_model=ItemOut)
 def create_item(payload: ItemCreate, db: Session = Depends(get_db)):
@@ -19,6 +275,8 @@ def create_item(payload: ItemCreate, db: Session = Depends(get_db)):
 
     item = ItemMaster(**payload.model_dump())
     db.add(item)
+    refresh_low_stock(db, [item.sku_code])
+    index_items(db, [item])
     db.commit()
     db.refresh(item)
     return item
@@ -29,9 +287,15 @@ def update_item(item_id: int, payload: ItemCreate, db: Session = Depends(get_db)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
+    old_sku = item.sku_code
+    # keep the stored threshold unless the client sent one
     for k, v in payload.model_dump().items():
+        if k == "min_stock_level" and k not in payload.model_fields_set:
+            continue
         setattr(item, k, v)
 
+    refresh_low_stock(db, [old_sku, item.sku_code])
+    index_items(db, [item])
     db.commit()
     db.refresh(item)
     return item
@@ -42,6 +306,8 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete(item)
+    refresh_low_stock(db, [item.sku_code])
+    unindex_items(db, [item.id])
     db.commit()
     return {"ok": True}
     
\ No newline at end of file
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ...db import engine, get_db
+from ...schemas import QuotedDocument, QuoteRequest, RepriceRequest, RepriceResult
+from ...services import reprice as reprice_job, tax_engine
+from ..fast_json import json_response
+
+router = APIRouter(prefix="/pricing", tags=["Pricing"])
+
+
+@router.post("/quote", response_model=list[QuotedDocument])
+def quote(payload: QuoteRequest, db: Session = Depends(get_db)):
+    """
+    Line amounts and header totals for any number of documents, priced the
+    way POs and sales are saved. All lines go through the tax engine in one
+    batch; nothing is written.
+    """
+    docs = payload.documents
+    priced = tax_engine.price_documents(db, [(d.lines, d.tax_mode) for d in docs])
+    out = []
+    for d, (amounts, totals) in zip(docs, priced):
+        out.append({
+            "ref": d.ref, "tax_mode": d.tax_mode, **totals,
+            "lines": [
+                {"sku_code": ln.sku_code, "qty": ln.qty, "rate": ln.rate, **a}
+                for ln, a in zip(d.lines, amounts)
+            ],
+        })
+    return json_response(out)
+
+
+@router.post("/reprice", response_model=RepriceResult)
+def reprice(payload: RepriceRequest):
+    """
+    Re-price stored sale or PO lines in a date range against the current HSN
+    master and re-total their documents. `dry_run` only counts what would change.
+    """
+    if payload.target not in reprice_job.TARGETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"target must be one of: {', '.join(reprice_job.TARGETS)}",
+        )
+    if payload.date_from and payload.date_to and payload.date_from > payload.date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+    return reprice_job.reprice(
+        engine,
+        payload.target,
+        date_from=payload.date_from,
+        date_to=payload.date_to,
+        hsn_codes=payload.hsn_codes,
+        dry_run=payload.dry_run,
+    )
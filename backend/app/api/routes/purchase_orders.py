@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
 from ...db import get_db
 from ...models import PurchaseOrder, PurchaseOrderLine, VendorMaster
-from ...schemas import PurchaseOrderCreate, PurchaseOrderOut
+from ...schemas import POReceiptSummary, POStatusOut, PurchaseOrderCreate, PurchaseOrderOut
+from ...services.po_receipts import OPEN
+from ...services.tax_engine import price_document
 
 router = APIRouter(prefix="/purchase-orders", tags=["Purchase Orders"])
 
@@ -25,23 +31,21 @@ def create_purchase_order(payload: PurchaseOrderCreate, db: Session = Depends(ge
         retailer_gstin=payload.retailer_gstin,
     )
 
-    subtotal = cgst_total = sgst_total = igst_total = grand_total = 0.0
-
-    for ln in payload.lines:
-        line = PurchaseOrderLine(**ln.model_dump())
-        po.lines.append(line)
-
-        subtotal += ln.line_subtotal
-        cgst_total += ln.cgst_amount
-        sgst_total += ln.sgst_amount
-        igst_total += ln.igst_amount
-        grand_total += ln.line_total
+    # amounts are computed here from qty, rate and the HSN master; the
+    # client's figures are display-only
+    priced, totals = price_document(db, payload.lines, payload.tax_mode)
+    for ln, amounts in zip(payload.lines, priced):
+        fields = ln.model_dump()
+        fields.update(amounts)
+        del fields["line_tax"]
+        po.lines.append(PurchaseOrderLine(**fields))
 
-    po.subtotal = subtotal
-    po.cgst_total = cgst_total
-    po.sgst_total = sgst_total
-    po.igst_total = igst_total
-    po.grand_total = grand_total
+    po.subtotal = totals["subtotal"]
+    po.cgst_total = totals["cgst_total"]
+    po.sgst_total = totals["sgst_total"]
+    po.igst_total = totals["igst_total"]
+    po.grand_total = totals["grand_total"]
+    po.ordered_qty = po.outstanding_qty = sum(ln.qty or 0 for ln in payload.lines)
 
     db.add(po)
     db.commit()
@@ -56,15 +60,147 @@ def create_purchase_order(payload: PurchaseOrderCreate, db: Session = Depends(ge
     return out
 
 @router.get("", response_model=list[PurchaseOrderOut])
-def list_purchase_orders(db: Session = Depends(get_db)):
-    pos = db.query(PurchaseOrder).order_by(PurchaseOrder.id.desc()).all()
+def list_purchase_orders(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Last PO id from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    vendor_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Newest first. A page is two queries: POs joined to their vendor, then all
+    lines of the page via selectinload (which batches 500 ids per IN).
+    Pages of `limit` POs (default 100); the next page cursor comes back in
+    `X-Next-Cursor` while a page comes back full.
+    """
+    q = (
+        db.query(PurchaseOrder, VendorMaster.vendor_code, VendorMaster.vendor_name)
+        .outerjoin(VendorMaster, VendorMaster.id == PurchaseOrder.vendor_id)
+        .options(selectinload(PurchaseOrder.lines))
+    )
+
+    if cursor is not None:
+        q = q.filter(PurchaseOrder.id < cursor)
+    if vendor_id is not None:
+        q = q.filter(PurchaseOrder.vendor_id == vendor_id)
+    if date_from:
+        q = q.filter(PurchaseOrder.po_date >= date_from)
+    if date_to:
+        q = q.filter(PurchaseOrder.po_date <= date_to)
+    if status:
+        q = q.filter(PurchaseOrder.status == status)
+
+    rows = q.order_by(PurchaseOrder.id.desc()).limit(limit).all()
 
     result = []
-    for po in pos:
-        vendor = db.query(VendorMaster).filter(VendorMaster.id == po.vendor_id).first()
+    for po, vendor_code, vendor_name in rows:
         out = PurchaseOrderOut.model_validate(po)
-        if vendor:
-            out.vendor_code = vendor.vendor_code
-            out.vendor_name = vendor.vendor_name
+        out.vendor_code = vendor_code
+        out.vendor_name = vendor_name
         result.append(out)
-    return result
\ No newline at end of file
+
+    if len(result) == limit:
+        response.headers["X-Next-Cursor"] = str(result[-1].id)
+    return result
+
+
+# ---------- receipt status (counters maintained by GRN posting) ----------
+
+_SUMMARY = (
+    PurchaseOrder.id,
+    PurchaseOrder.po_number,
+    PurchaseOrder.vendor_id,
+    VendorMaster.vendor_code,
+    PurchaseOrder.po_date,
+    PurchaseOrder.expiry_date,
+    PurchaseOrder.status,
+    PurchaseOrder.ordered_qty,
+    PurchaseOrder.received_qty,
+    PurchaseOrder.accepted_qty,
+    PurchaseOrder.outstanding_qty,
+)
+
+
+def _summary(r) -> dict:
+    out = dict(r._mapping)
+    for k in ("ordered_qty", "received_qty", "accepted_qty", "outstanding_qty"):
+        out[k] = float(out[k] or 0)
+    return out
+
+
+@router.get("/open", response_model=list[POReceiptSummary])
+def list_open_purchase_orders(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Last PO id from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    vendor_id: Optional[int] = None,
+    sku_code: Optional[str] = Query(None, description="Only POs with this SKU still outstanding"),
+    db: Session = Depends(get_db),
+):
+    """OPEN POs with their receipt counters, newest first; one query, no line sums."""
+    stmt = (
+        select(*_SUMMARY)
+        .outerjoin(VendorMaster, VendorMaster.id == PurchaseOrder.vendor_id)
+        .where(PurchaseOrder.status == OPEN)
+    )
+    if cursor is not None:
+        stmt = stmt.where(PurchaseOrder.id < cursor)
+    if vendor_id is not None:
+        stmt = stmt.where(PurchaseOrder.vendor_id == vendor_id)
+    if sku_code:
+        stmt = stmt.where(
+            select(PurchaseOrderLine.id)
+            .where(
+                PurchaseOrderLine.po_id == PurchaseOrder.id,
+                PurchaseOrderLine.sku_code == sku_code,
+                PurchaseOrderLine.qty > PurchaseOrderLine.received_qty,
+            )
+            .exists()
+        )
+    stmt = stmt.order_by(PurchaseOrder.id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    out = [_summary(r) for r in db.execute(stmt)]
+    if limit is not None and len(out) == limit:
+        response.headers["X-Next-Cursor"] = str(out[-1]["id"])
+    return out
+
+
+@router.get("/{po_id}/status", response_model=POStatusOut)
+def purchase_order_status(po_id: int, db: Session = Depends(get_db)):
+    """Ordered / received / accepted / outstanding qty for the PO and each of its lines."""
+    row = db.execute(
+        select(*_SUMMARY)
+        .outerjoin(VendorMaster, VendorMaster.id == PurchaseOrder.vendor_id)
+        .where(PurchaseOrder.id == po_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="PO not found")
+
+    out = _summary(row)
+    out["lines"] = []
+    for line_id, sku, ordered, received, accepted in db.execute(
+        select(
+            PurchaseOrderLine.id,
+            PurchaseOrderLine.sku_code,
+            PurchaseOrderLine.qty,
+            PurchaseOrderLine.received_qty,
+            PurchaseOrderLine.accepted_qty,
+        )
+        .where(PurchaseOrderLine.po_id == po_id)
+        .order_by(PurchaseOrderLine.id)
+    ):
+        ordered, received = float(ordered or 0), float(received or 0)
+        out["lines"].append({
+            "id": line_id,
+            "sku_code": sku,
+            "ordered_qty": ordered,
+            "received_qty": received,
+            "accepted_qty": float(accepted or 0),
+            "outstanding_qty": max(ordered - received, 0.0),
+        })
+    return out
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ...db import get_db
+from ...models import PurchaseOrder
+from ...schemas import ReplenishmentRunRequest, ReplenishmentRunResult
+from ...services.replenishment import DRAFT, OPEN, ReplenishmentError, run_replenishment
+
+router = APIRouter(prefix="/replenishment", tags=["Replenishment"])
+
+
+@router.post("/run", response_model=ReplenishmentRunResult)
+def run(payload: ReplenishmentRunRequest, db: Session = Depends(get_db)):
+    """
+    Reorder quantities for the whole catalog from stock, min_stock_level,
+    outstanding OPEN PO quantities and recent sales, written as one DRAFT PO
+    per vendor (replacing the previous run's drafts). `dry_run` writes nothing.
+    """
+    params = payload.model_dump()
+    retailer = {k: params.pop(k) for k in ("retailer_name", "retailer_address", "retailer_gstin")}
+    try:
+        return run_replenishment(db, retailer={k: v for k, v in retailer.items() if v}, **params)
+    except ReplenishmentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/drafts/{po_id}/confirm")
+def confirm_draft(po_id: int, db: Session = Depends(get_db)):
+    """Turn a draft PO into an OPEN one; later runs leave it alone and count it as on order."""
+    po = db.query(PurchaseOrder).filter(PurchaseOrder.id == po_id).first()
+    if not po:
+        raise HTTPException(status_code=404, detail="PO not found")
+    if po.status != DRAFT:
+        raise HTTPException(status_code=400, detail=f"PO is {po.status}, not a draft")
+    po.status = OPEN
+    db.commit()
+    return {"id": po.id, "po_number": po.po_number, "status": po.status}
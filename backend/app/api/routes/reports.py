@@ -0,0 +1,154 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ...db import engine, get_db
+from ...models import SalesDailyCategory, SalesDailySku, SalesDailyStore
+from ...services.sales_rollups import rebuild_rollups
+
+router = APIRouter(prefix="/reports/sales", tags=["Reports"])
+
+# Every report reads the sales_daily_* rollups only, never sales / sale_lines,
+# so cost follows days x stores (or brands, or SKUs sold) in the range.
+
+
+def _in_range(stmt, table, date_from: Optional[date], date_to: Optional[date]):
+    if date_from:
+        stmt = stmt.where(table.sale_date >= date_from)
+    if date_to:
+        stmt = stmt.where(table.sale_date <= date_to)
+    return stmt
+
+
+def _sums(table) -> list:
+    return [
+        func.sum(table.qty).label("qty"),
+        func.sum(table.subtotal).label("subtotal"),
+        func.sum(table.tax).label("tax"),
+        func.sum(table.total).label("total"),
+    ]
+
+
+def _amounts(r) -> dict:
+    return {
+        "qty": float(r.qty or 0),
+        "subtotal": round(r.subtotal or 0, 2),
+        "tax": round(r.tax or 0, 2),
+        "total": round(r.total or 0, 2),
+    }
+
+
+def _check_range(date_from: Optional[date], date_to: Optional[date]) -> None:
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+
+
+@router.get("")
+def sales_by_period(
+    period: str = Query("day", pattern="^(day|month|year)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    store_code: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Bills, units, revenue and tax collected per day, month or year."""
+    _check_range(date_from, date_to)
+    t = SalesDailyStore
+    stmt = select(t.sale_date, func.sum(t.bills).label("bills"), *_sums(t)).group_by(t.sale_date)
+    stmt = _in_range(stmt, t, date_from, date_to)
+    if store_code is not None:
+        stmt = stmt.where(t.store_code == store_code)
+
+    # at most one row per day: bucket months / years here, portably
+    width = {"day": 10, "month": 7, "year": 4}[period]
+    out: dict[str, dict] = {}
+    for r in db.execute(stmt.order_by(t.sale_date)):
+        key = r.sale_date.isoformat()[:width]
+        row = out.setdefault(
+            key, {"period": key, "bills": 0, "qty": 0.0, "subtotal": 0.0, "tax": 0.0, "total": 0.0}
+        )
+        row["bills"] += int(r.bills or 0)
+        for k, v in _amounts(r).items():
+            row[k] += v
+    for row in out.values():
+        for k in ("subtotal", "tax", "total"):
+            row[k] = round(row[k], 2)
+    return list(out.values())
+
+
+@router.get("/stores")
+def sales_by_store(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    _check_range(date_from, date_to)
+    t = SalesDailyStore
+    stmt = select(t.store_code, func.sum(t.bills).label("bills"), *_sums(t)).group_by(t.store_code)
+    stmt = _in_range(stmt, t, date_from, date_to).order_by(t.store_code)
+    return [
+        {"store_code": r.store_code or None, "bills": int(r.bills or 0), **_amounts(r)}
+        for r in db.execute(stmt)
+    ]
+
+
+@router.get("/categories")
+def sales_by_category(
+    group_by: str = Query("brand,category", pattern="^(brand|category|brand,category)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    brand: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Units and revenue per brand, per category, or per brand and category."""
+    _check_range(date_from, date_to)
+    t = SalesDailyCategory
+    keys = [getattr(t, k) for k in group_by.split(",")]
+    stmt = select(*keys, *_sums(t)).group_by(*keys)
+    stmt = _in_range(stmt, t, date_from, date_to)
+    if brand is not None:
+        stmt = stmt.where(t.brand == brand)
+    if category is not None:
+        stmt = stmt.where(t.category == category)
+    stmt = stmt.order_by(func.sum(t.subtotal).desc())
+    return [
+        {**{k.key: r._mapping[k.key] for k in keys}, **_amounts(r)}
+        for r in db.execute(stmt)
+    ]
+
+
+@router.get("/skus")
+def sales_by_sku(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sku_code: Optional[str] = None,
+    order_by: str = Query("subtotal", pattern="^(subtotal|qty)$"),
+    limit: int = Query(50, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Top SKUs by revenue or units; with `sku_code`, that SKU's totals."""
+    _check_range(date_from, date_to)
+    t = SalesDailySku
+    sums = _sums(t)
+    stmt = select(t.sku_code, *sums).group_by(t.sku_code)
+    stmt = _in_range(stmt, t, date_from, date_to)
+    if sku_code is not None:
+        stmt = stmt.where(t.sku_code == sku_code)
+    rank = sums[0] if order_by == "qty" else sums[1]
+    stmt = stmt.order_by(rank.desc(), t.sku_code).limit(limit)
+    return [{"sku_code": r.sku_code, **_amounts(r)} for r in db.execute(stmt)]
+
+
+@router.post("/rebuild")
+def rebuild(date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """
+    Recompute the rollups from sales / sale_lines for a date range (default:
+    all history), one month-sized window per transaction. Only needed after
+    changing sales outside the API.
+    """
+    _check_range(date_from, date_to)
+    return {"windows": rebuild_rollups(engine, date_from, date_to)}
@@ -1,77 +1,347 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import os
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, noload, selectinload
 
 from ...db import get_db
 from ...models import InventoryStock, Sale, SaleLine
-from ...schemas import SaleCreate, SaleOut
+from ...schemas import SaleBatchCreate, SaleBatchItem, SaleBatchResult, SaleCreate, SaleOut
+from ...services.low_stock import refresh_low_stock
+from ...services.sales_rollups import add_sales
+from ...services.sequences import BlockAllocator, next_number, next_numbers
+from ...services.stock import InsufficientStock, deduct_stock
+from ...services.stock_ledger import SALE_OUT, document_movements, record_movements
+from ...services.tax_engine import INTRA, price_document, price_documents
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 
 
-def _generate_bill_number(db: Session) -> str:
-    last = db.query(Sale).order_by(Sale.id.desc()).first()
-    next_id = 1 if not last else last.id + 1
-    return f"BILL-{next_id:04d}"
+# >1 lets each worker reserve bill numbers in blocks (no per-bill counter
+# round trip, but unused numbers are skipped when a worker restarts)
+BILL_BLOCK_SIZE = int(os.getenv("RETAILFLOW_BILL_BLOCK_SIZE", "1"))
+_bill_blocks = BlockAllocator(BILL_BLOCK_SIZE) if BILL_BLOCK_SIZE > 1 else None
 
+# priced values stored on a sale line (no per-tax amounts on sale_lines)
+_LINE_AMOUNTS = (
+    "hsn_code", "cgst_rate", "sgst_rate", "igst_rate", "line_subtotal", "line_tax", "line_total",
+)
+
+
+def _format_bill_number(store: str, n: int) -> str:
+    return f"BILL-{store}-{n:04d}" if store else f"BILL-{n:04d}"
 
-@router.post("", response_model=SaleOut)
-def create_sale(payload: SaleCreate, db: Session = Depends(get_db)):
-    if not payload.lines:
-        raise HTTPException(status_code=400, detail="Sale must have at least one line")
 
+def _generate_bill_number(db: Session, store_code: str | None = None) -> str:
+    store = store_code or ""
+    if _bill_blocks:
+        n = _bill_blocks.next("BILL", store, db)
+    else:
+        n = next_number(db, "BILL", store)
+    return _format_bill_number(store, n)
+
+
+def _valid_lines(payload: SaleCreate) -> list:
     # Basic validation: qty > 0
-    valid_lines = [ln for ln in payload.lines if (ln.qty or 0) > 0 and ln.sku_code]
-    if not valid_lines:
-        raise HTTPException(status_code=400, detail="No valid sale lines")
+    return [ln for ln in payload.lines if (ln.qty or 0) > 0 and ln.sku_code]
 
-    bill_no = payload.bill_number or _generate_bill_number(db)
 
+def _qty_by_sku(lines) -> dict[str, float]:
+    sold: dict[str, float] = {}
+    for ln in lines:
+        sold[ln.sku_code] = sold.get(ln.sku_code, 0) + (ln.qty or 0)
+    return sold
+
+
+def _build_sale(payload: SaleCreate, bill_no: str, lines, priced, totals) -> Sale:
     sale = Sale(
         bill_number=bill_no,
         sale_date=payload.sale_date,
+        store_code=payload.store_code,
+        idempotency_key=payload.idempotency_key,
         customer_name=payload.customer_name,
         customer_email=payload.customer_email,
         customer_phone=payload.customer_phone,
-        subtotal=payload.subtotal,
-        tax_total=payload.tax_total,
-        grand_total=payload.grand_total,
+        subtotal=totals["subtotal"],
+        tax_total=totals["tax_total"],
+        grand_total=totals["grand_total"],
     )
+    for ln, amounts in zip(lines, priced):
+        sale.lines.append(SaleLine(
+            sku_code=ln.sku_code, description=ln.description, qty=ln.qty, rate=ln.rate,
+            **{f: amounts[f] for f in _LINE_AMOUNTS},
+        ))
+    return sale
 
-    # accumulate qty per sku to deduct stock
-    sold_by_sku: dict[str, float] = {}
 
-    for ln in valid_lines:
-        sale.lines.append(SaleLine(**ln.model_dump()))
-        sold_by_sku[ln.sku_code] = sold_by_sku.get(ln.sku_code, 0) + (ln.qty or 0)
+@router.post("", response_model=SaleOut)
+def create_sale(payload: SaleCreate, db: Session = Depends(get_db)):
+    if not payload.lines:
+        raise HTTPException(status_code=400, detail="Sale must have at least one line")
+
+    if payload.idempotency_key:
+        existing = db.query(Sale).filter(Sale.idempotency_key == payload.idempotency_key).first()
+        if existing:
+            return existing
+
+    valid_lines = _valid_lines(payload)
+    if not valid_lines:
+        raise HTTPException(status_code=400, detail="No valid sale lines")
+
+    bill_no = payload.bill_number or _generate_bill_number(db, payload.store_code)
+
+    # counter sales are intra-state: CGST + SGST, computed here from qty,
+    # rate and the HSN master (the client's amounts are display-only)
+    priced, totals = price_document(db, valid_lines, INTRA)
+    sale = _build_sale(payload, bill_no, valid_lines, priced, totals)
+
+    # accumulate qty per sku to deduct stock
+    sold_by_sku = _qty_by_sku(valid_lines)
 
     # ----- STOCK CHECK + DEDUCT -----
-    for sku, sold_qty in sold_by_sku.items():
-        stock = db.query(InventoryStock).filter(InventoryStock.sku_code == sku).first()
-        if not stock:
-            raise HTTPException(status_code=400, detail=f"No stock row for SKU {sku}")
-        if (stock.available_qty or 0) < sold_qty:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient stock for {sku}. Available={stock.available_qty}, Sold={sold_qty}",
-            )
+    # one transaction: conditional decrement of every SKU, then the sale itself
+    try:
+        deduct_stock(db, sold_by_sku)
+    except InsufficientStock as e:
+        raise HTTPException(status_code=400, detail=e.detail())
 
-    # persist sale first
     db.add(sale)
-    db.commit()
+    try:
+        db.flush()
+        record_movements(db, document_movements(
+            sale.sale_date, SALE_OUT, sale.id, {sku: -q for sku, q in sold_by_sku.items()}
+        ))
+        add_sales(db, [sale])
+        refresh_low_stock(db, sold_by_sku.keys())
+        db.commit()
+    except IntegrityError:
+        # the same key committed by a concurrent request in the meantime
+        db.rollback()
+        existing = payload.idempotency_key and (
+            db.query(Sale).filter(Sale.idempotency_key == payload.idempotency_key).first()
+        )
+        if not existing:
+            raise
+        return existing
     db.refresh(sale)
+    # -------------------------------
+
+    return sale
+
+
+# ---------- offline POS sync ----------
+
+SALE_BATCH_MAX = 1000
+
+
+def _ingest_batch(db: Session, sales: list[SaleBatchItem]) -> list[dict]:
+    """One attempt at the whole batch in one transaction; returns per-bill results."""
+    results: list[Optional[dict]] = [None] * len(sales)
+
+    def result(i, status, sale_id=None, bill_number=None, detail=None):
+        results[i] = {
+            "idempotency_key": sales[i].idempotency_key, "status": status,
+            "sale_id": sale_id, "bill_number": bill_number, "detail": detail,
+        }
+
+    # 1) dedupe against bills already ingested, and within the batch
+    keys = list({s.idempotency_key for s in sales})
+    ingested: dict[str, tuple[int, str]] = {}
+    for c in range(0, len(keys), 500):
+        for key, sale_id, bill_no in db.execute(
+            select(Sale.idempotency_key, Sale.id, Sale.bill_number)
+            .where(Sale.idempotency_key.in_(keys[c:c + 500]))
+        ):
+            ingested[key] = (sale_id, bill_no)
+
+    candidates: dict[int, list] = {}  # batch position -> valid lines
+    first_of_key: dict[str, int] = {}
+    repeats: list[tuple[int, int]] = []
+    for i, s in enumerate(sales):
+        if s.idempotency_key in ingested:
+            result(i, "duplicate", *ingested[s.idempotency_key])
+        elif s.idempotency_key in first_of_key:
+            repeats.append((i, first_of_key[s.idempotency_key]))
+        else:
+            first_of_key[s.idempotency_key] = i
+            lines = _valid_lines(s)
+            if lines:
+                candidates[i] = lines
+            else:
+                result(i, "rejected", detail="No valid sale lines")
 
-    # deduct stock after sale saved
-    for sku, sold_qty in sold_by_sku.items():
-        stock = db.query(InventoryStock).filter(InventoryStock.sku_code == sku).first()
-        stock.available_qty = (stock.available_qty or 0) - sold_qty
+    # client-chosen bill numbers must be new
+    wanted = [sales[i].bill_number for i in candidates if sales[i].bill_number]
+    taken = set()
+    for c in range(0, len(wanted), 500):
+        taken.update(db.execute(
+            select(Sale.bill_number).where(Sale.bill_number.in_(wanted[c:c + 500]))
+        ).scalars())
+    for i in list(candidates):
+        bill_no = sales[i].bill_number
+        if bill_no and bill_no in taken:
+            result(i, "rejected", detail=f"Bill number {bill_no} already exists")
+            del candidates[i]
+        elif bill_no:
+            taken.add(bill_no)
 
+    # 2) allocate stock in batch order against one read of every SKU involved;
+    #    a bill that would oversell is rejected, the rest go through
+    need = {i: _qty_by_sku(lines) for i, lines in candidates.items()}
+    skus = list({sku for q in need.values() for sku in q})
+    left: dict[str, float] = {}
+    for c in range(0, len(skus), 500):
+        left.update(
+            (sku, float(avail or 0)) for sku, avail in db.execute(
+                select(InventoryStock.sku_code, InventoryStock.available_qty)
+                .where(InventoryStock.sku_code.in_(skus[c:c + 500]))
+            )
+        )
+    total: dict[str, float] = {}
+    for i in list(candidates):
+        short = {
+            sku: (left.get(sku), qty) for sku, qty in need[i].items()
+            if left.get(sku) is None or left[sku] < qty
+        }
+        if short:
+            result(i, "rejected", detail=InsufficientStock(short).detail())
+            del candidates[i]
+            continue
+        for sku, qty in need[i].items():
+            left[sku] -= qty
+            total[sku] = total.get(sku, 0) + qty
+
+    # 3) bill numbers for every accepted bill, before the batch's first write:
+    #    a new number block is reserved on its own connection
+    accepted = list(candidates)
+    unnumbered: dict[str, list[int]] = {}
+    bill_nos: dict[int, str] = {}
+    for i in accepted:
+        if sales[i].bill_number:
+            bill_nos[i] = sales[i].bill_number
+        else:
+            unnumbered.setdefault(sales[i].store_code or "", []).append(i)
+    for store, positions in unnumbered.items():
+        if _bill_blocks:
+            numbers = _bill_blocks.take("BILL", store, len(positions), db)
+        else:
+            numbers = next_numbers(db, "BILL", store, len(positions))
+        for i, n in zip(positions, numbers):
+            bill_nos[i] = _format_bill_number(store, n)
+
+    # 4) one conditional decrement per SKU for the whole batch; raises (after
+    #    rolling back) only if stock moved since the read above
+    deduct_stock(db, total)
+
+    # 5) prices and rows for every accepted bill
+    priced = price_documents(db, [(candidates[i], INTRA) for i in accepted])
+    rows = [
+        _build_sale(sales[i], bill_nos[i], candidates[i], amounts, totals)
+        for i, (amounts, totals) in zip(accepted, priced)
+    ]
+    db.add_all(rows)
+    db.flush()
+    movements = []
+    for i, sale in zip(accepted, rows):
+        result(i, "created", sale.id, sale.bill_number)
+        movements += document_movements(
+            sale.sale_date, SALE_OUT, sale.id, {sku: -q for sku, q in need[i].items()}
+        )
+    record_movements(db, movements)
+    add_sales(db, rows)
+
+    refresh_low_stock(db, total.keys())
     db.commit()
-    # -------------------------------
 
-    return sale
+    for i, first in repeats:
+        r = results[first]
+        if r["status"] == "rejected":
+            result(i, "rejected", detail=r["detail"])
+        else:
+            result(i, "duplicate", r["sale_id"], r["bill_number"])
+    return results
+
+
+@router.post("/batch", response_model=SaleBatchResult)
+def create_sales_batch(payload: SaleBatchCreate, db: Session = Depends(get_db)):
+    """
+    Ingest many bills (e.g. a POS catching up after working offline) in one
+    transaction. Bills whose idempotency_key was already ingested come back
+    as "duplicate" with the stored sale; bills that would oversell, reuse a
+    bill number or have no valid lines are "rejected"; the rest are
+    "created". Stock is deducted with one conditional update per SKU for the
+    whole batch, so a batch costs a handful of statements however many
+    bills it carries. Safe to re-send after a timeout.
+    """
+    if not payload.sales:
+        raise HTTPException(status_code=400, detail="Batch must have at least one sale")
+    if len(payload.sales) > SALE_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"At most {SALE_BATCH_MAX} sales per batch"
+        )
+
+    # a retry re-reads stock and keys: another writer may have sold the same
+    # SKUs or ingested the same bills since this attempt's reads
+    for attempt in range(3):
+        try:
+            results = _ingest_batch(db, payload.sales)
+            break
+        except (InsufficientStock, IntegrityError):
+            db.rollback()
+            if attempt == 2:
+                raise HTTPException(
+                    status_code=409, detail="Batch conflicted with concurrent writes; retry"
+                )
+
+    counts = {"created": 0, "duplicate": 0, "rejected": 0}
+    for r in results:
+        counts[r["status"]] += 1
+    return {
+        "created": counts["created"],
+        "duplicates": counts["duplicate"],
+        "rejected": counts["rejected"],
+        "results": results,
+    }
 
 
 @router.get("", response_model=list[SaleOut])
-def list_sales(db: Session = Depends(get_db)):
-    return db.query(Sale).order_by(Sale.id.desc()).all()
+def list_sales(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="Last sale id from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    customer_name: Optional[str] = None,
+    customer_phone: Optional[str] = None,
+    sku_code: Optional[str] = Query(None, description="Only bills containing this SKU"),
+    summary: bool = Query(False, description="Headers only; lines come back empty"),
+    db: Session = Depends(get_db),
+):
+    """
+    Newest first, `limit` bills a page. Lines of a page are loaded in one
+    selectinload batch (or not at all with `summary=true`).
+    Next page cursor comes back in `X-Next-Cursor` (absent on the last page).
+    """
+    q = db.query(Sale).options(noload(Sale.lines) if summary else selectinload(Sale.lines))
+
+    if cursor is not None:
+        q = q.filter(Sale.id < cursor)
+    if date_from:
+        q = q.filter(Sale.sale_date >= date_from)
+    if date_to:
+        q = q.filter(Sale.sale_date <= date_to)
+    if customer_name:
+        q = q.filter(Sale.customer_name == customer_name)
+    if customer_phone:
+        q = q.filter(Sale.customer_phone == customer_phone)
+    if sku_code:
+        q = q.filter(Sale.id.in_(select(SaleLine.sale_id).where(SaleLine.sku_code == sku_code)))
+
+    sales = q.order_by(Sale.id.desc()).limit(limit).all()
 
+    if len(sales) == limit:
+        response.headers["X-Next-Cursor"] = str(sales[-1].id)
+    return sales
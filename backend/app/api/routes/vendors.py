@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
 
 from ...db import get_db
-from ...models import VendorMaster
+from ...models import VendorMaster, VendorSku
 from ...schemas import VendorCreate, VendorOut
+from ...services.sequences import next_number
+from ..fast_json import row_dicts, versioned_json
 
 router = APIRouter(prefix="/vendors", tags=["Vendor Master"])
 
@@ -25,42 +28,81 @@ def _normalize_skus(skus: list[str] | None) -> list[str]:
     return clean
 
 
-def _skus_to_str(skus: list[str]) -> str | None:
-    skus = _normalize_skus(skus)
-    return ",".join(skus) if skus else None
+def _set_skus(v: VendorMaster, skus: list[str]) -> None:
+    # diff against current links so unchanged rows are left alone
+    wanted = set(skus)
+    for link in list(v.sku_links):
+        if link.sku_code not in wanted:
+            v.sku_links.remove(link)
+    have = {link.sku_code for link in v.sku_links}
+    for sku in skus:
+        if sku not in have:
+            v.sku_links.append(VendorSku(sku_code=sku))
 
 
-def _str_to_skus(s: str | None) -> list[str]:
-    if not s or not s.strip():
-        return []
-    return _normalize_skus(s.split(","))
+def _vendor_out(v: VendorMaster) -> VendorOut:
+    return VendorOut(
+        id=v.id,
+        vendor_code=v.vendor_code,
+        vendor_name=v.vendor_name,
+        address=v.address,
+        email=v.email,
+        phone=v.phone,
+        tagged_skus=[link.sku_code for link in v.sku_links],
+        status=v.status or "Active",
+    )
 
 
 def _generate_vendor_code(db: Session) -> str:
-    # NOTE: still not perfect under concurrency; UNIQUE constraint + IntegrityError handling covers it
-    last = db.query(VendorMaster).order_by(VendorMaster.id.desc()).first()
-    next_num = 1 if not last else (last.id + 1)
-    return f"V{next_num:04d}"
+    # atomic counter in the same transaction as the insert; a manually entered
+    # code can still collide, which the UNIQUE constraint + IntegrityError covers
+    return f"V{next_number(db, 'V'):04d}"
+
+
+_VENDOR_LIST = select(
+    VendorMaster.id,
+    VendorMaster.vendor_code,
+    VendorMaster.vendor_name,
+    VendorMaster.address,
+    VendorMaster.email,
+    VendorMaster.phone,
+    func.coalesce(func.nullif(VendorMaster.status, ""), "Active").label("status"),
+).order_by(VendorMaster.vendor_code)
+
+# walks the vendor_sku primary key in order
+_VENDOR_SKUS = select(VendorSku.vendor_id, VendorSku.sku_code).order_by(
+    VendorSku.vendor_id, VendorSku.sku_code
+)
 
 
 @router.get("", response_model=list[VendorOut])
-def list_vendors(db: Session = Depends(get_db)):
-    vendors = db.query(VendorMaster).order_by(VendorMaster.vendor_code).all()
-    out = []
+def list_vendors(request: Request, db: Session = Depends(get_db)):
+    return versioned_json(request, db, "vendor_master", lambda: _vendor_rows(db))
+
+
+def _vendor_rows(db: Session) -> list[dict]:
+    # two flat queries instead of ORM vendors + link objects
+    vendors = row_dicts(db.execute(_VENDOR_LIST))
+    skus: dict[int, list[str]] = {}
+    for vendor_id, sku in db.execute(_VENDOR_SKUS):
+        skus.setdefault(vendor_id, []).append(sku)
     for v in vendors:
-        out.append(
-            VendorOut(
-                id=v.id,
-                vendor_code=v.vendor_code,
-                vendor_name=v.vendor_name,
-                address=v.address,
-                email=v.email,
-                phone=v.phone,
-                tagged_skus=_str_to_skus(v.tagged_skus),
-                status=v.status or "Active",
-            )
-        )
-    return out
+        v["tagged_skus"] = skus.get(v["id"], [])
+    return vendors
+
+
+@router.get("/by-sku/{sku}", response_model=list[VendorOut])
+def vendors_by_sku(sku: str, db: Session = Depends(get_db)):
+    """Vendors tagged with this SKU (index lookup on vendor_sku.sku_code)."""
+    vendors = (
+        db.query(VendorMaster)
+        .join(VendorSku, VendorSku.vendor_id == VendorMaster.id)
+        .filter(VendorSku.sku_code == sku.strip())
+        .options(selectinload(VendorMaster.sku_links))
+        .order_by(VendorMaster.vendor_code)
+        .all()
+    )
+    return [_vendor_out(v) for v in vendors]
 
 
 @router.post("", response_model=VendorOut)
@@ -74,7 +116,6 @@ def create_vendor(payload: VendorCreate, db: Session = Depends(get_db)):
         code = _generate_vendor_code(db)
 
     sku_list = _normalize_skus(payload.tagged_skus)
-    tagged_skus_str = _skus_to_str(sku_list)
 
     v = VendorMaster(
         vendor_code=code,
@@ -82,9 +123,9 @@ def create_vendor(payload: VendorCreate, db: Session = Depends(get_db)):
         address=(payload.address or "").strip(),
         email=(payload.email or "").strip(),
         phone=(payload.phone or "").strip(),
-        tagged_skus=tagged_skus_str,
         status=(payload.status or "Active").strip(),
     )
+    _set_skus(v, sku_list)
 
     db.add(v)
     try:
@@ -96,16 +137,7 @@ def create_vendor(payload: VendorCreate, db: Session = Depends(get_db)):
 
     db.refresh(v)
 
-    return VendorOut(
-        id=v.id,
-        vendor_code=v.vendor_code,
-        vendor_name=v.vendor_name,
-        address=v.address,
-        email=v.email,
-        phone=v.phone,
-        tagged_skus=_str_to_skus(v.tagged_skus),
-        status=v.status or "Active",
-    )
+    return _vendor_out(v)
 
 
 @router.put("/{vendor_id}", response_model=VendorOut)
@@ -135,8 +167,7 @@ def update_vendor(vendor_id: int, payload: VendorCreate, db: Session = Depends(g
     v.phone = (payload.phone or "").strip()
     v.status = (payload.status or "Active").strip()
 
-    sku_list = _normalize_skus(payload.tagged_skus)
-    v.tagged_skus = _skus_to_str(sku_list)
+    _set_skus(v, _normalize_skus(payload.tagged_skus))
 
     try:
         db.commit()
@@ -146,16 +177,7 @@ def update_vendor(vendor_id: int, payload: VendorCreate, db: Session = Depends(g
 
     db.refresh(v)
 
-    return VendorOut(
-        id=v.id,
-        vendor_code=v.vendor_code,
-        vendor_name=v.vendor_name,
-        address=v.address,
-        email=v.email,
-        phone=v.phone,
-        tagged_skus=_str_to_skus(v.tagged_skus),
-        status=v.status or "Active",
-    )
+    return _vendor_out(v)
 
 
 @router.delete("/{vendor_id}")
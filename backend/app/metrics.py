@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# In-process request / SQL metrics, exported in Prometheus text format by
+# GET /api/metrics. Counters are per worker process (no shared state between
+# uvicorn workers), which is what a Prometheus scrape per target expects.
+
+# requests slower than this are logged with their SQL; 0 disables the slow log
+SLOW_REQUEST_MS = float(os.getenv("RETAILFLOW_SLOW_REQUEST_MS", "0"))
+# statements kept per request for the slow log
+SLOW_LOG_MAX_STATEMENTS = 50
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+slow_log = logging.getLogger("retailflow.slow_requests")
+
+
+class _Request:
+    __slots__ = ("sql_count", "sql_seconds", "statements")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        # (seconds, sql) pairs, only collected when the slow log is on
+        self.statements: Optional[list] = [] if SLOW_REQUEST_MS > 0 else None
+
+
+_current: ContextVar[Optional[_Request]] = ContextVar("retailflow_request_stats", default=None)
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, b in enumerate(self.bounds):
+            if value <= b:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        out, cumulative = [], 0
+        for b, c in zip(self.bounds, self.counts):
+            cumulative += c
+            out.append(f'{name}_bucket{{{labels},le="{b}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+class _RouteStats:
+    __slots__ = ("latency", "sql_count", "sql_seconds", "status")
+
+    def __init__(self):
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.sql_count = _Histogram(SQL_COUNT_BUCKETS)
+        self.sql_seconds = _Histogram(LATENCY_BUCKETS)
+        self.status: dict[int, int] = {}
+
+
+_lock = threading.Lock()
+_routes: dict[tuple[str, str], _RouteStats] = {}
+
+
+def _record(method: str, route: str, status: int, seconds: float, req: _Request) -> None:
+    with _lock:
+        stats = _routes.get((method, route))
+        if stats is None:
+            stats = _routes[(method, route)] = _RouteStats()
+        stats.latency.observe(seconds)
+        stats.sql_count.observe(req.sql_count)
+        stats.sql_seconds.observe(req.sql_seconds)
+        stats.status[status] = stats.status.get(status, 0) + 1
+
+
+# ---------- SQLAlchemy cursor hooks ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._retailflow_t0 = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    req = _current.get()
+    t0 = getattr(context, "_retailflow_t0", None)
+    if req is None or t0 is None:
+        return
+    elapsed = time.perf_counter() - t0
+    req.sql_count += 1
+    req.sql_seconds += elapsed
+    if req.statements is not None and len(req.statements) < SLOW_LOG_MAX_STATEMENTS:
+        req.statements.append((elapsed, statement))
+
+
+def instrument_engine(sync_engine) -> None:
+    """Count and time every statement run by requests on this (sync) engine."""
+    from sqlalchemy import event
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- ASGI middleware ----------
+
+class MetricsMiddleware:
+    """
+    Times each HTTP request until its last body chunk is sent (so streamed
+    responses are measured in full) and attributes the SQL run meanwhile.
+    Routes are labelled by their path template, e.g. /api/purchase-orders/{po_id}.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        req = _Request()
+        token = _current.set(req)
+        status = 500
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - t0
+            _current.reset(token)
+            _record(scope["method"], _route_template(scope), status, seconds, req)
+            if SLOW_REQUEST_MS > 0 and seconds * 1000 >= SLOW_REQUEST_MS:
+                _log_slow(scope["method"], scope["path"], status, seconds, req)
+
+
+def _route_template(scope) -> str:
+    """
+    '/api/vendors/by-sku/ABC' -> '/api/vendors/by-sku/{sku}', keeping the label
+    set bounded. On newer FastAPI the route's path_format is relative to its
+    included router, so the static prefix in front of it (root_path, router
+    prefixes) is the part of the request path before the route's own pattern
+    matches.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", None)
+    regex = getattr(route, "path_regex", None)
+    if template is None or regex is None:
+        return "unmatched"
+    path, root = scope["path"], scope.get("root_path", "")
+    if root and not path.startswith(root):  # servers differ on whether path includes root_path
+        path = root + path
+    start = 0
+    while start != -1:
+        if regex.match(path[start:]):
+            return path[:start] + template
+        start = path.find("/", start + 1)
+    return template
+
+
+def _log_slow(method: str, path: str, status: int, seconds: float, req: _Request) -> None:
+    lines = [
+        f"{method} {path} {status} took {seconds * 1000:.1f} ms "
+        f"({req.sql_count} statements, {req.sql_seconds * 1000:.1f} ms SQL)"
+    ]
+    for elapsed, sql in req.statements:
+        lines.append(f"  {elapsed * 1000:8.2f} ms  {' '.join(sql.split())}")
+    if req.sql_count > len(req.statements):
+        lines.append(f"  ... {req.sql_count - len(req.statements)} more")
+    slow_log.warning("\n".join(lines))
+
+
+# ---------- Prometheus exposition ----------
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    out = [
+        "# HELP retailflow_http_requests_total HTTP requests by route and status.",
+        "# TYPE retailflow_http_requests_total counter",
+    ]
+    histograms = (
+        ("retailflow_http_request_duration_seconds", "Request latency by route.", "latency"),
+        ("retailflow_sql_statements_per_request", "SQL statements issued per request.", "sql_count"),
+        ("retailflow_sql_seconds_per_request", "Time spent in SQL per request.", "sql_seconds"),
+    )
+    # render under the lock so every series in a scrape is from the same moment
+    with _lock:
+        routes = sorted(_routes.items())
+        for (method, route), stats in routes:
+            for code, n in sorted(stats.status.items()):
+                out.append(
+                    f'retailflow_http_requests_total{{method="{method}",'
+                    f'route="{_label(route)}",status="{code}"}} {n}'
+                )
+        for name, help_text, attr in histograms:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} histogram")
+            for (method, route), stats in routes:
+                labels = f'method="{method}",route="{_label(route)}"'
+                out.extend(getattr(stats, attr).lines(name, labels))
+    return "\n".join(out) + "\n"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from .db import Base
@@ -25,11 +25,11 @@ class ItemMaster(Base):
     id = Column(Integer, primary_key=True, index=True)
     sku_code = Column(String, unique=True, index=True, nullable=False)
 
-    brand = Column(String, nullable=True)
+    brand = Column(String, nullable=True, index=True)
     division = Column(String, nullable=True)
-    category = Column(String, nullable=True)
+    category = Column(String, nullable=True, index=True)
     sub_category = Column(String, nullable=True)
-    style = Column(String, nullable=True)
+    style = Column(String, nullable=True, index=True)
     color = Column(String, nullable=True)
     size = Column(String, nullable=True)
 
@@ -54,9 +54,26 @@ class VendorMaster(Base):
     email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
 
-    tagged_skus = Column(String, nullable=True)  # comma-separated
+    tagged_skus = Column(String, nullable=True)  # legacy comma-separated; migrated to vendor_sku
     status = Column(String, default="Active")
 
+    sku_links = relationship(
+        "VendorSku",
+        back_populates="vendor",
+        cascade="all, delete-orphan",
+        order_by="VendorSku.sku_code",
+    )
+
+
+# vendor <-> SKU tagging; PK serves vendor -> SKUs, ix_vendor_sku_sku_code serves SKU -> vendors
+class VendorSku(Base):
+    __tablename__ = "vendor_sku"
+
+    vendor_id = Column(Integer, ForeignKey("vendor_master.id"), primary_key=True)
+    sku_code = Column(String, primary_key=True, index=True)
+
+    vendor = relationship("VendorMaster", back_populates="sku_links")
+
 
 # ===================== PURCHASE ORDER =====================
 
@@ -64,14 +81,15 @@ class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    vendor_id = Column(Integer, nullable=False)
+    vendor_id = Column(Integer, nullable=False, index=True)
 
     po_number = Column(String, nullable=True)
-    po_date = Column(String, nullable=False)
-    expiry_date = Column(String, nullable=False)
+    po_date = Column(Date, nullable=False, index=True)
+    expiry_date = Column(Date, nullable=False, index=True)
     payment_terms = Column(String, nullable=True)
     remarks = Column(String, nullable=True)
     tax_mode = Column(String, nullable=False)
+    status = Column(String, default="OPEN", index=True)
 
     retailer_name = Column(String, nullable=False)
     retailer_address = Column(String, nullable=False)
@@ -83,6 +101,12 @@ class PurchaseOrder(Base):
     igst_total = Column(Float, default=0.0)
     grand_total = Column(Float, default=0.0)
 
+    # receipt counters, maintained by GRN posting (services/po_receipts.py)
+    ordered_qty = Column(Float, default=0.0)
+    received_qty = Column(Float, default=0.0)
+    accepted_qty = Column(Float, default=0.0)
+    outstanding_qty = Column(Float, default=0.0)
+
     lines = relationship(
         "PurchaseOrderLine",
         back_populates="po",
@@ -94,9 +118,9 @@ class PurchaseOrderLine(Base):
     __tablename__ = "purchase_order_lines"
 
     id = Column(Integer, primary_key=True, index=True)
-    po_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
+    po_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False, index=True)
 
-    sku_code = Column(String, nullable=False)
+    sku_code = Column(String, nullable=False, index=True)
     hsn_code = Column(String, nullable=True)
     description = Column(String, nullable=True)
 
@@ -113,6 +137,10 @@ class PurchaseOrderLine(Base):
     igst_amount = Column(Float, default=0.0)
     line_total = Column(Float, default=0.0)
 
+    # outstanding = max(qty - received_qty, 0)
+    received_qty = Column(Float, default=0.0)
+    accepted_qty = Column(Float, default=0.0)
+
     po = relationship("PurchaseOrder", back_populates="lines")
 
 
@@ -124,8 +152,8 @@ class GRN(Base):
     id = Column(Integer, primary_key=True, index=True)
     grn_number = Column(String, unique=True, index=True, nullable=False)
 
-    po_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
-    received_date = Column(String, nullable=False)
+    po_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False, index=True)
+    received_date = Column(Date, nullable=False, index=True)
     remarks = Column(String, nullable=True)
 
     lines = relationship(
@@ -165,11 +193,14 @@ class Sale(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     bill_number = Column(String, unique=True, index=True, nullable=False)
-    sale_date = Column(String, nullable=False)
+    sale_date = Column(Date, nullable=False, index=True)
+    store_code = Column(String, nullable=True)
+    # client-generated key of an offline bill; a re-sent bill is not ingested twice
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
 
-    customer_name = Column(String, nullable=True)
+    customer_name = Column(String, nullable=True, index=True)
     customer_email = Column(String, nullable=True)
-    customer_phone = Column(String, nullable=True)
+    customer_phone = Column(String, nullable=True, index=True)
 
     subtotal = Column(Float, default=0.0)
     tax_total = Column(Float, default=0.0)
@@ -186,9 +217,9 @@ class SaleLine(Base):
     __tablename__ = "sale_lines"
 
     id = Column(Integer, primary_key=True, index=True)
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
 
-    sku_code = Column(String, nullable=False)
+    sku_code = Column(String, nullable=False, index=True)
     description = Column(String, nullable=True)
     hsn_code = Column(String, nullable=True)
 
@@ -204,3 +235,124 @@ class SaleLine(Base):
     line_total = Column(Float, default=0.0)
 
     sale = relationship("Sale", back_populates="lines")
+
+
+# ===================== STOCK LEDGER =====================
+
+# Append-only: one row per document and SKU that moved stock (GRN accepted
+# qty in, sale qty out, signed), written in the same transaction as the
+# inventory_stock update. Summing a SKU's rows up to a date gives its stock
+# on that date.
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (Index("ix_stock_movements_sku_date", "sku_code", "movement_date"),)
+
+    id = Column(Integer, primary_key=True)
+    sku_code = Column(String, nullable=False)
+    movement_date = Column(Date, nullable=False, index=True)
+    qty = Column(Float, nullable=False)
+    source = Column(String, nullable=False)  # OPENING, GRN, SALE
+    ref_id = Column(Integer, nullable=True)  # grn.id / sales.id
+
+
+# Stock of every SKU with movements, at the end of each snapshot date, so
+# point-in-time reads replay only the movements after the nearest snapshot.
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    sku_code = Column(String, primary_key=True)
+    snapshot_date = Column(Date, primary_key=True, index=True)
+    qty = Column(Float, nullable=False, default=0.0)
+
+
+# Dates that have a complete snapshot.
+class StockSnapshotRun(Base):
+    __tablename__ = "stock_snapshot_runs"
+
+    snapshot_date = Column(Date, primary_key=True)
+
+
+# ===================== SALES ROLLUPS =====================
+
+# Per-day sums of sale lines, kept current by every sale write (services.
+# sales_rollups) so reports never scan sales / sale_lines. Amounts are
+# line_subtotal (pre-tax), line_tax and line_total sums.
+class SalesDailySku(Base):
+    __tablename__ = "sales_daily_sku"
+    __table_args__ = (Index("ix_sales_daily_sku_sku_date", "sku_code", "sale_date"),)
+
+    sale_date = Column(Date, primary_key=True)
+    sku_code = Column(String, primary_key=True)
+    qty = Column(Float, nullable=False, default=0.0)
+    subtotal = Column(Float, nullable=False, default=0.0)
+    tax = Column(Float, nullable=False, default=0.0)
+    total = Column(Float, nullable=False, default=0.0)
+
+
+# brand / category as on the item master when the sale was written ("" if unknown)
+class SalesDailyCategory(Base):
+    __tablename__ = "sales_daily_category"
+
+    sale_date = Column(Date, primary_key=True)
+    brand = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    qty = Column(Float, nullable=False, default=0.0)
+    subtotal = Column(Float, nullable=False, default=0.0)
+    tax = Column(Float, nullable=False, default=0.0)
+    total = Column(Float, nullable=False, default=0.0)
+
+
+class SalesDailyStore(Base):
+    __tablename__ = "sales_daily_store"
+
+    sale_date = Column(Date, primary_key=True)
+    store_code = Column(String, primary_key=True)  # "" for bills without a store
+    bills = Column(Integer, nullable=False, default=0)
+    qty = Column(Float, nullable=False, default=0.0)
+    subtotal = Column(Float, nullable=False, default=0.0)
+    tax = Column(Float, nullable=False, default=0.0)
+    total = Column(Float, nullable=False, default=0.0)
+
+
+# ===================== LOW STOCK INDEX =====================
+
+# SKUs with available_qty <= min_stock_level, maintained by services.low_stock
+# on every write that moves stock or thresholds.
+class LowStockItem(Base):
+    __tablename__ = "low_stock_items"
+
+    sku_code = Column(String, primary_key=True)
+    available_qty = Column(Float, default=0.0)
+    min_stock_level = Column(Integer, default=0)
+
+
+# ===================== DOCUMENT SEQUENCES =====================
+
+# Last number handed out per document prefix (GRN, BILL, V...) and store.
+# store_code "" is the shared, store-independent series.
+class DocumentSequence(Base):
+    __tablename__ = "document_sequences"
+
+    prefix = Column(String, primary_key=True)
+    store_code = Column(String, primary_key=True, default="")
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+# ===================== SCHEMA MIGRATIONS =====================
+
+# One-off data migrations already applied by init_db.
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    name = Column(String, primary_key=True)
+
+
+# ===================== TABLE VERSIONS =====================
+
+# Change counter per master-data table (item_master, hsn_master, vendor_master),
+# bumped in the same transaction as each write; drives the list ETags.
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
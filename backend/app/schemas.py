@@ -1,5 +1,6 @@
+from datetime import date
 from typing import List, Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ===================== HSN =====================
@@ -35,6 +36,7 @@ class ItemBase(BaseModel):
     hsn_code: Optional[str] = None
     status: str = "DRAFT"
     image_path: Optional[str] = None
+    min_stock_level: int = 10
 
 
 class ItemCreate(ItemBase):
@@ -97,8 +99,8 @@ class POLineCreate(BaseModel):
 
 class PurchaseOrderCreate(BaseModel):
     po_number: Optional[str] = None
-    po_date: str
-    expiry_date: str
+    po_date: date
+    expiry_date: date
     payment_terms: Optional[str] = None
     remarks: Optional[str] = None
     tax_mode: str
@@ -128,14 +130,17 @@ class PurchaseOrderLineOut(BaseModel):
     igst_amount: float
     line_total: float
 
+    received_qty: float = 0.0
+    accepted_qty: float = 0.0
+
     model_config = ConfigDict(from_attributes=True)
 
 
 class PurchaseOrderOut(BaseModel):
     id: int
     po_number: Optional[str] = None
-    po_date: str
-    expiry_date: str
+    po_date: date
+    expiry_date: date
     payment_terms: Optional[str] = None
     remarks: Optional[str] = None
     tax_mode: str
@@ -150,6 +155,12 @@ class PurchaseOrderOut(BaseModel):
     sgst_total: float
     igst_total: float
     grand_total: float
+    status: Optional[str] = "OPEN"
+
+    ordered_qty: float = 0.0
+    received_qty: float = 0.0
+    accepted_qty: float = 0.0
+    outstanding_qty: float = 0.0
 
     vendor_code: Optional[str] = None
     vendor_name: Optional[str] = None
@@ -159,6 +170,34 @@ class PurchaseOrderOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class POLineStatus(BaseModel):
+    id: int
+    sku_code: str
+    ordered_qty: float
+    received_qty: float
+    accepted_qty: float
+    outstanding_qty: float
+
+
+class POReceiptSummary(BaseModel):
+    id: int
+    po_number: Optional[str] = None
+    vendor_id: int
+    vendor_code: Optional[str] = None
+    po_date: date
+    expiry_date: date
+    status: Optional[str] = None
+
+    ordered_qty: float
+    received_qty: float
+    accepted_qty: float
+    outstanding_qty: float
+
+
+class POStatusOut(POReceiptSummary):
+    lines: List[POLineStatus] = []
+
+
 # ===================== GRN =====================
 
 class GRNLineCreate(BaseModel):
@@ -171,7 +210,7 @@ class GRNLineCreate(BaseModel):
 class GRNCreate(BaseModel):
     grn_number: Optional[str] = None
     po_id: int
-    received_date: str
+    received_date: date
     remarks: Optional[str] = None
 
     lines: List[GRNLineCreate]
@@ -190,7 +229,7 @@ class GRNOut(BaseModel):
     id: int
     grn_number: str
     po_id: int
-    received_date: str
+    received_date: date
     remarks: Optional[str] = None
 
     lines: List[GRNLineOut] = []
@@ -219,7 +258,10 @@ class SaleLineCreate(BaseModel):
 
 class SaleCreate(BaseModel):
     bill_number: Optional[str] = None
-    sale_date: str
+    sale_date: date
+    store_code: Optional[str] = None
+    # re-posting a sale with a key already ingested returns the stored sale
+    idempotency_key: Optional[str] = None
 
     customer_name: Optional[str] = None
     customer_email: Optional[str] = None
@@ -254,7 +296,9 @@ class SaleLineOut(BaseModel):
 class SaleOut(BaseModel):
     id: int
     bill_number: str
-    sale_date: str
+    sale_date: date
+    store_code: Optional[str] = None
+    idempotency_key: Optional[str] = None
 
     customer_name: Optional[str] = None
     customer_email: Optional[str] = None
@@ -267,3 +311,141 @@ class SaleOut(BaseModel):
     lines: List[SaleLineOut] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SaleBatchItem(SaleCreate):
+    idempotency_key: str
+
+
+class SaleBatchCreate(BaseModel):
+    sales: List[SaleBatchItem]
+
+
+class SaleBatchItemResult(BaseModel):
+    idempotency_key: str
+    status: str  # "created", "duplicate" (already ingested) or "rejected"
+    sale_id: Optional[int] = None
+    bill_number: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class SaleBatchResult(BaseModel):
+    created: int
+    duplicates: int
+    rejected: int
+    results: List[SaleBatchItemResult]
+
+
+# ===================== PRICING =====================
+
+class QuoteLine(BaseModel):
+    sku_code: Optional[str] = None
+    hsn_code: Optional[str] = None  # looked up from the item master when omitted
+    qty: float
+    rate: float
+
+    # used only when the HSN code is not in the HSN master
+    cgst_rate: float = 0.0
+    sgst_rate: float = 0.0
+    igst_rate: float = 0.0
+
+
+class QuoteDocument(BaseModel):
+    ref: Optional[str] = None  # echoed back, to match quotes to documents
+    tax_mode: str = "CGST_SGST"
+    lines: List[QuoteLine]
+
+
+class QuoteRequest(BaseModel):
+    documents: List[QuoteDocument]
+
+
+class QuotedLine(BaseModel):
+    sku_code: Optional[str] = None
+    hsn_code: Optional[str] = None
+    qty: float
+    rate: float
+
+    cgst_rate: float
+    sgst_rate: float
+    igst_rate: float
+
+    line_subtotal: float
+    cgst_amount: float
+    sgst_amount: float
+    igst_amount: float
+    line_tax: float
+    line_total: float
+
+
+class QuotedDocument(BaseModel):
+    ref: Optional[str] = None
+    tax_mode: str
+
+    subtotal: float
+    cgst_total: float
+    sgst_total: float
+    igst_total: float
+    tax_total: float
+    grand_total: float
+
+    lines: List[QuotedLine]
+
+
+class RepriceRequest(BaseModel):
+    target: str  # "sales" or "purchase_orders"
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    hsn_codes: Optional[List[str]] = None
+    dry_run: bool = False
+
+
+class RepriceResult(BaseModel):
+    target: str
+    lines_scanned: int
+    lines_changed: int
+    documents_changed: int
+    dry_run: bool
+    seconds: float
+
+
+# ===================== REPLENISHMENT =====================
+
+class ReplenishmentRunRequest(BaseModel):
+    as_of: Optional[date] = None  # default today; sales velocity is measured up to this day
+    velocity_days: int = Field(28, ge=1, le=365)
+    lead_time_days: int = Field(7, ge=0, le=365)
+    cover_days: int = Field(14, ge=0, le=365)
+
+    vendor_id: Optional[int] = None
+    brand: Optional[str] = None
+    category: Optional[str] = None
+
+    tax_mode: str = "CGST_SGST"
+    expiry_days: int = Field(30, ge=1, le=365)
+    # default to those on the most recent PO
+    retailer_name: Optional[str] = None
+    retailer_address: Optional[str] = None
+    retailer_gstin: Optional[str] = None
+
+    dry_run: bool = False
+
+
+class ReplenishmentPO(BaseModel):
+    id: Optional[int] = None  # None on a dry run
+    po_number: Optional[str] = None
+    vendor_id: int
+    vendor_code: Optional[str] = None
+    lines: int
+    qty: float
+    grand_total: float
+
+
+class ReplenishmentRunResult(BaseModel):
+    as_of: date
+    skus_scanned: int
+    skus_to_order: int
+    skus_without_vendor: int
+    purchase_orders: List[ReplenishmentPO]
+    dry_run: bool
+    seconds: float
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import HSNMaster, TableVersion
+
+# How often a worker re-reads the hsn_master version stamp. Writes through this
+# worker invalidate at once; other workers' writes are seen within this window.
+HSN_VERSION_CHECK_SECONDS = float(os.getenv("RETAILFLOW_HSN_VERSION_CHECK_SECONDS", "2"))
+
+
+class HsnRate(NamedTuple):
+    cgst_rate: float
+    sgst_rate: float
+    igst_rate: float
+
+
+class _Cache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version: int | None = None  # None = not loaded / invalidated
+        self.checked_at = 0.0
+        self.rates: dict[str, HsnRate] = {}
+
+
+_cache = _Cache()
+
+
+def _version(conn) -> int:
+    v = conn.execute(
+        select(TableVersion.version).where(TableVersion.table_name == "hsn_master")
+    ).scalar()
+    return v or 0
+
+
+def load_rates(conn) -> None:
+    """(Re)load the whole HSN master; `conn` is a Connection or Session."""
+    version = _version(conn)
+    rates = {
+        code: HsnRate(cgst or 0.0, sgst or 0.0, igst or 0.0)
+        for code, cgst, sgst, igst in conn.execute(
+            select(HSNMaster.hsn_code, HSNMaster.cgst_rate, HSNMaster.sgst_rate, HSNMaster.igst_rate)
+        )
+    }
+    with _cache.lock:
+        _cache.rates = rates
+        _cache.version = version
+        _cache.checked_at = time.monotonic()
+
+
+def invalidate() -> None:
+    """Call after committing an HSN write; the next get_rates() reloads."""
+    with _cache.lock:
+        _cache.version = None
+
+
+def get_rates(db: Session) -> dict[str, HsnRate]:
+    """
+    hsn_code -> HsnRate, for dictionary lookups per line. Costs nothing while
+    fresh, one version-stamp lookup per HSN_VERSION_CHECK_SECONDS, and a full
+    reload only when the stamp moved.
+    """
+    with _cache.lock:
+        version, checked_at, rates = _cache.version, _cache.checked_at, _cache.rates
+    if version is not None and time.monotonic() - checked_at < HSN_VERSION_CHECK_SECONDS:
+        return rates
+    if version is not None and _version(db) == version:
+        with _cache.lock:
+            _cache.checked_at = time.monotonic()
+        return rates
+    load_rates(db)
+    return _cache.rates
@@ -0,0 +1,128 @@
+import re
+from typing import Iterable
+
+from sqlalchemy import and_, bindparam, or_, text
+from sqlalchemy.orm import Session
+
+from ..models import ItemMaster
+
+# FTS5 table over the searchable item columns; rowid = item_master.id.
+# Maintained by the item routes (no triggers), rebuilt by init_db when out of step.
+# SQLite only: on other backends the maintenance calls are no-ops and search
+# falls back to prefix LIKE over the same columns.
+FTS_TABLE = "item_search"
+FTS_COLUMNS = ["sku_code", "brand", "category", "sub_category", "style", "color", "size"]
+
+_COLS = ", ".join(FTS_COLUMNS)
+_SELECT_COLS = ", ".join(f"coalesce({c}, '')" for c in FTS_COLUMNS)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_CHUNK = 500
+
+
+def create_item_search(conn) -> None:
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            + ", ".join(FTS_COLUMNS)
+            + ", prefix='2 3', tokenize='unicode61')"
+        )
+    )
+
+
+def rebuild_item_search(conn) -> None:
+    """
+    Full reindex unless the FTS rows match item_master exactly: same count
+    and every item's indexed columns as stored, so edits that keep the count
+    and writes made outside the item routes are caught too.
+    """
+    items = conn.execute(text("SELECT count(*) FROM item_master")).scalar_one()
+    indexed = conn.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar_one()
+    stale = conn.execute(
+        text(
+            f"SELECT 1 FROM (SELECT id, {_SELECT_COLS} FROM item_master "
+            f"EXCEPT SELECT rowid, {_COLS} FROM {FTS_TABLE}) LIMIT 1"
+        )
+    ).first()
+    if items == indexed and stale is None:
+        return
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    conn.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {_COLS}) SELECT id, {_SELECT_COLS} FROM item_master")
+    )
+
+
+def _fts(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def index_items(db: Session, items: Iterable[ItemMaster]) -> None:
+    """(Re)index the given items inside the caller's transaction."""
+    if not _fts(db):
+        return
+    db.flush()  # new items need their ids
+    rows = [
+        {"rowid": it.id, **{c: getattr(it, c) or "" for c in FTS_COLUMNS}}
+        for it in items
+    ]
+    if not rows:
+        return
+    unindex_items(db, [r["rowid"] for r in rows])
+    params = ", ".join(f":{c}" for c in FTS_COLUMNS)
+    db.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {_COLS}) VALUES (:rowid, {params})"), rows
+    )
+
+
+def index_item_rows(db: Session, first_id: int, last_id: int) -> None:
+    """
+    Index item_master rows first_id..last_id, every one of them new in the
+    caller's transaction (bulk import path).
+    """
+    if _fts(db):
+        db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, {_COLS}) "
+                f"SELECT id, {_SELECT_COLS} FROM item_master WHERE id BETWEEN :lo AND :hi"
+            ),
+            {"lo": first_id, "hi": last_id},
+        )
+
+
+def unindex_items(db: Session, item_ids: list[int]) -> None:
+    if item_ids and _fts(db):
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), [{"id": i} for i in item_ids])
+
+
+def fts_query(q: str) -> str | None:
+    """'nik blu' -> '"nik"* "blu"*' : every term must match, as a prefix."""
+    terms = _TOKEN.findall(q)
+    if not terms:
+        return None
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def search_items(db: Session, q: str, limit: int) -> list[ItemMaster]:
+    """Best bm25 matches first, ranked over every match."""
+    if not _fts(db):
+        return _like_search(db, q, limit)
+    match = fts_query(q)
+    if match is None:
+        return []
+    ids = db.execute(
+        text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q ORDER BY rank LIMIT :n"),
+        {"q": match, "n": limit},
+    ).scalars().all()
+    if not ids:
+        return []
+    by_id = {it.id: it for it in db.query(ItemMaster).filter(ItemMaster.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _like_search(db: Session, q: str, limit: int) -> list[ItemMaster]:
+    terms = _TOKEN.findall(q)
+    if not terms:
+        return []
+    cols = [getattr(ItemMaster, c) for c in FTS_COLUMNS]
+    cond = and_(*(or_(*(c.ilike(f"{t}%") for c in cols)) for t in terms))
+    return db.query(ItemMaster).filter(cond).order_by(ItemMaster.sku_code).limit(limit).all()
@@ -0,0 +1,64 @@
+from typing import Iterable
+
+from sqlalchemy import bindparam, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import InventoryStock, ItemMaster, LowStockItem
+
+# keep IN (...) lists well under SQLite's bound-parameter limit
+_CHUNK = 500
+
+
+def _low_stock_select():
+    avail = func.coalesce(InventoryStock.available_qty, 0)
+    min_lvl = func.coalesce(ItemMaster.min_stock_level, 0)
+    return (
+        select(ItemMaster.sku_code, avail, min_lvl)
+        .select_from(ItemMaster)
+        .outerjoin(InventoryStock, InventoryStock.sku_code == ItemMaster.sku_code)
+        .where(avail <= min_lvl)
+    )
+
+
+_LOW_STOCK_COLS = [LowStockItem.sku_code, LowStockItem.available_qty, LowStockItem.min_stock_level]
+_CLEAR = delete(LowStockItem).where(LowStockItem.sku_code.in_(bindparam("skus", expanding=True)))
+_REFILL = insert(LowStockItem).from_select(
+    _LOW_STOCK_COLS, _low_stock_select().where(ItemMaster.sku_code.in_(bindparam("skus", expanding=True)))
+)
+
+_ADD_RANGE = insert(LowStockItem).from_select(
+    _LOW_STOCK_COLS, _low_stock_select().where(ItemMaster.id.between(bindparam("lo"), bindparam("hi")))
+)
+
+
+def refresh_low_stock(db: Session, skus: Iterable[str]) -> None:
+    """
+    Re-evaluate the low-stock entry of the given SKUs only.
+    Runs inside the caller's transaction; cost is O(len(skus)).
+    """
+    skus = list(dict.fromkeys(s for s in skus if s))
+    if not skus:
+        return
+
+    # pending ORM changes (stock rows, item thresholds) must be visible to the SELECT
+    db.flush()
+
+    conn = db.connection()
+    for i in range(0, len(skus), _CHUNK):
+        chunk = {"skus": skus[i : i + _CHUNK]}
+        conn.execute(_CLEAR, chunk)
+        conn.execute(_REFILL, chunk)
+
+
+def add_low_stock_range(db: Session, first_id: int, last_id: int) -> None:
+    """
+    Entries for item_master rows first_id..last_id, every one of them new in
+    the caller's transaction (bulk import), so there is nothing to clear first.
+    """
+    db.connection().execute(_ADD_RANGE, {"lo": first_id, "hi": last_id})
+
+
+def rebuild_low_stock(conn) -> None:
+    """Full rebuild from item_master + inventory_stock (startup / repair)."""
+    conn.execute(delete(LowStockItem))
+    conn.execute(insert(LowStockItem).from_select(_LOW_STOCK_COLS, _low_stock_select()))
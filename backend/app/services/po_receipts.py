@@ -0,0 +1,199 @@
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from ..models import GRN, GRNLine, PurchaseOrder, PurchaseOrderLine
+
+# PO receipt counters: every PO line carries received_qty / accepted_qty and
+# every PO header the sums plus ordered_qty and outstanding_qty, so what is
+# still open on a PO is one row (or one PO's lines) to read, never a re-sum
+# of its GRNs. Posting a GRN allocates each SKU's received qty to that SKU's
+# PO lines in line order, refuses anything beyond what is outstanding, and
+# closes the PO once nothing is.
+
+OPEN, CLOSED = "OPEN", "CLOSED"
+
+# float slack when comparing quantities
+EPS = 1e-9
+
+_lines = PurchaseOrderLine.__table__
+_pos = PurchaseOrder.__table__
+
+
+class OverReceipt(Exception):
+    """
+    Raised when a GRN receives SKUs the PO does not have outstanding.
+    `problems` maps sku -> reason.
+    """
+
+    def __init__(self, problems: dict[str, str]):
+        super().__init__(problems)
+        self.problems = problems
+
+    def detail(self) -> str:
+        return "; ".join(f"{sku}: {msg}" for sku, msg in self.problems.items())
+
+
+def line_index(db: Session, po_id: int) -> dict[str, list[list]]:
+    """The PO's lines keyed by SKU, in line order, as [id, ordered, received]; one query."""
+    index: dict[str, list[list]] = {}
+    for line_id, sku, ordered, received in db.execute(
+        select(_lines.c.id, _lines.c.sku_code, _lines.c.qty, _lines.c.received_qty)
+        .where(_lines.c.po_id == po_id)
+        .order_by(_lines.c.id)
+    ):
+        index.setdefault(sku, []).append([line_id, ordered or 0.0, received or 0.0])
+    return index
+
+
+def allocate(index: dict, received_by_sku: dict[str, float], accepted_by_sku: dict[str, float]) -> list[dict]:
+    """
+    Split a GRN's per-SKU quantities over the PO lines in `index` (updated in
+    place). Raises OverReceipt, before anything is written, for SKUs not on
+    the PO or received beyond their outstanding qty.
+    """
+    problems = {}
+    for sku, qty in received_by_sku.items():
+        lines = index.get(sku)
+        if not lines:
+            problems[sku] = "not on this PO"
+            continue
+        open_qty = sum(max(ordered - received, 0.0) for _, ordered, received in lines)
+        if qty > open_qty + EPS:
+            problems[sku] = f"received {qty:g}, outstanding {open_qty:g}"
+    if problems:
+        raise OverReceipt(problems)
+
+    out = []
+    for sku, qty in received_by_sku.items():
+        accepted = accepted_by_sku.get(sku, 0.0)
+        for line in index[sku]:
+            take = min(qty, max(line[1] - line[2], 0.0))
+            if take <= EPS:
+                continue
+            acc = min(accepted, take)
+            out.append({"b_id": line[0], "b_rcv": take, "b_acc": acc})
+            line[2] += take
+            qty -= take
+            accepted -= acc
+            if qty <= EPS:
+                break
+    return out
+
+
+_RECEIVE = (
+    update(_lines)
+    .where(
+        _lines.c.id == bindparam("b_id"),
+        func.coalesce(_lines.c.received_qty, 0) + bindparam("b_rcv") <= _lines.c.qty + EPS,
+    )
+    .values(
+        received_qty=func.coalesce(_lines.c.received_qty, 0) + bindparam("b_rcv"),
+        accepted_qty=func.coalesce(_lines.c.accepted_qty, 0) + bindparam("b_acc"),
+    )
+)
+
+
+def apply_receipt(db: Session, po_id: int, allocations: list[dict]) -> None:
+    """
+    Add allocate()'s result to the PO's line and header counters in the
+    caller's transaction, each line guarded like deduct_stock:
+        ... WHERE id = :id AND received_qty + :qty <= qty
+    If another GRN got there first, rolls back and raises OverReceipt.
+    """
+    if not allocations:
+        return
+    conn = db.connection()
+    if conn.dialect.supports_sane_multi_rowcount:
+        applied = conn.execute(_RECEIVE, allocations).rowcount
+    else:
+        applied = sum(conn.execute(_RECEIVE, a).rowcount for a in allocations)
+    if applied != len(allocations):
+        db.rollback()
+        raise OverReceipt({f"PO {po_id}": "received by another GRN meanwhile; check its status and retry"})
+
+    received = sum(a["b_rcv"] for a in allocations)
+    accepted = sum(a["b_acc"] for a in allocations)
+    outstanding = _pos.c.outstanding_qty - received
+    conn.execute(
+        update(_pos)
+        .where(_pos.c.id == po_id)
+        .values(
+            received_qty=_pos.c.received_qty + received,
+            accepted_qty=_pos.c.accepted_qty + accepted,
+            outstanding_qty=case((outstanding > EPS, outstanding), else_=0.0),
+            status=case(((_pos.c.status == OPEN) & (outstanding <= EPS), CLOSED), else_=_pos.c.status),
+        )
+    )
+
+
+# ---------- one-off backfill ----------
+
+def backfill_receipts(conn) -> None:
+    """
+    Fill the counters from existing GRNs, allocated to PO lines as posting
+    would (historic over-receipts land on the SKU's last line), and close
+    OPEN POs with nothing outstanding.
+    """
+    got: dict[tuple[int, str], list[float]] = {
+        (po_id, sku): [rcv or 0.0, acc or 0.0]
+        for po_id, sku, rcv, acc in conn.execute(
+            select(GRN.po_id, GRNLine.sku_code, func.sum(GRNLine.received_qty), func.sum(GRNLine.accepted_qty))
+            .join(GRNLine, GRNLine.grn_id == GRN.id)
+            .group_by(GRN.po_id, GRNLine.sku_code)
+        )
+    }
+    by_key: dict[tuple[int, str], list] = {}
+    for line_id, po_id, sku, ordered in conn.execute(
+        select(_lines.c.id, _lines.c.po_id, _lines.c.sku_code, _lines.c.qty).order_by(_lines.c.id)
+    ):
+        if (po_id, sku) in got:
+            by_key.setdefault((po_id, sku), []).append((line_id, ordered or 0.0))
+
+    rows = []
+    for key, lines in by_key.items():
+        rcv, acc = got[key]
+        for k, (line_id, ordered) in enumerate(lines):
+            take = rcv if k == len(lines) - 1 else min(rcv, ordered)
+            a = acc if k == len(lines) - 1 else min(acc, take)
+            if take > 0 or a > 0:
+                rows.append({"b_id": line_id, "b_rcv": take, "b_acc": a})
+            rcv -= take
+            acc -= a
+    if rows:
+        conn.execute(
+            update(_lines)
+            .where(_lines.c.id == bindparam("b_id"))
+            .values(received_qty=bindparam("b_rcv"), accepted_qty=bindparam("b_acc")),
+            rows,
+        )
+
+    # headers from one grouped pass (the po_id index may not exist yet here)
+    left = _lines.c.qty - func.coalesce(_lines.c.received_qty, 0)
+    sums = (
+        select(
+            _lines.c.po_id.label("b_id"),
+            func.coalesce(func.sum(_lines.c.qty), 0.0).label("b_ord"),
+            func.coalesce(func.sum(_lines.c.received_qty), 0.0).label("b_rcv"),
+            func.coalesce(func.sum(_lines.c.accepted_qty), 0.0).label("b_acc"),
+            func.coalesce(func.sum(case((left > EPS, left), else_=0.0)), 0.0).label("b_out"),
+        )
+        .group_by(_lines.c.po_id)
+    )
+    headers = [dict(r._mapping) for r in conn.execute(sums)]
+    if headers:
+        conn.execute(
+            update(_pos)
+            .where(_pos.c.id == bindparam("b_id"))
+            .values(
+                ordered_qty=bindparam("b_ord"),
+                received_qty=bindparam("b_rcv"),
+                accepted_qty=bindparam("b_acc"),
+                outstanding_qty=bindparam("b_out"),
+            ),
+            headers,
+        )
+    conn.execute(
+        update(_pos)
+        .where(_pos.c.status == OPEN, _pos.c.outstanding_qty <= EPS, _pos.c.ordered_qty > 0)
+        .values(status=CLOSED)
+    )
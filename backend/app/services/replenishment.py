@@ -0,0 +1,338 @@
+import logging
+import math
+import os
+import threading
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal
+from ..models import (
+    InventoryStock, ItemMaster, PurchaseOrder, PurchaseOrderLine, SalesDailySku,
+    VendorMaster, VendorSku,
+)
+from .po_receipts import OPEN
+from .sequences import next_numbers
+from .tax_engine import INTRA, price_documents
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python loop over the catalog: same results, slower
+    np = None
+
+# Replenishment: for every SKU, with daily demand = units sold over the last
+# `velocity_days` / velocity_days (from the sales_daily_sku rollup),
+#   reorder point = min_stock_level + demand x lead_time_days
+#   order-up-to   = reorder point + demand x cover_days
+# and a SKU whose stock position (available + outstanding on OPEN POs) is at or
+# below its reorder point is ordered up to order-up-to. Each SKU goes to one
+# active vendor it is tagged to (the one it was last ordered from, else the
+# lowest vendor id) at that vendor's last PO rate (any vendor's, else 0 to be
+# filled in). A run writes one DRAFT PO per vendor and replaces the drafts of
+# the previous run; confirming a draft makes it OPEN.
+
+DRAFT = "DRAFT"
+
+DEFAULTS = {
+    "velocity_days": 28,
+    "lead_time_days": 7,
+    "cover_days": 14,
+    "expiry_days": 30,
+}
+
+# 0 = off; otherwise run with the defaults every N hours (single-process deployments)
+REPLENISHMENT_INTERVAL_HOURS = float(os.getenv("RETAILFLOW_REPLENISHMENT_INTERVAL_HOURS", "0"))
+
+_RETAILER_FIELDS = ("retailer_name", "retailer_address", "retailer_gstin")
+
+log = logging.getLogger("retailflow.replenishment")
+
+
+class ReplenishmentError(ValueError):
+    """A run that cannot write its drafts (e.g. no retailer details to put on them)."""
+
+
+# ---------- reorder maths ----------
+
+def reorder_quantities(available, min_level, on_order, sold, velocity_days, lead_time_days, cover_days):
+    """Whole units to order per SKU (0 = none); inputs are aligned per-SKU sequences."""
+    if np is None:
+        return _reorder_quantities_py(
+            available, min_level, on_order, sold, velocity_days, lead_time_days, cover_days
+        )
+    daily = np.asarray(sold, dtype=float) / velocity_days
+    reorder_point = np.asarray(min_level, dtype=float) + daily * lead_time_days
+    position = np.asarray(available, dtype=float) + np.asarray(on_order, dtype=float)
+    short = reorder_point + daily * cover_days - position
+    qty = np.ceil(short - 1e-9)
+    return np.where((position <= reorder_point) & (qty > 0), qty, 0.0)
+
+
+def _reorder_quantities_py(available, min_level, on_order, sold, velocity_days, lead_time_days, cover_days):
+    out = []
+    for avail, level, ordered, units in zip(available, min_level, on_order, sold):
+        daily = units / velocity_days
+        reorder_point = level + daily * lead_time_days
+        position = avail + ordered
+        qty = math.ceil(reorder_point + daily * cover_days - position - 1e-9)
+        out.append(float(qty) if position <= reorder_point and qty > 0 else 0.0)
+    return out
+
+
+# ---------- inputs ----------
+
+def _catalog(db: Session, brand: Optional[str], category: Optional[str]):
+    stmt = (
+        select(
+            ItemMaster.sku_code,
+            ItemMaster.hsn_code,
+            func.coalesce(ItemMaster.min_stock_level, 0),
+            func.coalesce(InventoryStock.available_qty, 0),
+        )
+        .outerjoin(InventoryStock, InventoryStock.sku_code == ItemMaster.sku_code)
+        .order_by(ItemMaster.sku_code)
+    )
+    if brand:
+        stmt = stmt.where(ItemMaster.brand == brand)
+    if category:
+        stmt = stmt.where(ItemMaster.category == category)
+    return db.connection().execute(stmt).all()
+
+
+def _sold(db: Session, first: date, last: date) -> dict[str, float]:
+    return dict(db.connection().execute(
+        select(SalesDailySku.sku_code, func.sum(SalesDailySku.qty))
+        .where(SalesDailySku.sale_date.between(first, last))
+        .group_by(SalesDailySku.sku_code)
+    ).all())
+
+
+def _on_order(db: Session) -> dict[str, float]:
+    """Per SKU: qty still outstanding on OPEN POs (PO line receipt counters)."""
+    left = PurchaseOrderLine.qty - func.coalesce(PurchaseOrderLine.received_qty, 0)
+    return dict(db.connection().execute(
+        select(PurchaseOrderLine.sku_code, func.sum(case((left > 0, left), else_=0)))
+        .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderLine.po_id)
+        .where(PurchaseOrder.status == OPEN, PurchaseOrder.outstanding_qty > 0)
+        .group_by(PurchaseOrderLine.sku_code)
+    ).all())
+
+
+def _suppliers(db: Session, skus: set[str]) -> dict[str, tuple[int, float]]:
+    """
+    sku -> (vendor_id, rate) for the SKUs being ordered; untagged SKUs are
+    left out. Reads only those SKUs' tags and their latest PO line per vendor.
+    """
+    conn = db.connection()
+    wanted = sorted(skus)
+    tagged: dict[str, list[int]] = {}
+    # latest non-draft PO line per (vendor, SKU): sku -> [(line id, vendor, rate)]
+    latest: dict[str, list[tuple]] = {}
+    for c in range(0, len(wanted), 500):
+        chunk = wanted[c:c + 500]
+        for vendor_id, sku in conn.execute(
+            select(VendorSku.vendor_id, VendorSku.sku_code)
+            .join(VendorMaster, VendorMaster.id == VendorSku.vendor_id)
+            .where(func.coalesce(VendorMaster.status, "Active") == "Active", VendorSku.sku_code.in_(chunk))
+        ):
+            tagged.setdefault(sku, []).append(vendor_id)
+
+        last_line = (
+            select(func.max(PurchaseOrderLine.id).label("id"))
+            .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderLine.po_id)
+            .where(PurchaseOrder.status != DRAFT, PurchaseOrderLine.sku_code.in_(chunk))
+            .group_by(PurchaseOrder.vendor_id, PurchaseOrderLine.sku_code)
+            .subquery()
+        )
+        for line_id, sku, vendor_id, rate in conn.execute(
+            select(PurchaseOrderLine.id, PurchaseOrderLine.sku_code, PurchaseOrder.vendor_id, PurchaseOrderLine.rate)
+            .join(last_line, last_line.c.id == PurchaseOrderLine.id)
+            .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderLine.po_id)
+        ):
+            latest.setdefault(sku, []).append((line_id, vendor_id, rate or 0.0))
+
+    # latest PO wins: the SKU's last vendor if still tagged, else the lowest
+    # tagged vendor id, at that vendor's last rate (else the SKU's last rate)
+    out = {}
+    for sku, vendors in tagged.items():
+        lines = latest.get(sku, [])
+        last = max(lines, default=None)
+        vendor_id = last[1] if last and last[1] in vendors else min(vendors)
+        rate = next((r for _, v, r in lines if v == vendor_id), last[2] if last else 0.0)
+        out[sku] = (vendor_id, rate)
+    return out
+
+
+def _retailer(db: Session) -> dict:
+    """Retailer details off the most recent PO, for drafts run without them."""
+    row = db.execute(
+        select(PurchaseOrder.retailer_name, PurchaseOrder.retailer_address, PurchaseOrder.retailer_gstin)
+        .order_by(PurchaseOrder.id.desc())
+        .limit(1)
+    ).first()
+    return dict(row._mapping) if row else {}
+
+
+# ---------- run ----------
+
+def run_replenishment(
+    db: Session,
+    as_of: Optional[date] = None,
+    velocity_days: int = DEFAULTS["velocity_days"],
+    lead_time_days: int = DEFAULTS["lead_time_days"],
+    cover_days: int = DEFAULTS["cover_days"],
+    vendor_id: Optional[int] = None,
+    brand: Optional[str] = None,
+    category: Optional[str] = None,
+    tax_mode: str = INTRA,
+    expiry_days: int = DEFAULTS["expiry_days"],
+    retailer: Optional[dict] = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    One pass over the catalog; writes and commits the draft POs unless
+    `dry_run`. `vendor_id` / `brand` / `category` narrow the run, and only
+    the previous drafts of `vendor_id` (or all) are replaced.
+    """
+    t0 = time.perf_counter()
+    as_of = as_of or date.today()
+
+    catalog = _catalog(db, brand, category)
+    skus = [r[0] for r in catalog]
+    sold = _sold(db, as_of - timedelta(days=velocity_days - 1), as_of)
+    on_order = _on_order(db)
+    qty = reorder_quantities(
+        [float(r[3]) for r in catalog],
+        [float(r[2]) for r in catalog],
+        [on_order.get(s, 0.0) for s in skus],
+        [sold.get(s, 0.0) for s in skus],
+        velocity_days, lead_time_days, cover_days,
+    )
+    if np is not None:
+        need = np.flatnonzero(qty).tolist()
+        qty = qty.tolist()
+    else:
+        need = [i for i, q in enumerate(qty) if q]
+
+    suppliers = _suppliers(db, {skus[i] for i in need})
+    by_vendor: dict[int, list[SimpleNamespace]] = {}
+    unassigned = 0
+    for i in need:
+        sku = skus[i]
+        if sku not in suppliers:
+            unassigned += 1
+            continue
+        vid, rate = suppliers[sku]
+        if vendor_id is None or vid == vendor_id:
+            by_vendor.setdefault(vid, []).append(SimpleNamespace(
+                sku_code=sku, hsn_code=catalog[i][1], qty=qty[i], rate=rate,
+                cgst_rate=0.0, sgst_rate=0.0, igst_rate=0.0,
+            ))
+
+    vendors = sorted(by_vendor)
+    codes = dict(db.execute(
+        select(VendorMaster.id, VendorMaster.vendor_code).where(VendorMaster.id.in_(vendors))
+    ).all()) if vendors else {}
+    priced = price_documents(db, [(by_vendor[v], tax_mode) for v in vendors])
+    orders = [
+        {
+            "id": None, "po_number": None, "vendor_id": v, "vendor_code": codes.get(v),
+            "lines": len(by_vendor[v]), "qty": sum(ln.qty for ln in by_vendor[v]),
+            "grand_total": totals["grand_total"],
+        }
+        for v, (_, totals) in zip(vendors, priced)
+    ]
+
+    if not dry_run:
+        retailer = {**_retailer(db), **(retailer or {})}
+        if vendors and not all(retailer.get(k) for k in _RETAILER_FIELDS):
+            raise ReplenishmentError("No retailer details: pass them or create a PO first")
+        _write_drafts(db, as_of, vendor_id, tax_mode, expiry_days, retailer, by_vendor, priced, orders,
+                      f"Replenishment {as_of}: lead {lead_time_days}d, cover {cover_days}d")
+
+    return {
+        "as_of": as_of,
+        "skus_scanned": len(skus),
+        "skus_to_order": len(need),
+        "skus_without_vendor": unassigned,
+        "purchase_orders": orders,
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def _write_drafts(db, as_of, vendor_id, tax_mode, expiry_days, retailer, by_vendor, priced, orders, remarks):
+    stale = [PurchaseOrder.status == DRAFT]
+    if vendor_id is not None:
+        stale.append(PurchaseOrder.vendor_id == vendor_id)
+    db.execute(
+        delete(PurchaseOrderLine)
+        .where(PurchaseOrderLine.po_id.in_(select(PurchaseOrder.id).where(*stale)))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(delete(PurchaseOrder).where(*stale).execution_options(synchronize_session=False))
+
+    pos = []
+    numbers = next_numbers(db, "PO", "", len(orders)) if orders else []
+    for order, number, (amounts, totals) in zip(orders, numbers, priced):
+        po = PurchaseOrder(
+            vendor_id=order["vendor_id"],
+            po_number=f"PO-{number:07d}",
+            po_date=as_of,
+            expiry_date=as_of + timedelta(days=expiry_days),
+            remarks=remarks,
+            tax_mode=tax_mode,
+            status=DRAFT,
+            retailer_name=retailer["retailer_name"],
+            retailer_address=retailer["retailer_address"],
+            retailer_gstin=retailer["retailer_gstin"],
+            subtotal=totals["subtotal"],
+            cgst_total=totals["cgst_total"],
+            sgst_total=totals["sgst_total"],
+            igst_total=totals["igst_total"],
+            grand_total=totals["grand_total"],
+            ordered_qty=order["qty"],
+            outstanding_qty=order["qty"],
+        )
+        for ln, a in zip(by_vendor[order["vendor_id"]], amounts):
+            fields = {**vars(ln), **a}
+            del fields["line_tax"]
+            po.lines.append(PurchaseOrderLine(**fields))
+        pos.append(po)
+
+    db.add_all(pos)
+    db.flush()
+    for order, po in zip(orders, pos):
+        order["id"], order["po_number"] = po.id, po.po_number
+    db.commit()
+
+
+# ---------- schedule ----------
+
+def _run_forever(interval_hours: float) -> None:
+    while True:
+        time.sleep(interval_hours * 3600)
+        try:
+            with SessionLocal() as db:
+                out = run_replenishment(db)
+            log.info(
+                "replenishment: %d SKUs to order, %d draft POs in %.1fs",
+                out["skus_to_order"], len(out["purchase_orders"]), out["seconds"],
+            )
+        except Exception:
+            log.exception("scheduled replenishment run failed")
+
+
+def start_scheduler() -> Optional[threading.Thread]:
+    """Background runs every RETAILFLOW_REPLENISHMENT_INTERVAL_HOURS (no-op when 0)."""
+    if REPLENISHMENT_INTERVAL_HOURS <= 0:
+        return None
+    thread = threading.Thread(
+        target=_run_forever, args=(REPLENISHMENT_INTERVAL_HOURS,), name="replenishment", daemon=True
+    )
+    thread.start()
+    return thread
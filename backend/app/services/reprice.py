@@ -0,0 +1,154 @@
+import time
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, update
+
+from ..models import PurchaseOrder, PurchaseOrderLine, Sale, SaleLine
+from . import hsn_rates, tax_engine
+from .sales_rollups import rebuild_rollups
+
+# Bulk re-price of historical lines against the current HSN master, e.g. after
+# a GST rate change. Lines are read in id order, CHUNK at a time, priced in one
+# tax_engine call per chunk, and only lines whose stored values differ are
+# written back, followed by their documents' header totals. Each chunk is its
+# own transaction, so a long run never holds the SQLite write lock for more
+# than one chunk and an interrupted run can simply be started again.
+
+CHUNK = 50_000
+
+# target -> (line table, header table, line -> header fk, header date column,
+#            stored line columns, header total -> line column it sums)
+_TARGETS = {
+    "sales": (
+        SaleLine, Sale, SaleLine.sale_id, Sale.sale_date,
+        ("cgst_rate", "sgst_rate", "igst_rate", "line_subtotal", "line_tax", "line_total"),
+        {"subtotal": "line_subtotal", "tax_total": "line_tax", "grand_total": "line_total"},
+    ),
+    "purchase_orders": (
+        PurchaseOrderLine, PurchaseOrder, PurchaseOrderLine.po_id, PurchaseOrder.po_date,
+        ("cgst_rate", "sgst_rate", "igst_rate", "line_subtotal",
+         "cgst_amount", "sgst_amount", "igst_amount", "line_total"),
+        {"subtotal": "line_subtotal", "cgst_total": "cgst_amount", "sgst_total": "sgst_amount",
+         "igst_total": "igst_amount", "grand_total": "line_total"},
+    ),
+}
+TARGETS = tuple(_TARGETS)
+
+
+def _changed(new: dict, old: list, stored: tuple) -> list[int]:
+    """Positions of lines whose priced values differ from the stored ones."""
+    if tax_engine.np is None:
+        return [
+            i for i in range(len(old[0]))
+            if any(abs((old[k][i] or 0.0) - new[f][i]) > 0.005 for k, f in enumerate(stored))
+        ]
+    np = tax_engine.np
+    diff = np.zeros(len(old[0]), dtype=bool)
+    for k, f in enumerate(stored):
+        was = np.array(old[k], dtype=np.float64)
+        diff |= np.abs(np.nan_to_num(was) - new[f]) > 0.005
+    return np.flatnonzero(diff).tolist()
+
+
+def reprice(
+    engine,
+    target: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    hsn_codes: Optional[list[str]] = None,
+    dry_run: bool = False,
+    chunk: int = CHUNK,
+) -> dict:
+    """
+    Re-price `target` ("sales" or "purchase_orders") lines dated within
+    [date_from, date_to], optionally only those with the given HSN codes.
+    Returns counts of lines scanned / changed and documents re-totalled.
+    """
+    line_t, head_t, fk, head_date, stored, totals = _TARGETS[target]
+    lines, heads = line_t.__table__, head_t.__table__
+    is_po = target == "purchase_orders"
+
+    cols = [line_t.id, fk, line_t.qty, line_t.rate, line_t.hsn_code]
+    cols += [getattr(line_t, c) for c in stored]
+    cols.append(head_date)
+    if is_po:
+        cols.append(PurchaseOrder.tax_mode)
+    base = select(*cols).join(head_t, head_t.id == fk)
+    if date_from:
+        base = base.where(head_date >= date_from)
+    if date_to:
+        base = base.where(head_date <= date_to)
+    if hsn_codes:
+        base = base.where(line_t.hsn_code.in_(hsn_codes))
+
+    write_lines = (
+        update(lines)
+        .where(lines.c.id == bindparam("_id"))
+        .values({c: bindparam(f"v_{c}") for c in stored})
+    )
+    line_sum = {
+        h: select(func.round(func.coalesce(func.sum(lines.c[src]), 0.0), 2))
+        .where(lines.c[fk.key] == heads.c.id)
+        .scalar_subquery()
+        for h, src in totals.items()
+    }
+    write_heads = update(heads).where(heads.c.id.in_(bindparam("ids", expanding=True))).values(line_sum)
+
+    t0 = time.perf_counter()
+    scanned = changed = 0
+    changed_docs: set[int] = set()  # a document's lines can straddle two chunks
+    changed_dates: set[date] = set()
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(base.where(line_t.id > last_id).order_by(line_t.id).limit(chunk)).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned += len(rows)
+
+            columns = list(zip(*rows))
+            ids, doc_ids, qty, rate, hsn = columns[:5]
+            old = columns[5:5 + len(stored)]
+            dates = columns[5 + len(stored)]
+            interstate = (
+                [tax_engine.is_interstate(m) for m in columns[-1]] if is_po else [False] * len(rows)
+            )
+            # stored rates stand in for HSN codes missing from the master
+            line_rates = list(zip(*([v or 0.0 for v in col] for col in old[:3])))
+
+            priced = tax_engine.price_lines(
+                [q or 0.0 for q in qty], [r or 0.0 for r in rate], hsn, interstate,
+                hsn_rates.get_rates(conn), line_rates,
+            )
+            hit = _changed(priced, old, stored)
+            if not hit:
+                continue
+            changed += len(hit)
+            touched = sorted({doc_ids[i] for i in hit})
+            changed_docs.update(touched)
+            if dry_run:
+                continue
+            changed_dates.update(dates[i] for i in hit)
+
+            new = tax_engine.as_lists({f: priced[f] for f in stored})
+            conn.execute(
+                write_lines,
+                [{"_id": ids[i], **{f"v_{f}": new[f][i] for f in stored}} for i in hit],
+            )
+            for i in range(0, len(touched), 500):
+                conn.execute(write_heads, {"ids": touched[i:i + 500]})
+
+    if target == "sales" and changed_dates:
+        # report rollups sum line amounts: recompute the days that moved
+        rebuild_rollups(engine, min(changed_dates), max(changed_dates))
+
+    return {
+        "target": target,
+        "lines_scanned": scanned,
+        "lines_changed": changed,
+        "documents_changed": len(changed_docs),
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
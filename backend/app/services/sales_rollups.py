@@ -0,0 +1,157 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..db import insert_for
+from ..models import ItemMaster, Sale, SaleLine, SalesDailyCategory, SalesDailySku, SalesDailyStore
+
+# Sales rollups: day x SKU, day x brand/category and day x store sums of sale
+# lines. Sale writes add their deltas with one upsert per table; the rebuild
+# recomputes a date range from sales / sale_lines, one window of
+# REBUILD_CHUNK_DAYS at a time.
+
+REBUILD_CHUNK_DAYS = 31
+
+_AMOUNTS = ("qty", "subtotal", "tax", "total")
+
+_sku = SalesDailySku.__table__
+_cat = SalesDailyCategory.__table__
+_store = SalesDailyStore.__table__
+
+
+# (dialect, table) -> upsert adding the row's amounts; built once, it runs on every sale
+_upserts: dict = {}
+
+
+def _upsert(conn, table, keys: tuple, rows: list[dict]) -> None:
+    if not rows:
+        return
+    stmt = _upserts.get((conn.dialect.name, table.name))
+    if stmt is None:
+        stmt = insert_for(conn)(table)
+        sums = [c.name for c in table.columns if c.name not in keys]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[k] for k in keys],
+            set_={c: table.c[c] + stmt.excluded[c] for c in sums},
+        )
+        _upserts[(conn.dialect.name, table.name)] = stmt
+    conn.execute(stmt, rows)
+
+
+def _add(bucket: dict, key, qty, subtotal, tax, total) -> dict:
+    row = bucket.get(key)
+    if row is None:
+        row = bucket[key] = dict.fromkeys(_AMOUNTS, 0.0)
+    row["qty"] += qty or 0.0
+    row["subtotal"] += subtotal or 0.0
+    row["tax"] += tax or 0.0
+    row["total"] += total or 0.0
+    return row
+
+
+def add_sales(db: Session, sales: list[Sale]) -> None:
+    """
+    Add freshly written sales (ORM objects with their lines) to the rollups,
+    in the caller's transaction: one item_master lookup and three upserts
+    however many sales.
+    """
+    if not sales:
+        return
+    skus = list({ln.sku_code for s in sales for ln in s.lines})
+    dims: dict[str, tuple[str, str]] = {}
+    for i in range(0, len(skus), 500):
+        for sku, brand, category in db.execute(
+            select(ItemMaster.sku_code, ItemMaster.brand, ItemMaster.category)
+            .where(ItemMaster.sku_code.in_(skus[i:i + 500]))
+        ):
+            dims[sku] = (brand or "", category or "")
+
+    by_sku: dict = {}
+    by_cat: dict = {}
+    by_store: dict = {}
+    for s in sales:
+        store = _add(by_store, (s.sale_date, s.store_code or ""), 0, 0, 0, 0)
+        store["bills"] = store.get("bills", 0) + 1
+        for ln in s.lines:
+            amounts = (ln.qty, ln.line_subtotal, ln.line_tax, ln.line_total)
+            _add(by_sku, (s.sale_date, ln.sku_code), *amounts)
+            _add(by_cat, (s.sale_date, *dims.get(ln.sku_code, ("", ""))), *amounts)
+            _add(by_store, (s.sale_date, s.store_code or ""), *amounts)
+
+    conn = db.connection()
+    _upsert(conn, _sku, ("sale_date", "sku_code"),
+            [{"sale_date": d, "sku_code": k, **v} for (d, k), v in by_sku.items()])
+    _upsert(conn, _cat, ("sale_date", "brand", "category"),
+            [{"sale_date": d, "brand": b, "category": c, **v} for (d, b, c), v in by_cat.items()])
+    _upsert(conn, _store, ("sale_date", "store_code"),
+            [{"sale_date": d, "store_code": k, **v} for (d, k), v in by_store.items()])
+
+
+# ---------- rebuild ----------
+
+def _sums():
+    return (
+        func.sum(SaleLine.qty), func.sum(SaleLine.line_subtotal),
+        func.sum(SaleLine.line_tax), func.sum(SaleLine.line_total),
+    )
+
+
+def _rebuild_window(conn, first: date, last: date) -> None:
+    in_window = Sale.sale_date.between(first, last)
+    for table in (_sku, _cat, _store):
+        conn.execute(delete(table).where(table.c.sale_date.between(first, last)))
+
+    lines = select(Sale.sale_date).join(SaleLine, SaleLine.sale_id == Sale.id).where(in_window)
+    conn.execute(insert(_sku).from_select(
+        ["sale_date", "sku_code", *_AMOUNTS],
+        lines.add_columns(SaleLine.sku_code, *_sums()).group_by(Sale.sale_date, SaleLine.sku_code),
+    ))
+    brand, category = func.coalesce(ItemMaster.brand, ""), func.coalesce(ItemMaster.category, "")
+    conn.execute(insert(_cat).from_select(
+        ["sale_date", "brand", "category", *_AMOUNTS],
+        lines.add_columns(brand, category, *_sums())
+        .outerjoin(ItemMaster, ItemMaster.sku_code == SaleLine.sku_code)
+        .group_by(Sale.sale_date, brand, category),
+    ))
+    store = func.coalesce(Sale.store_code, "")
+    conn.execute(insert(_store).from_select(
+        ["sale_date", "store_code", "bills", *_AMOUNTS],
+        lines.add_columns(store, func.count(distinct(Sale.id)), *_sums())
+        .group_by(Sale.sale_date, store),
+    ))
+
+
+def rebuild_rollups(bind, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+    """
+    Recompute the rollups for [date_from, date_to] (default: every sale) from
+    sales / sale_lines. With an Engine each window commits on its own; with a
+    Connection everything runs in the caller's transaction. Returns the
+    number of windows rebuilt.
+    """
+    def windows(conn):
+        lo, hi = conn.execute(select(func.min(Sale.sale_date), func.max(Sale.sale_date))).one()
+        first, last = date_from or lo, date_to or hi
+        if first is None or last is None:
+            return []
+        out = []
+        while first <= last:
+            end = min(last, first + timedelta(days=REBUILD_CHUNK_DAYS - 1))
+            out.append((first, end))
+            first = end + timedelta(days=1)
+        return out
+
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            todo = windows(conn)
+        for first, last in todo:
+            with bind.begin() as conn:
+                _rebuild_window(conn, first, last)
+        return len(todo)
+
+    todo = windows(bind)
+    for first, last in todo:
+        _rebuild_window(bind, first, last)
+    return len(todo)
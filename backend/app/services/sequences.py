@@ -0,0 +1,96 @@
+import threading
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..db import engine, insert_for
+from ..models import DocumentSequence
+
+
+def _bump(conn, prefix: str, store_code: str, count: int) -> int:
+    """Atomically add `count` to the series and return the new last value."""
+    table = DocumentSequence.__table__
+    stmt = insert_for(conn)(table).values(prefix=prefix, store_code=store_code, last_value=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.prefix, table.c.store_code],
+        set_={"last_value": table.c.last_value + stmt.excluded.last_value},
+    ).returning(table.c.last_value)
+    return conn.execute(stmt).scalar_one()
+
+
+def next_number(db: Session, prefix: str, store_code: str = "") -> int:
+    """
+    Gap-free: the increment lives in the caller's transaction, so a rolled-back
+    document also rolls back its number. Holds the write lock until commit.
+    """
+    return _bump(db.connection(), prefix, store_code, 1)
+
+
+def next_numbers(db: Session, prefix: str, store_code: str, count: int) -> range:
+    """`count` consecutive numbers in one round trip; gap-free like next_number()."""
+    last = _bump(db.connection(), prefix, store_code, count)
+    return range(last - count + 1, last + 1)
+
+
+def _holds_write_lock(db: Session) -> bool:
+    # pysqlite (and aiosqlite) only open their transaction at the first write,
+    # so an open driver transaction means this session has SQLite's write lock
+    if db.bind.dialect.name != "sqlite" or not db.in_transaction():
+        return False
+    return bool(getattr(db.connection().connection.driver_connection, "in_transaction", False))
+
+
+class BlockAllocator:
+    """
+    Hands out numbers from blocks reserved in their own short transaction, so
+    most documents need no extra query or lock. Numbers left in a block when the
+    worker exits, or handed to a request that then rolls back, are skipped (not
+    gap-free), and order across workers is only roughly increasing.
+
+    Because a block is reserved on a separate connection, take numbers before
+    the request's first write: on SQLite a session already holding the write
+    lock would wait on itself until busy_timeout. Pass that session as `db`
+    and every call checks it.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._blocks: dict[tuple[str, str], list[int]] = {}  # key -> [next, last]
+
+    def next(self, prefix: str, store_code: str = "", db: Session | None = None) -> int:
+        return self.take(prefix, store_code, 1, db)[0]
+
+    def take(self, prefix: str, store_code: str, count: int, db: Session | None = None) -> list[int]:
+        """`count` numbers, reserving one block big enough for the rest when the current one runs out."""
+        if db is not None and _holds_write_lock(db):
+            raise RuntimeError(f"{prefix} numbers must be taken before the transaction's first write")
+        key = (prefix, store_code)
+        with self._lock:
+            block = self._blocks.get(key)
+            numbers = []
+            if block is not None:
+                numbers = list(range(block[0], min(block[1], block[0] + count - 1) + 1))
+                block[0] += len(numbers)
+            if len(numbers) < count:
+                size = max(self.block_size, count - len(numbers))
+                with engine.begin() as conn:
+                    last = _bump(conn, prefix, store_code, size)
+                block = [last - size + 1, last]
+                self._blocks[key] = block
+                more = count - len(numbers)
+                numbers += range(block[0], block[0] + more)
+                block[0] += more
+            return numbers
+
+
+def seed_sequence(conn, prefix: str, id_column) -> None:
+    """
+    Start a series after the highest id already used by `id_column`'s table,
+    matching the old ORDER BY id DESC numbering. No-op once the series exists.
+    """
+    start = conn.execute(select(func.coalesce(func.max(id_column), 0))).scalar_one()
+    stmt = insert_for(conn)(DocumentSequence.__table__).values(
+        prefix=prefix, store_code="", last_value=start
+    )
+    conn.execute(stmt.on_conflict_do_nothing())
@@ -0,0 +1,101 @@
+from typing import Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from ..db import insert_for
+from ..models import InventoryStock
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when a conditional decrement could not be applied to every SKU.
+    `shortfalls` maps sku -> (available qty or None if there is no stock row, requested qty).
+    """
+
+    def __init__(self, shortfalls: dict[str, tuple[Optional[float], float]]):
+        super().__init__(shortfalls)
+        self.shortfalls = shortfalls
+
+    def detail(self) -> str:
+        msgs = []
+        for sku, (avail, qty) in self.shortfalls.items():
+            if avail is None:
+                msgs.append(f"No stock row for SKU {sku}")
+            else:
+                msgs.append(f"Insufficient stock for {sku}. Available={avail}, Sold={qty}")
+        return "; ".join(msgs)
+
+
+_DEDUCT = (
+    update(InventoryStock.__table__)
+    .where(
+        InventoryStock.__table__.c.sku_code == bindparam("b_sku"),
+        InventoryStock.__table__.c.available_qty >= bindparam("b_qty"),
+    )
+    .values(available_qty=InventoryStock.__table__.c.available_qty - bindparam("b_qty"))
+)
+
+
+def deduct_stock(db: Session, qty_by_sku: dict[str, float]) -> None:
+    """
+    Check-and-deduct in one batched conditional UPDATE:
+        UPDATE inventory_stock SET available_qty = available_qty - :qty
+        WHERE sku_code = :sku AND available_qty >= :qty
+    Runs in the caller's transaction. If any SKU is short, the transaction is
+    rolled back and InsufficientStock is raised, so stock is never oversold.
+    """
+    if not qty_by_sku:
+        return
+
+    params = [{"b_sku": sku, "b_qty": qty} for sku, qty in qty_by_sku.items()]
+    conn = db.connection()
+
+    if conn.dialect.supports_sane_multi_rowcount:
+        applied = conn.execute(_DEDUCT, params).rowcount
+    else:
+        applied = sum(conn.execute(_DEDUCT, p).rowcount for p in params)
+
+    if applied == len(params):
+        return
+
+    db.rollback()
+
+    rows = db.execute(
+        select(InventoryStock.sku_code, InventoryStock.available_qty).where(
+            InventoryStock.sku_code.in_(list(qty_by_sku))
+        )
+    ).all()
+    current = {sku: float(avail or 0) for sku, avail in rows}
+    shortfalls = {
+        sku: (current.get(sku), qty)
+        for sku, qty in qty_by_sku.items()
+        if current.get(sku) is None or current[sku] < qty
+    }
+    if not shortfalls:
+        # stock moved between the UPDATE and this read; report everything requested
+        shortfalls = {sku: (current.get(sku), qty) for sku, qty in qty_by_sku.items()}
+    raise InsufficientStock(shortfalls)
+
+
+def add_stock(db: Session, qty_by_sku: dict[str, float]) -> None:
+    """
+    Batched upsert of received quantities:
+        INSERT INTO inventory_stock (sku_code, available_qty) VALUES (...)
+        ON CONFLICT(sku_code) DO UPDATE SET available_qty = available_qty + excluded.available_qty
+    Runs in the caller's transaction.
+    """
+    if not qty_by_sku:
+        return
+
+    table = InventoryStock.__table__
+    conn = db.connection()
+    stmt = insert_for(conn)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.sku_code],
+        set_={"available_qty": table.c.available_qty + stmt.excluded.available_qty},
+    )
+    conn.execute(
+        stmt,
+        [{"sku_code": sku, "available_qty": qty} for sku, qty in qty_by_sku.items()],
+    )
@@ -0,0 +1,279 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import Date, Float, String, bindparam, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..db import engine, insert_for
+from ..models import (
+    GRN, GRNLine, InventoryStock, Sale, SaleLine, StockMovement, StockSnapshot, StockSnapshotRun,
+)
+
+# Point-in-time stock: qty(sku, D) = its row in the latest snapshot on or
+# before D + its movements after that snapshot, up to D. Invariant: a snapshot
+# date S has a row for every SKU with a movement dated <= S, so a missing row
+# means zero. Movements dated on or before an existing snapshot (offline bills,
+# late GRNs) are added to every snapshot from their date on, in the same
+# transaction, which keeps the invariant without re-snapshotting.
+
+OPENING, GRN_IN, SALE_OUT = "OPENING", "GRN", "SALE"
+
+# how often a running server looks for a month-end snapshot that came due
+# (0 = only at startup)
+SNAPSHOT_CHECK_MINUTES = float(os.getenv("RETAILFLOW_SNAPSHOT_CHECK_MINUTES", "60"))
+
+log = logging.getLogger(__name__)
+
+_mv = StockMovement.__table__
+_snap = StockSnapshot.__table__
+_runs = StockSnapshotRun.__table__
+
+
+def latest_run_query(on_or_before: Optional[date] = None):
+    stmt = select(func.max(_runs.c.snapshot_date))
+    if on_or_before is not None:
+        stmt = stmt.where(_runs.c.snapshot_date <= on_or_before)
+    return stmt
+
+
+def _latest_run(conn, on_or_before: Optional[date] = None) -> Optional[date]:
+    return conn.execute(latest_run_query(on_or_before)).scalar()
+
+
+def record_movements(db: Session, rows: list[dict]) -> None:
+    """
+    Append movements (sku_code, movement_date, qty signed, source, ref_id) in
+    the caller's transaction. Two statements normally; one more when some are
+    dated on or before the latest snapshot.
+    """
+    rows = [r for r in rows if r["qty"]]
+    if not rows:
+        return
+    conn = db.connection()
+    conn.execute(insert(_mv), rows)
+
+    latest = _latest_run(conn)
+    backdated = [r for r in rows if latest is not None and r["movement_date"] <= latest]
+    if not backdated:
+        return
+    stmt = insert_for(conn)(_snap).from_select(
+        ["sku_code", "snapshot_date", "qty"],
+        select(
+            bindparam("a_sku", type_=String), _runs.c.snapshot_date, bindparam("a_qty", type_=Float)
+        ).where(_runs.c.snapshot_date >= bindparam("a_date", type_=Date)),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_snap.c.sku_code, _snap.c.snapshot_date],
+        set_={"qty": _snap.c.qty + stmt.excluded.qty},
+    )
+    conn.execute(
+        stmt,
+        [{"a_sku": r["sku_code"], "a_date": r["movement_date"], "a_qty": r["qty"]} for r in backdated],
+    )
+
+
+def document_movements(movement_date: date, source: str, ref_id: int, qty_by_sku: dict) -> list[dict]:
+    """Rows for one document; `qty_by_sku` is signed (negative = stock out)."""
+    return [
+        {"sku_code": sku, "movement_date": movement_date, "qty": qty, "source": source, "ref_id": ref_id}
+        for sku, qty in qty_by_sku.items()
+    ]
+
+
+# ---------- snapshots ----------
+
+def take_snapshot(conn, snapshot_date: date) -> int:
+    """
+    Snapshot every SKU's stock at the end of `snapshot_date`: the previous
+    snapshot plus the movements in between, set-based. Re-taking a date
+    replaces it. Returns the number of SKU rows written.
+    """
+    prev = _latest_run(conn, snapshot_date - timedelta(days=1))
+    tail = select(_mv.c.sku_code, _mv.c.qty.label("q")).where(_mv.c.movement_date <= snapshot_date)
+    parts = [tail]
+    if prev is not None:
+        parts[0] = tail.where(_mv.c.movement_date > prev)
+        parts.append(select(_snap.c.sku_code, _snap.c.qty.label("q")).where(_snap.c.snapshot_date == prev))
+    u = union_all(*parts).subquery()
+
+    conn.execute(delete(_snap).where(_snap.c.snapshot_date == snapshot_date))
+    conn.execute(delete(_runs).where(_runs.c.snapshot_date == snapshot_date))
+    written = conn.execute(
+        insert(_snap).from_select(
+            ["sku_code", "snapshot_date", "qty"],
+            select(u.c.sku_code, literal(snapshot_date, Date), func.sum(u.c.q)).group_by(u.c.sku_code),
+        )
+    ).rowcount
+    conn.execute(insert(_runs).values(snapshot_date=snapshot_date))
+    return written
+
+
+def _month_end(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def ensure_monthly_snapshots(conn, today: Optional[date] = None) -> list[date]:
+    """
+    Take the month-end snapshots that are missing after the latest one, up
+    to the last month that has fully ended. Run at startup and by
+    start_snapshot_scheduler(); idempotent, one query when none are due.
+    """
+    today = today or date.today()
+    latest = _latest_run(conn)
+    if latest is None:
+        latest = conn.execute(select(func.min(_mv.c.movement_date))).scalar()
+        if latest is None:
+            return []
+        latest -= timedelta(days=1)
+
+    taken = []
+    d = _month_end(latest + timedelta(days=1))
+    while d < today:
+        take_snapshot(conn, d)
+        taken.append(d)
+        d = _month_end(d + timedelta(days=1))
+    return taken
+
+
+def _snapshot_forever(interval_minutes: float) -> None:
+    while True:
+        time.sleep(interval_minutes * 60)
+        try:
+            with engine.begin() as conn:
+                taken = ensure_monthly_snapshots(conn)
+            if taken:
+                log.info("stock snapshots taken for %s", ", ".join(d.isoformat() for d in taken))
+        except Exception:
+            log.exception("month-end stock snapshot failed")
+
+
+def start_snapshot_scheduler() -> Optional[threading.Thread]:
+    """Check for due month-end snapshots every RETAILFLOW_SNAPSHOT_CHECK_MINUTES (no-op when 0)."""
+    if SNAPSHOT_CHECK_MINUTES <= 0:
+        return None
+    thread = threading.Thread(
+        target=_snapshot_forever, args=(SNAPSHOT_CHECK_MINUTES,), name="stock-snapshots", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+# ---------- reads ----------
+
+def as_of_query(
+    as_of: date,
+    base: Optional[date],
+    sku_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """
+    (sku_code, qty) at the end of `as_of`, ordered by SKU: snapshot `base`
+    (latest_run_query(as_of), or None) plus the movements after it.
+    `cursor` = last SKU of the previous page.
+    """
+    def narrow(stmt, col):
+        if sku_code is not None:
+            stmt = stmt.where(col == sku_code)
+        if cursor is not None:
+            stmt = stmt.where(col > cursor)
+        return stmt
+
+    tail = select(_mv.c.sku_code, _mv.c.qty.label("q")).where(_mv.c.movement_date <= as_of)
+    parts = []
+    if base is not None:
+        tail = tail.where(_mv.c.movement_date > base)
+        parts.append(narrow(
+            select(_snap.c.sku_code, _snap.c.qty.label("q")).where(_snap.c.snapshot_date == base),
+            _snap.c.sku_code,
+        ))
+    parts.append(narrow(tail, _mv.c.sku_code))
+
+    u = union_all(*parts).subquery()
+    stmt = (
+        select(u.c.sku_code, func.sum(u.c.q).label("qty"))
+        .group_by(u.c.sku_code)
+        .order_by(u.c.sku_code)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def stock_as_of(
+    conn,
+    as_of: date,
+    sku_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """
+    Rows of as_of_query(); reads one snapshot and only the movements after it.
+    """
+    return conn.execute(as_of_query(as_of, _latest_run(conn, as_of), sku_code, cursor, limit))
+
+
+def ledger_differences(conn) -> list[dict]:
+    """SKUs whose current inventory_stock differs from the ledger's total."""
+    ledger = stock_as_of(conn, date.max).all()
+    current = dict(conn.execute(select(InventoryStock.sku_code, InventoryStock.available_qty)).all())
+    out = []
+    for sku, qty in ledger:
+        have = float(current.pop(sku, None) or 0)
+        if abs(have - qty) > 1e-6:
+            out.append({"sku_code": sku, "available_qty": have, "ledger_qty": qty})
+    out.extend(
+        {"sku_code": sku, "available_qty": float(q), "ledger_qty": 0.0}
+        for sku, q in current.items() if q
+    )
+    return sorted(out, key=lambda r: r["sku_code"])
+
+
+# ---------- one-off backfill ----------
+
+def backfill_ledger(conn) -> None:
+    """
+    Build the ledger from existing GRNs and sales, plus one OPENING movement
+    per SKU for whatever current stock they do not explain (dated on the
+    first document, or today on an empty database).
+    """
+    conn.execute(insert(_mv).from_select(
+        ["sku_code", "movement_date", "qty", "source", "ref_id"],
+        select(
+            GRNLine.sku_code, GRN.received_date, func.sum(GRNLine.accepted_qty),
+            literal(GRN_IN), GRN.id,
+        )
+        .join(GRN, GRN.id == GRNLine.grn_id)
+        .where(GRNLine.accepted_qty > 0)
+        .group_by(GRN.id, GRNLine.sku_code),
+    ))
+    conn.execute(insert(_mv).from_select(
+        ["sku_code", "movement_date", "qty", "source", "ref_id"],
+        select(
+            SaleLine.sku_code, Sale.sale_date, -func.sum(SaleLine.qty), literal(SALE_OUT), Sale.id,
+        )
+        .join(Sale, Sale.id == SaleLine.sale_id)
+        .where(SaleLine.qty > 0)
+        .group_by(Sale.id, SaleLine.sku_code),
+    ))
+
+    first = conn.execute(select(func.min(_mv.c.movement_date))).scalar() or date.today()
+    net = (
+        select(_mv.c.sku_code, func.sum(_mv.c.qty).label("q"))
+        .group_by(_mv.c.sku_code)
+        .subquery()
+    )
+    opening = InventoryStock.available_qty - func.coalesce(net.c.q, 0)
+    conn.execute(insert(_mv).from_select(
+        ["sku_code", "movement_date", "qty", "source", "ref_id"],
+        select(
+            InventoryStock.sku_code, literal(first, Date), opening, literal(OPENING),
+            literal(None, type_=_mv.c.ref_id.type),
+        )
+        .outerjoin(net, net.c.sku_code == InventoryStock.sku_code)
+        .where(func.abs(opening) > 1e-9),
+    ))
@@ -0,0 +1,72 @@
+import secrets
+import weakref
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..db import insert_for
+from ..models import TableVersion
+
+VERSIONED_TABLES = ("item_master", "hsn_master", "vendor_master")
+
+# written table -> version it moves; vendor_sku rows are part of the vendor list
+_VERSION_OF = {**{t: t for t in VERSIONED_TABLES}, "vendor_sku": "vendor_master"}
+
+
+def _bump(conn, table_name: str) -> None:
+    """+1 in the connection's transaction, so the new version commits with the write."""
+    table = TableVersion.__table__
+    # a counter missing from an unseeded database starts at a random value, as in seed_versions
+    stmt = insert_for(conn)(table).values(table_name=table_name, version=secrets.randbelow(2**31))
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.table_name],
+            set_={"version": table.c.version + 1},
+        )
+    )
+
+
+@event.listens_for(Engine, "before_execute")
+def _bump_on_write(conn, clauseelement, multiparams, params, execution_options):
+    """
+    Every INSERT / UPDATE / DELETE on a versioned table (ORM flush or Core, any
+    route, job or script) bumps its version once per transaction, in that
+    transaction, so no write path can leave a cached list body current.
+    """
+    if not getattr(clauseelement, "is_dml", False):
+        return
+    name = _VERSION_OF.get(getattr(clauseelement.table, "name", None))
+    if name is None:
+        return
+    txn = conn.get_transaction()
+    ref, bumped = conn.info.get("bumped_versions", (None, set()))
+    if txn is not None and ref is not None and ref() is txn and name in bumped:
+        return
+    _bump(conn, name)
+    txn = conn.get_transaction()
+    if ref is None or ref() is not txn:
+        bumped = set()
+        conn.info["bumped_versions"] = (weakref.ref(txn), bumped)
+    bumped.add(name)
+
+
+def current_version(db: Session, table_name: str) -> int:
+    """One primary-key lookup; never reads the versioned table itself."""
+    v = db.execute(
+        select(TableVersion.version).where(TableVersion.table_name == table_name)
+    ).scalar()
+    return v or 0
+
+
+def seed_versions(conn) -> None:
+    """
+    Start each counter at a random value, so a recreated database never
+    reuses the ETags clients cached against the old one. No-op once seeded.
+    """
+    table = TableVersion.__table__
+    stmt = insert_for(conn)(table).on_conflict_do_nothing()
+    conn.execute(
+        stmt,
+        [{"table_name": t, "version": secrets.randbelow(2**31)} for t in VERSIONED_TABLES],
+    )
@@ -0,0 +1,203 @@
+import math
+from typing import Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import ItemMaster
+from . import hsn_rates
+from .hsn_rates import HsnRate
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python loops: same results, ~50x slower on big batches
+    np = None
+
+# GST amounts for many lines at once. Rates come from the HSN master
+# (hsn_rates.get_rates); a line whose HSN is unknown keeps the rates it was
+# sent with. Intra-state documents (tax_mode CGST_SGST) charge CGST + SGST,
+# inter-state ones (IGST) charge IGST only; the unused rates are stored as 0.
+# Every amount is rounded half-up to paise per line, headers are sums of lines.
+
+INTRA = "CGST_SGST"
+INTER = "IGST"
+
+LINE_FIELDS = (
+    "cgst_rate", "sgst_rate", "igst_rate",
+    "line_subtotal", "cgst_amount", "sgst_amount", "igst_amount", "line_tax", "line_total",
+)
+TOTAL_FIELDS = ("subtotal", "cgst_total", "sgst_total", "igst_total", "tax_total", "grand_total")
+# header total <- line amount it sums
+_TOTAL_OF = dict(zip(TOTAL_FIELDS, ("line_subtotal", "cgst_amount", "sgst_amount",
+                                     "igst_amount", "line_tax", "line_total")))
+
+
+def is_interstate(tax_mode: Optional[str]) -> bool:
+    return (tax_mode or "").strip().upper() in (INTER, "INTER", "INTERSTATE")
+
+
+# ---------- rate lookup table ----------
+
+# (rates dict it was built from, hsn_code -> row, rows + trailing zero row);
+# rebuilt when hsn_rates hands out a new dict after a reload
+_table: tuple = (None, {}, None)
+
+
+def _rate_table(rates: dict[str, HsnRate]):
+    global _table
+    if _table[0] is not rates:
+        index = {code: i for i, code in enumerate(rates)}
+        rows = np.array(list(rates.values()) + [(0.0, 0.0, 0.0)], dtype=np.float64).reshape(-1, 3)
+        _table = (rates, index, rows)
+    return _table[1], _table[2]
+
+
+def _round2(a):
+    # half-up on the absolute value; the epsilon absorbs binary noise
+    # (1.005 * 100 == 100.49999999999999)
+    return np.copysign(np.floor(np.abs(a) * 100 + 0.5 + 1e-7) / 100, a)
+
+
+def _round2_py(x: float) -> float:
+    return math.copysign(math.floor(abs(x) * 100 + 0.5 + 1e-7) / 100, x)
+
+
+# ---------- lines ----------
+
+def price_lines(
+    qty: Sequence[float],
+    rate: Sequence[float],
+    hsn_codes: Sequence[Optional[str]],
+    interstate: Sequence[bool],
+    rates: dict[str, HsnRate],
+    line_rates: Optional[Sequence[Sequence[float]]] = None,
+) -> dict:
+    """
+    Amounts for n lines, one entry per line in every LINE_FIELDS column.
+    `interstate` is per line so lines of several documents can be priced in
+    one call; `line_rates` are the (cgst, sgst, igst) rates sent with each
+    line, used when its HSN is not in `rates`. Columns are ndarrays when
+    NumPy is installed, lists otherwise.
+    """
+    if np is None:
+        return _price_lines_py(qty, rate, hsn_codes, interstate, rates, line_rates)
+
+    n = len(qty)
+    index, table = _rate_table(rates)
+    pos = np.fromiter((index.get(h, -1) for h in hsn_codes), dtype=np.int64, count=n)
+    r = table[pos]  # -1 picks the zero row
+    if line_rates is not None:
+        unknown = pos < 0
+        if unknown.any():
+            r[unknown] = np.asarray(line_rates, dtype=np.float64).reshape(-1, 3)[unknown]
+
+    inter = np.asarray(interstate, dtype=bool)
+    cgst_rate = np.where(inter, 0.0, r[:, 0])
+    sgst_rate = np.where(inter, 0.0, r[:, 1])
+    igst_rate = np.where(inter, r[:, 2], 0.0)
+
+    subtotal = _round2(np.asarray(qty, dtype=np.float64) * np.asarray(rate, dtype=np.float64))
+    cgst = _round2(subtotal * cgst_rate / 100)
+    sgst = _round2(subtotal * sgst_rate / 100)
+    igst = _round2(subtotal * igst_rate / 100)
+    tax = cgst + sgst + igst
+    return dict(zip(LINE_FIELDS, (
+        cgst_rate, sgst_rate, igst_rate, subtotal, cgst, sgst, igst, tax, subtotal + tax,
+    )))
+
+
+def _price_lines_py(qty, rate, hsn_codes, interstate, rates, line_rates) -> dict:
+    out = {f: [] for f in LINE_FIELDS}
+    for i, (q, p, h, inter) in enumerate(zip(qty, rate, hsn_codes, interstate)):
+        c, s, g = rates.get(h) or (line_rates[i] if line_rates is not None else (0.0, 0.0, 0.0))
+        c, s, g = (0.0, 0.0, g) if inter else (c, s, 0.0)
+        sub = _round2_py(q * p)
+        ca, sa, ga = _round2_py(sub * c / 100), _round2_py(sub * s / 100), _round2_py(sub * g / 100)
+        tax = ca + sa + ga
+        for f, v in zip(LINE_FIELDS, (c, s, g, sub, ca, sa, ga, tax, sub + tax)):
+            out[f].append(v)
+    return out
+
+
+def document_totals(doc_index: Sequence[int], lines: dict, n_docs: int) -> dict:
+    """Per-document sums of priced lines; doc_index[i] is line i's document (0..n_docs-1)."""
+    if np is None:
+        out = {f: [0.0] * n_docs for f in TOTAL_FIELDS}
+        for f, src in _TOTAL_OF.items():
+            col = out[f]
+            for d, v in zip(doc_index, lines[src]):
+                col[d] += v
+        return {f: [round(v, 2) for v in col] for f, col in out.items()}
+    doc = np.asarray(doc_index, dtype=np.int64)
+    # sums of paise amounts: round away the float drift
+    return {
+        f: np.round(np.bincount(doc, weights=lines[src], minlength=n_docs), 2)
+        for f, src in _TOTAL_OF.items()
+    }
+
+
+def as_lists(columns: dict) -> dict[str, list]:
+    return {k: (v.tolist() if hasattr(v, "tolist") else list(v)) for k, v in columns.items()}
+
+
+def line_dicts(columns: dict) -> list[dict]:
+    """Column dict -> one dict per line (for building ORM rows / responses)."""
+    cols = as_lists(columns)
+    keys = list(cols)
+    return [dict(zip(keys, vals)) for vals in zip(*cols.values())]
+
+
+# ---------- HSN resolution ----------
+
+def hsn_for_skus(db: Session, skus) -> dict[str, str]:
+    """sku_code -> hsn_code from the item master, for lines sent without one."""
+    skus = sorted({s for s in skus if s})
+    found: dict[str, str] = {}
+    for i in range(0, len(skus), 500):
+        found.update(
+            db.execute(
+                select(ItemMaster.sku_code, ItemMaster.hsn_code)
+                .where(ItemMaster.sku_code.in_(skus[i:i + 500]), ItemMaster.hsn_code.is_not(None))
+            ).all()
+        )
+    return found
+
+
+def resolve_hsn(db: Session, lines) -> list[Optional[str]]:
+    """HSN code per line: its own, else its SKU's from the item master."""
+    missing = [ln.sku_code for ln in lines if not ln.hsn_code and getattr(ln, "sku_code", None)]
+    by_sku = hsn_for_skus(db, missing) if missing else {}
+    return [ln.hsn_code or by_sku.get(getattr(ln, "sku_code", None)) for ln in lines]
+
+
+def price_documents(db: Session, documents) -> list[tuple[list[dict], dict]]:
+    """
+    Server-side amounts for documents being saved or quoted, all lines in one
+    batch. `documents` is a list of (lines, tax_mode); returns per document
+    (per line: hsn_code + LINE_FIELDS, header TOTAL_FIELDS). Client-sent
+    amounts are ignored; its rates only count for HSN codes missing from the
+    master.
+    """
+    lines = [ln for doc_lines, _ in documents for ln in doc_lines]
+    doc_index = [k for k, (doc_lines, _) in enumerate(documents) for _ in doc_lines]
+    hsn = resolve_hsn(db, lines)
+    inter = [is_interstate(mode) for _, mode in documents]
+    priced = price_lines(
+        [ln.qty or 0.0 for ln in lines],
+        [ln.rate or 0.0 for ln in lines],
+        hsn,
+        [inter[k] for k in doc_index],
+        hsn_rates.get_rates(db),
+        [(ln.cgst_rate, ln.sgst_rate, ln.igst_rate) for ln in lines],
+    )
+    totals = as_lists(document_totals(doc_index, priced, len(documents)))
+
+    out = [([], {f: col[k] for f, col in totals.items()}) for k in range(len(documents))]
+    for k, h, amounts in zip(doc_index, hsn, line_dicts(priced)):
+        out[k][0].append({"hsn_code": h, **amounts})
+    return out
+
+
+def price_document(db: Session, lines, tax_mode: Optional[str]) -> tuple[list[dict], dict]:
+    """price_documents() for a single document."""
+    return price_documents(db, [(lines, tax_mode)])[0]
@@ -0,0 +1,132 @@
+"""
+Sync (threadpool) vs async (aiosqlite/asyncpg) hot read routes under concurrent
+clients; sales are written on the threadpool in both modes.
+Each mode and client level runs in its own process (the route flavour is fixed at import time)
+against a fresh SQLite file, driving the app in-process through httpx's ASGI
+transport with a mix of inventory reads, low-stock polls and sales.
+
+    cd backend && python -m bench.async_routes [clients...]
+"""
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+SKUS = 2000
+MIX = [("inventory", 0.6), ("low_stock", 0.2), ("sale", 0.2)]
+# per mode and level; the sync flavour can stall on pool checkouts at high concurrency
+TIMEOUT_S = 300
+
+
+def _seed() -> None:
+    from sqlalchemy import insert
+
+    from app.db import engine, init_db
+    from app.models import InventoryStock, ItemMaster
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(ItemMaster),
+            [{"sku_code": f"SKU{i:05d}", "min_stock_level": 10} for i in range(SKUS)],
+        )
+        conn.execute(
+            insert(InventoryStock),
+            [{"sku_code": f"SKU{i:05d}", "available_qty": 1_000_000} for i in range(SKUS)],
+        )
+    init_db()  # rebuild low-stock / search indexes over the seeded rows
+
+
+async def _drive(app, clients: int, total: int) -> dict:
+    import httpx
+
+    rnd = random.Random(clients)
+    kinds = rnd.choices([k for k, _ in MIX], weights=[w for _, w in MIX], k=total)
+    latencies: list[float] = []
+    failures = 0
+    queue = iter(range(total))
+
+    async def client(http):
+        nonlocal failures
+        for n in queue:
+            kind = kinds[n]
+            t0 = time.perf_counter()
+            if kind == "inventory":
+                r = await http.get("/api/inventory", params={"limit": 50, "cursor": rnd.randint(51, SKUS)})
+            elif kind == "low_stock":
+                r = await http.get("/api/inventory/low-stock")
+            else:
+                r = await http.post(
+                    "/api/sales",
+                    json={
+                        "sale_date": "2026-01-01",
+                        "lines": [{"sku_code": f"SKU{rnd.randrange(SKUS):05d}", "qty": 1, "rate": 100}],
+                    },
+                )
+            latencies.append((time.perf_counter() - t0) * 1000)
+            failures += r.status_code != 200
+
+    # app errors (e.g. pool timeouts) count as failed requests instead of aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "clients": clients,
+        "rps": total / elapsed,
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "failures": failures,
+    }
+
+
+def _worker(clients: int) -> None:
+    _seed()
+    from main import app
+
+    print(json.dumps(asyncio.run(_drive(app, clients, max(2000, clients * 4)))))
+
+
+def main(levels: list[int]) -> None:
+    for clients in levels:
+        for mode, flag in (("sync", "0"), ("async", "1")):
+            with tempfile.TemporaryDirectory() as tmp:
+                env = {
+                    **os.environ,
+                    "RETAILFLOW_DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                    "RETAILFLOW_ASYNC_ROUTES": flag,
+                }
+                try:
+                    out = subprocess.run(
+                        [sys.executable, "-m", "bench.async_routes", "--worker", str(clients)],
+                        env=env, capture_output=True, text=True, check=True, timeout=TIMEOUT_S,
+                    ).stdout
+                except subprocess.TimeoutExpired:
+                    print(f"{mode:<6} clients={clients:>5}  did not finish in {TIMEOUT_S}s")
+                    continue
+            r = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"{mode:<6} clients={clients:>5}  {r['rps']:8.1f} req/s  "
+                f"p50={r['p50']:7.1f}  p95={r['p95']:7.1f}  p99={r['p99']:7.1f} ms  "
+                f"failures={r['failures']}"
+            )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "--worker":
+        _worker(int(args[1]))
+    else:
+        main([int(a) for a in args] or [50, 200, 1000])
@@ -0,0 +1,341 @@
+"""
+Deterministic synthetic data: HSN codes, items + stock, vendors + SKU tags,
+purchase orders, GRNs and sales, at a preset or custom scale. The same seed
+and scale always produce the same rows (ids included).
+
+    cd backend && python -m bench.datagen --scale small --db /tmp/rf.db
+    cd backend && python -m bench.datagen --skus 1000000 --sale-lines 10000000 --db /tmp/rf.db
+
+Rows go in through Core executemany in committed chunks, so memory stays flat
+at any scale; derived tables (low stock, search index, document sequences)
+are then built by init_db().
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+SCALES = {
+    "tiny": {"skus": 1_000, "vendors": 20, "pos": 200, "grns": 150, "sale_lines": 10_000},
+    "small": {"skus": 20_000, "vendors": 100, "pos": 2_000, "grns": 1_500, "sale_lines": 200_000},
+    "medium": {"skus": 200_000, "vendors": 500, "pos": 20_000, "grns": 15_000, "sale_lines": 2_000_000},
+    "large": {"skus": 1_000_000, "vendors": 2_000, "pos": 100_000, "grns": 80_000, "sale_lines": 10_000_000},
+}
+
+CHUNK = 20_000
+START = date(2025, 1, 1)
+DAYS = 365
+STORES = [f"S{i:02d}" for i in range(1, 11)]
+
+BRANDS = ["Nike", "Adidas", "Puma", "Reebok", "Levis", "Wrangler", "Zara", "H&M", "Uniqlo", "Gap",
+          "Allen Solly", "Van Heusen", "Peter England", "Raymond", "Biba", "W", "Fabindia", "Manyavar"]
+CATEGORIES = {
+    "Topwear": ["T-Shirt", "Shirt", "Polo", "Sweatshirt", "Jacket"],
+    "Bottomwear": ["Jeans", "Trousers", "Shorts", "Track Pants"],
+    "Footwear": ["Sneakers", "Sandals", "Formal Shoes", "Slippers"],
+    "Ethnic": ["Kurta", "Saree", "Sherwani", "Dupatta"],
+    "Accessories": ["Belt", "Cap", "Wallet", "Socks"],
+}
+COLORS = ["Black", "White", "Navy", "Grey", "Red", "Blue", "Green", "Olive", "Maroon", "Beige"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+# (hsn prefix, GST %) - apparel / footwear / accessories slabs
+HSN_SLABS = [("6109", 5), ("6105", 12), ("6203", 12), ("6204", 12), ("6403", 18), ("6404", 18),
+             ("6211", 5), ("4203", 18), ("6505", 12), ("6115", 12)]
+HSN_CODES = [(f"{p}{s:02d}", rate) for p, rate in HSN_SLABS for s in range(10, 14)]
+
+
+def sku_code(i: int) -> str:
+    return f"SKU{i:07d}"
+
+
+def _item(i: int) -> dict:
+    # attributes are a pure function of the index, so sale/PO lines can
+    # derive an item's HSN and price without keeping the catalog in memory
+    cat = list(CATEGORIES)[i % len(CATEGORIES)]
+    subs = CATEGORIES[cat]
+    return {
+        "sku_code": sku_code(i),
+        "brand": BRANDS[(i // 7) % len(BRANDS)],
+        "division": "Apparel" if cat != "Footwear" else "Footwear",
+        "category": cat,
+        "sub_category": subs[(i // 5) % len(subs)],
+        "style": f"ST{i // 30:05d}",
+        "color": COLORS[(i // 3) % len(COLORS)],
+        "size": SIZES[i % len(SIZES)],
+        "hsn_code": _hsn(i),
+        "status": "ACTIVE",
+        "min_stock_level": 5 + i % 16,
+    }
+
+
+def _hsn(i: int) -> str:
+    return HSN_CODES[i % len(HSN_CODES)][0]
+
+
+def price(i: int) -> float:
+    return float(199 + (i * 37) % 4800)
+
+
+def _tax_rate(i: int) -> float:
+    return float(HSN_CODES[i % len(HSN_CODES)][1])
+
+
+def pick_sku(rnd: random.Random, skus: int) -> int:
+    # skewed popularity: low indices sell far more often than the tail
+    return int(skus * rnd.random() ** 2)
+
+
+def _insert(engine, table, rows) -> int:
+    """Insert an iterable of row dicts in committed CHUNK-sized batches."""
+    from sqlalchemy import insert
+
+    n, batch = 0, []
+    stmt = insert(table)
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            with engine.begin() as conn:
+                conn.execute(stmt, batch)
+            n += len(batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(stmt, batch)
+        n += len(batch)
+    return n
+
+
+def _paired(engine, parent, child, pairs) -> tuple[int, int]:
+    """Insert (header, [lines]) pairs, flushing both tables together per chunk."""
+    from sqlalchemy import insert
+
+    heads, lines, n_heads, n_lines = [], [], 0, 0
+
+    def flush():
+        with engine.begin() as conn:
+            conn.execute(insert(parent), heads)
+            if lines:
+                conn.execute(insert(child), lines)
+
+    for head, head_lines in pairs:
+        heads.append(head)
+        lines.extend(head_lines)
+        if len(lines) >= CHUNK:
+            flush()
+            n_heads, n_lines = n_heads + len(heads), n_lines + len(lines)
+            heads, lines = [], []
+    if heads:
+        flush()
+        n_heads, n_lines = n_heads + len(heads), n_lines + len(lines)
+    return n_heads, n_lines
+
+
+def _hsn_rows():
+    for code, rate in HSN_CODES:
+        yield {
+            "hsn_code": code, "description": f"HSN {code}",
+            "cgst_rate": rate / 2, "sgst_rate": rate / 2, "igst_rate": float(rate),
+        }
+
+
+def is_low_stock(i: int) -> bool:
+    """~8% of SKUs start at or under their reorder level (0-20 units)."""
+    return i % 12 == 5
+
+
+def _stock_rows(rnd, skus):
+    for i in range(skus):
+        qty = rnd.randint(0, 20) if is_low_stock(i) else rnd.randint(21, 400)
+        yield {"sku_code": sku_code(i), "available_qty": float(qty)}
+
+
+def _vendor_rows(vendors):
+    for v in range(1, vendors + 1):
+        yield {
+            "id": v, "vendor_code": f"V{v:04d}", "vendor_name": f"Vendor {v}",
+            "address": f"{v} Industrial Estate", "email": f"vendor{v}@example.com",
+            "phone": f"9{v:09d}", "status": "Active",
+        }
+
+
+def _vendor_sku_rows(rnd, skus, vendors):
+    # every SKU has a primary vendor; ~10% also have a second source
+    for i in range(skus):
+        primary = i % vendors + 1
+        yield {"vendor_id": primary, "sku_code": sku_code(i)}
+        if vendors > 1 and rnd.random() < 0.10:
+            other = rnd.randrange(1, vendors + 1)
+            if other != primary:
+                yield {"vendor_id": other, "sku_code": sku_code(i)}
+
+
+def _line_amounts(qty: float, rate: float, tax_pct: float, inter: bool) -> dict:
+    sub = round(qty * rate, 2)
+    if inter:
+        igst = round(sub * tax_pct / 100, 2)
+        return {"line_subtotal": sub, "cgst": 0.0, "sgst": 0.0, "igst": igst, "total": sub + igst}
+    half = round(sub * tax_pct / 200, 2)
+    return {"line_subtotal": sub, "cgst": half, "sgst": half, "igst": 0.0, "total": sub + 2 * half}
+
+
+def _po_pairs(rnd, scale, po_lines_out: dict):
+    skus, vendors, grns = scale["skus"], scale["vendors"], scale["grns"]
+    for po_id in range(1, scale["pos"] + 1):
+        vendor_id = rnd.randrange(1, vendors + 1)
+        inter = rnd.random() < 0.3
+        po_date = START + timedelta(days=rnd.randrange(DAYS))
+        lines, tot = [], {"sub": 0.0, "cgst": 0.0, "sgst": 0.0, "igst": 0.0}
+        for i in {rnd.randrange(skus) for _ in range(rnd.randint(1, 10))}:
+            qty = float(rnd.randint(10, 200))
+            rate = round(price(i) * 0.55, 2)
+            tax = _tax_rate(i)
+            a = _line_amounts(qty, rate, tax, inter)
+            lines.append({
+                "po_id": po_id, "sku_code": sku_code(i), "hsn_code": _hsn(i),
+                "qty": qty, "rate": rate,
+                "cgst_rate": 0.0 if inter else tax / 2, "sgst_rate": 0.0 if inter else tax / 2,
+                "igst_rate": tax if inter else 0.0,
+                "line_subtotal": a["line_subtotal"], "cgst_amount": a["cgst"],
+                "sgst_amount": a["sgst"], "igst_amount": a["igst"], "line_total": a["total"],
+            })
+            tot["sub"] += a["line_subtotal"]
+            tot["cgst"] += a["cgst"]
+            tot["sgst"] += a["sgst"]
+            tot["igst"] += a["igst"]
+        if po_id <= grns:
+            po_lines_out[po_id] = (po_date, [(ln["sku_code"], ln["qty"]) for ln in lines])
+        yield {
+            "id": po_id, "vendor_id": vendor_id, "po_number": f"PO-{po_id:07d}",
+            "po_date": po_date, "expiry_date": po_date + timedelta(days=30),
+            "payment_terms": "30 days", "tax_mode": "IGST" if inter else "CGST_SGST",
+            "status": "CLOSED" if po_id <= grns else "OPEN",
+            "retailer_name": "RetailFlow Stores", "retailer_address": "MG Road",
+            "retailer_gstin": "29ABCDE1234F1Z5",
+            "subtotal": round(tot["sub"], 2), "cgst_total": round(tot["cgst"], 2),
+            "sgst_total": round(tot["sgst"], 2), "igst_total": round(tot["igst"], 2),
+            "grand_total": round(sum(tot.values()), 2),
+        }, lines
+
+
+def _grn_pairs(rnd, po_lines: dict):
+    for grn_id, po_id in enumerate(sorted(po_lines), start=1):
+        po_date, lines = po_lines[po_id]
+        out = []
+        for sku, qty in lines:
+            received = qty if rnd.random() < 0.85 else float(rnd.randint(1, int(qty)))
+            rejected = float(rnd.randint(0, 2)) if received > 2 else 0.0
+            out.append({
+                "grn_id": grn_id, "sku_code": sku, "received_qty": received,
+                "accepted_qty": received - rejected, "rejected_qty": rejected,
+            })
+        yield {
+            "id": grn_id, "grn_number": f"GRN-{grn_id:07d}", "po_id": po_id,
+            "received_date": po_date + timedelta(days=rnd.randint(3, 20)),
+        }, out
+
+
+def _sale_pairs(rnd, scale):
+    skus, remaining, sale_id = scale["skus"], scale["sale_lines"], 0
+    # bills arrive in date order, like a real till
+    per_day = max(1, scale["sale_lines"] // 3 // DAYS)
+    while remaining > 0:
+        sale_id += 1
+        n = min(remaining, rnd.randint(1, 5))
+        remaining -= n
+        lines, sub, tax_total = [], 0.0, 0.0
+        for _ in range(n):
+            i = pick_sku(rnd, skus)
+            qty = float(rnd.randint(1, 3))
+            rate = price(i)
+            tax = _tax_rate(i)
+            line_sub = qty * rate
+            line_tax = round(line_sub * tax / 100, 2)
+            lines.append({
+                "sale_id": sale_id, "sku_code": sku_code(i), "hsn_code": _hsn(i),
+                "qty": qty, "rate": rate, "cgst_rate": tax / 2, "sgst_rate": tax / 2,
+                "igst_rate": 0.0, "line_subtotal": line_sub, "line_tax": line_tax,
+                "line_total": line_sub + line_tax,
+            })
+            sub += line_sub
+            tax_total += line_tax
+        customer = rnd.randrange(50_000)
+        yield {
+            "id": sale_id, "bill_number": f"BILL-{sale_id:08d}",
+            "sale_date": START + timedelta(days=min(DAYS - 1, (sale_id - 1) // per_day)),
+            "store_code": STORES[rnd.randrange(len(STORES))],
+            "customer_name": f"Customer {customer}", "customer_phone": f"98{customer:08d}",
+            "subtotal": sub, "tax_total": tax_total, "grand_total": sub + tax_total,
+        }, lines
+
+
+def populate(engine, scale: dict, seed: int = 42, log=print) -> dict:
+    """
+    Fill an empty database. `scale` has skus, vendors, pos, grns (POs that
+    get a GRN, <= pos) and sale_lines. Returns row counts per table.
+    """
+    from app.db import Base
+    from app import models as m
+
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(seed)
+    counts = {}
+
+    def step(name, fn):
+        t0 = time.perf_counter()
+        result = fn()
+        log(f"  {name:<14} {result}  ({time.perf_counter() - t0:.1f}s)")
+        counts[name] = result
+
+    skus = scale["skus"]
+    step("hsn", lambda: _insert(engine, m.HSNMaster, _hsn_rows()))
+    step("items", lambda: _insert(engine, m.ItemMaster, (_item(i) for i in range(skus))))
+    step("stock", lambda: _insert(engine, m.InventoryStock, _stock_rows(rnd, skus)))
+    step("vendors", lambda: _insert(engine, m.VendorMaster, _vendor_rows(scale["vendors"])))
+    step("vendor_sku", lambda: _insert(engine, m.VendorSku, _vendor_sku_rows(rnd, skus, scale["vendors"])))
+    po_lines: dict = {}
+    step("pos", lambda: _paired(engine, m.PurchaseOrder, m.PurchaseOrderLine, _po_pairs(rnd, scale, po_lines)))
+    step("grns", lambda: _paired(engine, m.GRN, m.GRNLine, _grn_pairs(rnd, po_lines)))
+    step("sales", lambda: _paired(engine, m.Sale, m.SaleLine, _sale_pairs(rnd, scale)))
+    return counts
+
+
+def parse_scale(args) -> dict:
+    scale = dict(SCALES[args.scale])
+    for key in ("skus", "vendors", "pos", "grns", "sale_lines"):
+        value = getattr(args, key)
+        if value is not None:
+            scale[key] = value
+    scale["grns"] = min(scale["grns"], scale["pos"])
+    return scale
+
+
+def add_scale_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--scale", choices=SCALES, default="tiny")
+    parser.add_argument("--seed", type=int, default=42)
+    for key in ("skus", "vendors", "pos", "grns", "sale_lines"):
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, help="override the preset")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_scale_args(parser)
+    parser.add_argument("--db", required=True, help="SQLite file to create")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        sys.exit(f"{args.db} already exists; datagen only fills a new database")
+    os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    from app.db import engine, init_db
+
+    scale = parse_scale(args)
+    print(f"generating {scale} (seed {args.seed}) into {args.db}")
+    t0 = time.perf_counter()
+    populate(engine, scale, args.seed)
+    init_db()
+    print(f"done in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+GRN posting: legacy commit-then-loop stock update vs the single-transaction
+batched upsert in create_grn.
+
+    cd backend && python -m bench.grn_bulk [line counts...]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.grn import create_grn
+from app.db import Base, make_engine
+from app.models import GRN, GRNLine, InventoryStock, ItemMaster, PurchaseOrder, PurchaseOrderLine
+from app.schemas import GRNCreate
+
+
+def _legacy_create_grn(payload: GRNCreate, db) -> None:
+    """The pre-change create_grn: commit the GRN, then query/insert-or-update per SKU."""
+    last = db.query(GRN).order_by(GRN.id.desc()).first()
+    grn = GRN(
+        grn_number=f"GRN{(1 if not last else last.id + 1):04d}",
+        po_id=payload.po_id,
+        received_date=payload.received_date,
+    )
+    accepted_by_sku: dict[str, float] = {}
+    for ln in payload.lines:
+        grn.lines.append(GRNLine(**ln.model_dump()))
+        accepted_by_sku[ln.sku_code] = accepted_by_sku.get(ln.sku_code, 0) + ln.accepted_qty
+    db.add(grn)
+    db.commit()
+    db.refresh(grn)
+
+    for sku, qty in accepted_by_sku.items():
+        stock = db.query(InventoryStock).filter(InventoryStock.sku_code == sku).first()
+        if stock:
+            stock.available_qty += qty
+        else:
+            db.add(InventoryStock(sku_code=sku, available_qty=qty))
+    db.commit()
+
+
+def _run(fn, lines: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        skus = [f"SKU{i:07d}" for i in range(lines)]
+        with engine.begin() as conn:
+            conn.execute(insert(ItemMaster), [{"sku_code": s} for s in skus])
+            # half the SKUs already carry stock, half are first receipts
+            conn.execute(
+                insert(InventoryStock),
+                [{"sku_code": s, "available_qty": 5} for s in skus[::2]],
+            )
+            conn.execute(
+                insert(PurchaseOrder),
+                [{
+                    "vendor_id": 1, "po_date": date(2026, 1, 1), "expiry_date": date(2026, 2, 1),
+                    "tax_mode": "INTRA", "retailer_name": "r", "retailer_address": "a",
+                    "retailer_gstin": "g", "ordered_qty": 10 * lines, "outstanding_qty": 10 * lines,
+                }],
+            )
+            # create_grn checks receipts against the PO's lines
+            conn.execute(
+                insert(PurchaseOrderLine), [{"po_id": 1, "sku_code": s, "qty": 10} for s in skus]
+            )
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        payload = GRNCreate(
+            po_id=1,
+            received_date="2026-01-02",
+            lines=[
+                {"sku_code": s, "received_qty": 10, "accepted_qty": 9, "rejected_qty": 1}
+                for s in skus
+            ],
+        )
+        with Session() as db:
+            t0 = time.perf_counter()
+            fn(payload, db)
+            elapsed = time.perf_counter() - t0
+
+        with Session() as db:
+            total = db.scalar(select(func.sum(InventoryStock.available_qty)))
+            assert total == 9 * lines + 5 * len(skus[::2]), total
+        engine.dispose()
+    return elapsed * 1000
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10, 1_000, 10_000]
+    for n in sizes:
+        legacy_ms = _run(_legacy_create_grn, n)
+        new_ms = _run(create_grn, n)
+        print(
+            f"lines={n:>7,}  legacy={legacy_ms:9.1f} ms  bulk upsert={new_ms:8.1f} ms  "
+            f"x{legacy_ms / new_ms:5.1f}"
+        )
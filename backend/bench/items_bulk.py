@@ -0,0 +1,92 @@
+"""
+Bulk catalog import: POST /api/items/bulk end to end (NDJSON and CSV bodies)
+into a populated catalog, with ~2% of rows already in item_master and ~0.5%
+invalid, reported as rows/s.
+
+    cd backend && python -m bench.items_bulk --scale small --rows 100000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+
+from bench import datagen
+
+FIELDS = ["sku_code", "brand", "category", "sub_category", "style", "color", "size",
+          "hsn_code", "status", "min_stock_level"]
+
+
+def _rows(start: int, n: int, existing: int) -> list[dict]:
+    rows = []
+    for i in range(n):
+        if i % 50 == 7 and existing:
+            sku = datagen.sku_code((i // 50) % existing)  # already in item_master
+        else:
+            sku = f"NEW{start + i:08d}"
+        rows.append({
+            "sku_code": sku, "brand": datagen.BRANDS[i % len(datagen.BRANDS)],
+            "category": "Topwear", "sub_category": "T-Shirt", "style": f"NS{i // 30}",
+            "color": datagen.COLORS[i % len(datagen.COLORS)],
+            "size": datagen.SIZES[i % len(datagen.SIZES)], "hsn_code": "610910",
+            "status": "ACTIVE",
+            # every 200th row carries a non-numeric threshold and must be rejected
+            "min_stock_level": "lots" if i % 200 == 3 else 5 + i % 20,
+        })
+    return rows
+
+
+def _ndjson(rows: list[dict]) -> bytes:
+    return "".join(json.dumps(r) + "\n" for r in rows).encode()
+
+
+def _csv(rows: list[dict]) -> bytes:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per upload")
+    args = parser.parse_args()
+    scale = datagen.parse_scale(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the app binds its engine at import time, so point it at the scratch DB first
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from fastapi.testclient import TestClient
+
+        from app.db import engine, init_db
+        from main import app
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed, log=lambda *_: None)
+        init_db()
+
+        with TestClient(app) as client:
+            for n, (fmt, encode) in enumerate((("ndjson", _ndjson), ("csv", _csv))):
+                rows = _rows(n * args.rows, args.rows, scale["skus"])
+                body = encode(rows)
+                t0 = time.perf_counter()
+                res = client.post("/api/items/bulk", params={"format": fmt}, content=body)
+                seconds = time.perf_counter() - t0
+                report = res.json()
+                assert res.status_code == 200, report
+                assert report["rows"] == len(rows), report
+                assert report["inserted"] + report["failed"] == len(rows), report
+                print(
+                    f"{fmt:<7} {len(rows):>9,} rows  {seconds:7.2f} s  {len(rows) / seconds:10,.0f} rows/s  "
+                    f"inserted={report['inserted']:,} duplicates={report['duplicates']:,} "
+                    f"failed={report['failed']:,}"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+CPU per 10k rows for the big list endpoints: the previous path (ORM objects ->
+response_model validation -> stdlib json) vs the column-projection + orjson
+path the routes use now. Also checks both produce the same JSON.
+
+    cd backend && python -m bench.json_lists [rows]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from fastapi import Request
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload, sessionmaker
+
+from app.api import fast_json
+from app.api.routes.grn import list_grns
+from app.api.routes.hsn import list_hsn
+from app.api.routes.items import list_items
+from app.api.routes.vendors import _vendor_out, list_vendors
+from app.db import Base, make_engine
+from app.models import GRN, GRNLine, HSNMaster, ItemMaster, VendorMaster, VendorSku
+from app.schemas import GRNOut, HSNOut, ItemOut, VendorOut
+
+REPEAT = 3
+# identity encoding, no If-None-Match: always a full 200 body
+_REQUEST = Request({"type": "http", "headers": []})
+
+
+def _seed(engine, n: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(HSNMaster),
+            [{"hsn_code": f"{i:08d}", "description": f"HSN {i}", "cgst_rate": 6.0,
+              "sgst_rate": 6.0, "igst_rate": 12.0} for i in range(n)],
+        )
+        conn.execute(
+            insert(ItemMaster),
+            [{"sku_code": f"SKU{i:07d}", "brand": "Nike", "division": "Apparel",
+              "category": "Topwear", "sub_category": "T-Shirt", "style": f"ST{i // 30}",
+              "color": "Black", "size": "M", "hsn_code": "610910", "status": "ACTIVE",
+              "min_stock_level": 10} for i in range(n)],
+        )
+        conn.execute(
+            insert(VendorMaster),
+            [{"id": i, "vendor_code": f"V{i:06d}", "vendor_name": f"Vendor {i}",
+              "address": "MG Road", "email": f"v{i}@example.com", "phone": "9000000000",
+              "status": "Active"} for i in range(1, n + 1)],
+        )
+        conn.execute(
+            insert(VendorSku),
+            [{"vendor_id": i, "sku_code": f"SKU{k}{i:07d}"}
+             for i in range(1, n + 1) for k in (1, 2)],
+        )
+        conn.execute(
+            insert(GRN),
+            [{"id": i, "grn_number": f"GRN{i:06d}", "po_id": 1,
+              "received_date": date(2026, 1, 1)} for i in range(1, n + 1)],
+        )
+        conn.execute(
+            insert(GRNLine),
+            [{"grn_id": i, "sku_code": f"SKU{k:07d}", "received_qty": 10,
+              "accepted_qty": 9, "rejected_qty": 1} for i in range(1, n + 1) for k in range(3)],
+        )
+
+
+def _fresh(route, db) -> bytes:
+    # drop the per-version body cache so every call builds the list
+    fast_json._bodies.clear()
+    return route(_REQUEST, db=db).body
+
+
+def _legacy(schema, objs) -> bytes:
+    # what FastAPI does with response_model on ORM objects, then JSONResponse
+    adapter = TypeAdapter(list[schema])
+    content = adapter.dump_python(adapter.validate_python(objs, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+CASES = {
+    "items": (
+        lambda db: _legacy(ItemOut, db.query(ItemMaster).order_by(ItemMaster.sku_code).all()),
+        lambda db: _fresh(list_items, db),
+    ),
+    "hsn": (
+        lambda db: _legacy(HSNOut, db.query(HSNMaster).order_by(HSNMaster.hsn_code).all()),
+        lambda db: _fresh(list_hsn, db),
+    ),
+    "vendors": (
+        lambda db: _legacy(VendorOut, [
+            _vendor_out(v) for v in db.query(VendorMaster)
+            .options(selectinload(VendorMaster.sku_links))
+            .order_by(VendorMaster.vendor_code)
+        ]),
+        lambda db: _fresh(list_vendors, db),
+    ),
+    "grns": (
+        # lines lazy-loaded per GRN, as the ORM path did
+        lambda db: _legacy(GRNOut, db.query(GRN).order_by(GRN.id.desc()).all()),
+        lambda db: list_grns(date_from=None, date_to=None, db=db).body,
+    ),
+}
+
+
+def _cpu_ms(Session, fn) -> tuple[float, bytes]:
+    best, body = None, b""
+    for _ in range(REPEAT):
+        with Session() as db:
+            t0 = time.process_time()
+            body = fn(db)
+            spent = (time.process_time() - t0) * 1000
+        best = spent if best is None else min(best, spent)
+    return best, body
+
+
+def main(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        _seed(engine, n)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        per = 10_000 / n
+        for name, (old, new) in CASES.items():
+            old_ms, old_body = _cpu_ms(Session, old)
+            new_ms, new_body = _cpu_ms(Session, new)
+            assert json.loads(old_body) == json.loads(new_body), f"{name}: responses differ"
+            print(
+                f"{name:<8} CPU per 10k rows: before {old_ms * per:8.1f} ms  "
+                f"after {new_ms * per:7.1f} ms  ({old_ms / new_ms:4.1f}x)"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
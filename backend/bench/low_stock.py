@@ -0,0 +1,89 @@
+"""
+Legacy full-scan low-stock vs the maintained low_stock_items set.
+
+    cd backend && python -m bench.low_stock [catalog sizes...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, make_engine
+from app.models import InventoryStock, ItemMaster, LowStockItem
+from app.services.low_stock import rebuild_low_stock, refresh_low_stock
+
+LOW_EVERY = 100  # 1% of the catalog is below threshold
+
+
+def _seed(engine, n: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(ItemMaster),
+            [{"sku_code": f"SKU{i:07d}", "min_stock_level": 10} for i in range(n)],
+        )
+        conn.execute(
+            insert(InventoryStock),
+            [
+                {"sku_code": f"SKU{i:07d}", "available_qty": 5 if i % LOW_EVERY == 0 else 50}
+                for i in range(n)
+            ],
+        )
+        rebuild_low_stock(conn)
+
+
+def _legacy_scan(db):
+    items = db.query(ItemMaster).all()
+    stock_map = {s.sku_code: float(s.available_qty or 0) for s in db.query(InventoryStock).all()}
+    return [
+        it.sku_code
+        for it in items
+        if float(stock_map.get(it.sku_code, 0)) <= float(it.min_stock_level or 0)
+    ]
+
+
+def _indexed(db):
+    return [r.sku_code for r in db.query(LowStockItem).order_by(LowStockItem.sku_code).all()]
+
+
+def _time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def run(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        _seed(engine, n)
+        Session = sessionmaker(bind=engine)
+
+        with Session() as db:
+            assert sorted(_legacy_scan(db)) == _indexed(db)
+            scan_ms = _time(lambda: _legacy_scan(db))
+            idx_ms = _time(lambda: _indexed(db))
+
+            # cost of keeping the set current for a 50-line write
+            skus = [f"SKU{i:07d}" for i in range(0, 50 * 7, 7)]
+            maint_ms = _time(lambda: refresh_low_stock(db, skus))
+            db.rollback()
+
+        engine.dispose()
+
+    print(
+        f"catalog={n:>8,}  low={n // LOW_EVERY:>6,}  "
+        f"scan={scan_ms:9.1f} ms  maintained={idx_ms:7.2f} ms  "
+        f"refresh(50 skus)={maint_ms:6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 50_000, 200_000]
+    for n in sizes:
+        run(n)
@@ -0,0 +1,82 @@
+"""
+Asserts a page of list_purchase_orders costs the same number of SQL statements
+with 10 POs in the table as with 5,000 (no per-PO vendor or lines query).
+
+    cd backend && python -m bench.po_query_count
+
+tests/test_po_query_count.py runs the same check under pytest.
+"""
+import os
+import tempfile
+import time
+from datetime import date
+
+from fastapi import Response
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.purchase_orders import list_purchase_orders
+from app.db import Base, make_engine
+from app.models import PurchaseOrder, PurchaseOrderLine, VendorMaster
+
+LINES_PER_PO = 3
+PAGE = 500  # max page size; matches selectinload's IN batch
+
+
+def _seed(engine, n: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(VendorMaster),
+            [{"vendor_code": f"V{i:04d}", "vendor_name": f"Vendor {i}"} for i in range(1, 21)],
+        )
+        conn.execute(
+            insert(PurchaseOrder),
+            [
+                {
+                    "vendor_id": i % 20 + 1, "po_date": date(2026, 1, 1), "expiry_date": date(2026, 2, 1),
+                    "tax_mode": "INTRA", "retailer_name": "r", "retailer_address": "a",
+                    "retailer_gstin": "g",
+                }
+                for i in range(n)
+            ],
+        )
+        conn.execute(
+            insert(PurchaseOrderLine),
+            [
+                {"po_id": po_id, "sku_code": f"SKU{j}", "qty": 1, "rate": 10}
+                for po_id in range(1, n + 1)
+                for j in range(LINES_PER_PO)
+            ],
+        )
+
+
+def count_statements(n: int) -> tuple[int, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        _seed(engine, n)
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        with sessionmaker(bind=engine)() as db:
+            t0 = time.perf_counter()
+            out = list_purchase_orders(
+                Response(), cursor=None, limit=PAGE, vendor_id=None,
+                date_from=None, date_to=None, status=None, db=db,
+            )
+            elapsed = time.perf_counter() - t0
+
+        assert len(out) == min(n, PAGE) and all(len(po.lines) == LINES_PER_PO for po in out)
+        assert all(po.vendor_name for po in out)
+        engine.dispose()
+    return len(statements), elapsed * 1000
+
+
+if __name__ == "__main__":
+    results = {n: count_statements(n) for n in (10, 100, 1_000, 5_000)}
+    for n, (count, ms) in results.items():
+        print(f"pos={n:>6,}  statements={count}  {ms:8.1f} ms")
+    counts = {count for count, _ in results.values()}
+    assert len(counts) == 1, f"query count grows with PO count: {results}"
+    print("OK: constant query count")
@@ -0,0 +1,67 @@
+"""
+Replenishment engine: POST /api/replenishment/run over the whole catalog
+(dry run and writing the draft POs), plus the reorder maths alone with numpy
+vs the pure-Python fallback.
+
+    cd backend && python -m bench.replenishment --scale medium   # 200k SKUs
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from bench import datagen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    args = parser.parse_args()
+    scale = datagen.parse_scale(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from fastapi.testclient import TestClient
+
+        from app.db import engine, init_db
+        from app.services import replenishment
+        from main import app
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed, log=lambda *_: None)
+        init_db()
+
+        as_of = (datagen.START + timedelta(days=364)).isoformat()
+        with TestClient(app) as client:
+            for dry_run in (True, False, False):
+                t0 = time.perf_counter()
+                resp = client.post("/api/replenishment/run", json={"as_of": as_of, "dry_run": dry_run})
+                wall = time.perf_counter() - t0
+                assert resp.status_code == 200, resp.text
+                out = resp.json()
+                print(
+                    f"{'dry run' if dry_run else 'write  '}  {out['skus_scanned']} SKUs scanned, "
+                    f"{out['skus_to_order']} to order, {len(out['purchase_orders'])} draft POs: "
+                    f"{wall:.2f}s"
+                )
+
+        n = scale["skus"]
+        cols = (
+            [float(i % 40) for i in range(n)], [10.0] * n,
+            [float(i % 7) for i in range(n)], [float(i % 30) for i in range(n)],
+        )
+        for label, fn in (
+            ("numpy", replenishment.reorder_quantities),
+            ("pure Python", replenishment._reorder_quantities_py),
+        ):
+            if label == "numpy" and replenishment.np is None:
+                continue
+            t0 = time.perf_counter()
+            fn(*cols, 28, 7, 14)
+            print(f"reorder maths, {label:<11} {n / (time.perf_counter() - t0) / 1e6:6.1f}M SKUs/s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Offline POS sync: bills/s posting one by one to POST /api/sales vs pushing
+the same number of bills through POST /api/sales/batch, plus the cost of
+re-sending a batch that was already ingested.
+
+    cd backend && python -m bench.sales_batch --scale small --bills 2000 --batch-size 500
+    cd backend && python -m bench.sales_batch --scale small --bill-block-size 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from bench import datagen
+
+
+def _bill(rnd, scale, key: str) -> dict:
+    lines = []
+    for _ in range(rnd.randint(1, 4)):
+        sku = datagen.pick_sku(rnd, scale["skus"])
+        if datagen.is_low_stock(sku):
+            sku += 1  # keep every bill acceptable so both paths do the same work
+        lines.append({"sku_code": datagen.sku_code(sku), "qty": 1, "rate": datagen.price(sku)})
+    return {
+        "idempotency_key": key, "sale_date": datagen.START.isoformat(),
+        "store_code": datagen.STORES[rnd.randrange(len(datagen.STORES))], "lines": lines,
+    }
+
+
+async def _run(scale: dict, bills: int, batch_size: int) -> None:
+    import httpx
+
+    from main import app
+
+    rnd = random.Random(7)
+    single = [_bill(rnd, scale, f"single-{i}") for i in range(bills)]
+    batched = [_bill(rnd, scale, f"batch-{i}") for i in range(bills)]
+    chunks = [batched[i:i + batch_size] for i in range(0, bills, batch_size)]
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as http:
+        t0 = time.perf_counter()
+        for b in single:
+            r = await http.post("/api/sales", json=b)
+            assert r.status_code == 200, r.text
+        one_by_one = time.perf_counter() - t0
+
+        timings = []
+        bill_numbers = set()
+        for label in ("batch", "re-send"):
+            t0 = time.perf_counter()
+            for chunk in chunks:
+                r = await http.post("/api/sales/batch", json={"sales": chunk})
+                assert r.status_code == 200, r.text
+                want = "created" if label == "batch" else "duplicates"
+                assert r.json()[want] == len(chunk), r.json()
+                bill_numbers.update(x["bill_number"] for x in r.json()["results"])
+            timings.append((label, time.perf_counter() - t0))
+        assert len(bill_numbers) == bills, "batch bills share a bill number"
+
+    print(f"one by one  {bills:>6} bills  {one_by_one:7.2f}s  {bills / one_by_one:9.0f} bills/s")
+    for label, secs in timings:
+        print(
+            f"{label:<11} {bills:>6} bills  {secs:7.2f}s  {bills / secs:9.0f} bills/s  "
+            f"({one_by_one / secs:.1f}x, batches of {batch_size})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    parser.add_argument("--bills", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--bill-block-size", type=int, default=1,
+        help="RETAILFLOW_BILL_BLOCK_SIZE for the run (>1 reserves bill numbers in blocks)",
+    )
+    args = parser.parse_args()
+
+    scale = datagen.parse_scale(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["RETAILFLOW_BILL_BLOCK_SIZE"] = str(args.bill_block_size)
+        from app.db import engine, init_db
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed, log=lambda *_: None)
+        init_db()
+        asyncio.run(_run(scale, args.bills, args.batch_size))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
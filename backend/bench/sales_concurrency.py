@@ -0,0 +1,128 @@
+"""
+Parallel tills hammering a few hot SKUs: legacy check-then-decrement vs the
+conditional UPDATE in create_sale.
+
+    cd backend && python -m bench.sales_concurrency [threads] [sales_per_thread] [start_qty]
+
+req/s counts rejected sales too (cheap when stock runs out early); sales/s
+counts committed ones. A large start_qty keeps every sale going through.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.sales import create_sale
+from app.db import Base, make_engine
+from app.models import InventoryStock, ItemMaster, Sale, SaleLine
+from app.schemas import SaleCreate
+
+HOT_SKUS = [f"HOT{i}" for i in range(5)]
+START_QTY = 200
+
+
+def _legacy_create_sale(payload: SaleCreate, db) -> None:
+    """The pre-change create_sale: SELECT per SKU, commit, SELECT again, decrement."""
+    sale = Sale(bill_number=payload.bill_number, sale_date=payload.sale_date)
+    sold_by_sku: dict[str, float] = {}
+    for ln in payload.lines:
+        sale.lines.append(SaleLine(**ln.model_dump()))
+        sold_by_sku[ln.sku_code] = sold_by_sku.get(ln.sku_code, 0) + ln.qty
+
+    for sku, qty in sold_by_sku.items():
+        stock = db.query(InventoryStock).filter(InventoryStock.sku_code == sku).first()
+        if not stock or (stock.available_qty or 0) < qty:
+            raise HTTPException(status_code=400, detail="Insufficient stock")
+
+    db.add(sale)
+    db.commit()
+    for sku, qty in sold_by_sku.items():
+        stock = db.query(InventoryStock).filter(InventoryStock.sku_code == sku).first()
+        stock.available_qty = (stock.available_qty or 0) - qty
+    db.commit()
+
+
+def _run(fn, threads: int, per_thread: int, start_qty: float = START_QTY) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(ItemMaster), [{"sku_code": s} for s in HOT_SKUS])
+            conn.execute(
+                insert(InventoryStock),
+                [{"sku_code": s, "available_qty": start_qty} for s in HOT_SKUS],
+            )
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        ok = rejected = errors = 0
+        lock = threading.Lock()
+
+        def till(tid: int) -> None:
+            nonlocal ok, rejected, errors
+            rnd = random.Random(tid)
+            for n in range(per_thread):
+                payload = SaleCreate(
+                    bill_number=f"T{tid}-{n}",
+                    sale_date="2026-01-01",
+                    lines=[
+                        {"sku_code": sku, "qty": rnd.randint(1, 3), "rate": 100}
+                        for sku in rnd.sample(HOT_SKUS, 2)
+                    ],
+                )
+                with Session() as db:
+                    try:
+                        fn(payload, db)
+                        res = "ok"
+                    except HTTPException:
+                        db.rollback()
+                        res = "rejected"
+                    except OperationalError:
+                        db.rollback()
+                        res = "error"
+                with lock:
+                    if res == "ok":
+                        ok += 1
+                    elif res == "rejected":
+                        rejected += 1
+                    else:
+                        errors += 1
+
+        workers = [threading.Thread(target=till, args=(t,)) for t in range(threads)]
+        t0 = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - t0
+
+        with Session() as db:
+            negative = db.scalar(
+                select(func.count()).where(InventoryStock.available_qty < 0)
+            )
+            sold = db.scalar(select(func.coalesce(func.sum(SaleLine.qty), 0)))
+            left = db.scalar(select(func.sum(InventoryStock.available_qty)))
+        engine.dispose()
+
+    # units billed that were never taken out of stock (lost updates)
+    oversold = sold - (start_qty * len(HOT_SKUS) - left)
+    print(
+        f"{fn.__name__:<20} {(ok + rejected) / elapsed:8.1f} req/s {ok / elapsed:8.1f} sales/s  ok={ok:<5} "
+        f"rejected={rejected:<5} errors={errors:<4} "
+        f"negative_skus={negative}  oversold_units={oversold:g}"
+    )
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    start_qty = float(sys.argv[3]) if len(sys.argv) > 3 else START_QTY
+    print(f"{threads} tills x {per_thread} sales on {len(HOT_SKUS)} hot SKUs, {start_qty:g} units each")
+    _run(_legacy_create_sale, threads, per_thread, start_qty)
+    _run(create_sale, threads, per_thread, start_qty)
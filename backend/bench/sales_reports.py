@@ -0,0 +1,87 @@
+"""
+Sales reports: GET /api/reports/sales* over the sales_daily_* rollups vs the
+same aggregates scanned from sales / sale_lines. Also checks both agree.
+
+    cd backend && python -m bench.sales_reports --scale small
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench import datagen
+
+REPEAT = 5
+
+
+def _best_ms(fn) -> tuple[float, object]:
+    best, out = None, None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn()
+        spent = (time.perf_counter() - t0) * 1000
+        best = spent if best is None else min(best, spent)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    args = parser.parse_args()
+    scale = datagen.parse_scale(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from fastapi.testclient import TestClient
+        from sqlalchemy import text
+
+        from app.db import engine, init_db
+        from main import app
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed, log=lambda *_: None)
+        t0 = time.perf_counter()
+        init_db()  # builds the rollups from existing sales
+        print(f"init_db with rollup rebuild: {time.perf_counter() - t0:.1f}s")
+
+        raw = {
+            "month": (
+                "/api/reports/sales?period=month",
+                "SELECT substr(s.sale_date, 1, 7), round(sum(l.line_total), 2) FROM sales s "
+                "JOIN sale_lines l ON l.sale_id = s.id GROUP BY 1 ORDER BY 1",
+                lambda rows: [(r["period"], r["total"]) for r in rows],
+            ),
+            "stores": (
+                "/api/reports/sales/stores",
+                "SELECT s.store_code, round(sum(l.line_total), 2) FROM sales s "
+                "JOIN sale_lines l ON l.sale_id = s.id GROUP BY 1 ORDER BY 1",
+                lambda rows: [(r["store_code"], r["total"]) for r in rows],
+            ),
+            "brands": (
+                "/api/reports/sales/categories?group_by=brand",
+                "SELECT i.brand, round(sum(l.line_subtotal), 2) FROM sales s "
+                "JOIN sale_lines l ON l.sale_id = s.id JOIN item_master i ON i.sku_code = l.sku_code "
+                "GROUP BY 1 ORDER BY 2 DESC",
+                lambda rows: [(r["brand"], r["subtotal"]) for r in rows],
+            ),
+            "top skus": (
+                "/api/reports/sales/skus?order_by=qty&limit=20",
+                "SELECT l.sku_code, sum(l.qty) FROM sales s JOIN sale_lines l ON l.sale_id = s.id "
+                "GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT 20",
+                lambda rows: [(r["sku_code"], r["qty"]) for r in rows],
+            ),
+        }
+        with TestClient(app) as client, engine.connect() as conn:
+            for label, (url, sql, key) in raw.items():
+                api_ms, got = _best_ms(lambda: client.get(url).json())
+                scan_ms, want = _best_ms(lambda: conn.execute(text(sql)).all())
+                assert key(got) == [tuple(r) for r in want], label
+                print(
+                    f"{label:<9} rollup (via API) {api_ms:8.2f} ms   "
+                    f"raw scan (SQL only) {scan_ms:8.2f} ms  ({scan_ms / api_ms:5.1f}x)"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
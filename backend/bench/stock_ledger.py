@@ -0,0 +1,78 @@
+"""
+Point-in-time stock: GET /api/inventory/as-of (nearest month-end snapshot +
+tail of movements) vs replaying the whole movement ledger, for every SKU and
+for one SKU, at several dates. Also checks both give the same stock.
+
+    cd backend && python -m bench.stock_ledger --scale small
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from bench import datagen
+
+REPEAT = 5
+
+
+def _best_ms(fn) -> tuple[float, object]:
+    best, out = None, None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn()
+        spent = (time.perf_counter() - t0) * 1000
+        best = spent if best is None else min(best, spent)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    args = parser.parse_args()
+    scale = datagen.parse_scale(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from sqlalchemy import func, select
+
+        from app.db import engine, init_db
+        from app.models import StockMovement
+        from app.services.stock_ledger import stock_as_of
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed, log=lambda *_: None)
+        t0 = time.perf_counter()
+        init_db()  # backfills the ledger and takes the month-end snapshots
+        print(f"init_db with ledger backfill + snapshots: {time.perf_counter() - t0:.1f}s")
+
+        def replay(as_of, sku=None):
+            stmt = (
+                select(StockMovement.sku_code, func.sum(StockMovement.qty))
+                .where(StockMovement.movement_date <= as_of)
+                .group_by(StockMovement.sku_code)
+                .order_by(StockMovement.sku_code)
+            )
+            if sku:
+                stmt = stmt.where(StockMovement.sku_code == sku)
+            return conn.execute(stmt).all()
+
+        rnd = random.Random(3)
+        with engine.connect() as conn:
+            for days in (20, 200, 360):
+                as_of = datagen.START + timedelta(days=days)
+                sku = datagen.sku_code(rnd.randrange(scale["skus"]))
+                for label, s in (("all SKUs", None), ("one SKU", sku)):
+                    snap_ms, got = _best_ms(lambda: stock_as_of(conn, as_of, sku_code=s).all())
+                    full_ms, want = _best_ms(lambda: replay(as_of, s))
+                    assert [(k, round(q, 6)) for k, q in got] == [(k, round(q, 6)) for k, q in want]
+                    print(
+                        f"{as_of}  {label:<9} snapshot+tail {snap_ms:8.2f} ms   "
+                        f"full replay {full_ms:8.2f} ms  ({full_ms / snap_ms:5.1f}x)"
+                    )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
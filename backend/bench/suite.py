@@ -0,0 +1,240 @@
+"""
+Endpoint benchmark suite: generates a deterministic dataset (bench.datagen),
+drives the real FastAPI app in-process through httpx's ASGI transport and
+reports req/s and p50/p95/p99 per endpoint.
+
+    cd backend && python -m bench.suite --scale small                   # report only
+    cd backend && python -m bench.suite --scale small --save-baseline   # record bench/baseline.json
+    cd backend && python -m bench.suite --scale small --threshold 0.25  # fail on regressions
+
+With a baseline present (same scale and seed), an endpoint regresses when its
+p95 grows, or its throughput drops, by more than the threshold; any
+regression exits with status 1. Baselines are machine-specific: record one on
+the machine that will run the comparison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from bench import datagen
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+WARMUP = 10
+# latency differences below this are noise, whatever the ratio
+MIN_DELTA_MS = 1.0
+
+
+def _window(rnd, days: int) -> dict:
+    start = datagen.START + timedelta(days=rnd.randrange(datagen.DAYS - days))
+    return {"date_from": start.isoformat(), "date_to": (start + timedelta(days=days)).isoformat()}
+
+
+def _term(rnd) -> str:
+    word = rnd.choice(datagen.BRANDS + datagen.COLORS + list(datagen.CATEGORIES))
+    return word[: rnd.randint(min(2, len(word)), len(word))]
+
+
+def _sale(rnd, scale):
+    sku = datagen.pick_sku(rnd, scale["skus"])
+    if datagen.is_low_stock(sku):
+        sku += 1  # keep the timed path the successful one
+    return {
+        "sale_date": datagen.START.isoformat(),
+        "lines": [{"sku_code": datagen.sku_code(sku), "qty": 1, "rate": datagen.price(sku)}],
+    }
+
+
+# (po_id, sku_code) of lines still outstanding on OPEN POs, loaded after init_db:
+# GRNs are checked against their PO, and every line has at least 10 units open
+_OPEN_PO_LINES: list[tuple[int, str]] = []
+
+
+def _load_open_po_lines(engine) -> None:
+    from sqlalchemy import select
+
+    from app.models import PurchaseOrder, PurchaseOrderLine
+
+    with engine.connect() as conn:
+        _OPEN_PO_LINES[:] = conn.execute(
+            select(PurchaseOrderLine.po_id, PurchaseOrderLine.sku_code)
+            .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderLine.po_id)
+            .where(PurchaseOrder.status == "OPEN", PurchaseOrderLine.qty > PurchaseOrderLine.received_qty)
+            .order_by(PurchaseOrderLine.id)
+        ).all()
+
+
+def _grn(rnd, scale):
+    po_id, sku = rnd.choice(_OPEN_PO_LINES)
+    return {
+        "po_id": po_id,
+        "received_date": datagen.START.isoformat(),
+        "lines": [{"sku_code": sku, "received_qty": 1, "accepted_qty": 1, "rejected_qty": 0}],
+    }
+
+
+# name -> (method, path, request builder(rnd, scale) -> params or JSON body, share of --requests)
+# full-table listings get a smaller share: at large scales one call is seconds
+SCENARIOS = {
+    "hsn.list": ("GET", "/api/hsn", None, 1.0),
+    "items.list": ("GET", "/api/items", None, 0.1),
+    "items.search": ("GET", "/api/items/search",
+                     lambda r, s: {"q": _term(r), "limit": 20}, 1.0),
+    "vendors.list": ("GET", "/api/vendors", None, 0.25),
+    "vendors.by_sku": ("GET", "/api/vendors/by-sku/{sku}", None, 1.0),
+    "inventory.page": ("GET", "/api/inventory",
+                       lambda r, s: {"limit": 100, "cursor": r.randint(101, s["skus"] + 1)}, 1.0),
+    "inventory.low_stock": ("GET", "/api/inventory/low-stock", None, 0.25),
+    "purchase_orders.page": ("GET", "/api/purchase-orders",
+                             lambda r, s: {"limit": 100, **_window(r, 30)}, 1.0),
+    "grn.window": ("GET", "/api/grn", lambda r, s: _window(r, 7), 1.0),
+    "sales.page": ("GET", "/api/sales",
+                   lambda r, s: {"limit": 100, **_window(r, 7)}, 1.0),
+    "sales.create": ("POST", "/api/sales", _sale, 1.0),
+    "grn.create": ("POST", "/api/grn", _grn, 1.0),
+}
+
+
+def _request(name: str, rnd, scale: dict) -> tuple[str, str, dict]:
+    method, path, build, _ = SCENARIOS[name]
+    if "{sku}" in path:
+        path = path.format(sku=datagen.sku_code(rnd.randrange(scale["skus"])))
+    kwargs = {}
+    if build is not None:
+        key = "json" if method == "POST" else "params"
+        kwargs[key] = build(rnd, scale)
+    return method, path, kwargs
+
+
+async def _run_scenario(http, name: str, scale: dict, requests: int, concurrency: int) -> dict:
+    rnd = random.Random(name)
+    calls = [_request(name, rnd, scale) for _ in range(WARMUP + requests)]
+    for method, path, kwargs in calls[:WARMUP]:
+        await http.request(method, path, **kwargs)
+
+    latencies: list[float] = []
+    failures = 0
+    queue = iter(calls[WARMUP:])
+
+    async def client():
+        nonlocal failures
+        for method, path, kwargs in queue:
+            t0 = time.perf_counter()
+            r = await http.request(method, path, **kwargs)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            failures += r.status_code >= 400
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "failures": failures,
+    }
+
+
+async def run(names: list[str], scale: dict, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    from main import app
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+        for name in names:
+            n = max(WARMUP, int(requests * SCENARIOS[name][3]))
+            results[name] = r = await _run_scenario(http, name, scale, n, concurrency)
+            print(
+                f"{name:<22} {r['rps']:9.1f} req/s  p50={r['p50']:8.2f}  "
+                f"p95={r['p95']:8.2f}  p99={r['p99']:8.2f} ms  failures={r['failures']}",
+                flush=True,
+            )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, r in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if r["p95"] > base["p95"] * (1 + threshold) and r["p95"] - base["p95"] > MIN_DELTA_MS:
+            regressions.append(f"{name}: p95 {base['p95']:.2f} -> {r['p95']:.2f} ms")
+        if r["rps"] < base["rps"] / (1 + threshold):
+            regressions.append(f"{name}: throughput {base['rps']:.1f} -> {r['rps']:.1f} req/s")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    scale = datagen.parse_scale(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the app binds its engine at import time, so point it at the scratch DB first
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from app.db import engine, init_db
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed)
+        init_db()
+        _load_open_po_lines(engine)
+        results = asyncio.run(run(names, scale, args.requests, args.concurrency))
+        engine.dispose()
+
+    run_info = {
+        "scale": scale, "seed": args.seed,
+        "requests": args.requests, "concurrency": args.concurrency,
+    }
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**run_info, "results": results}, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against (record one with --save-baseline)")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if any(baseline.get(k) != v for k, v in run_info.items()):
+        sys.exit(f"baseline was recorded with different settings: {args.baseline}")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"REGRESSIONS (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"OK: no endpoint regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Tax engine throughput: pricing N lines with NumPy vs the pure-Python
+fallback (checked to agree), then a bulk re-price of every generated sale
+line after a GST slab change.
+
+    cd backend && python -m bench.tax_engine --scale small
+    cd backend && python -m bench.tax_engine --scale medium --lines 2000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bench import datagen
+
+
+def _engine_bench(n: int) -> None:
+    from app.services import tax_engine
+    from app.services.hsn_rates import HsnRate
+
+    rnd = random.Random(1)
+    rates = {code: HsnRate(r / 2, r / 2, float(r)) for code, r in datagen.HSN_CODES}
+    codes = list(rates) + ["UNKNOWN"]
+    qty = [float(rnd.randint(1, 50)) for _ in range(n)]
+    rate = [round(rnd.uniform(50, 5000), 2) for _ in range(n)]
+    hsn = [rnd.choice(codes) for _ in range(n)]
+    inter = [rnd.random() < 0.3 for _ in range(n)]
+    given = [(9.0, 9.0, 18.0)] * n
+
+    timings = {}
+    for name, mod in (("numpy", tax_engine.np), ("python", None)):
+        if name == "numpy" and mod is None:
+            continue
+        saved, tax_engine.np = tax_engine.np, mod
+        try:
+            t0 = time.perf_counter()
+            out = tax_engine.price_lines(qty, rate, hsn, inter, rates, given)
+            timings[name] = (time.perf_counter() - t0, tax_engine.as_lists(out))
+        finally:
+            tax_engine.np = saved
+
+    for name, (secs, _) in timings.items():
+        print(f"price_lines {name:<6} {n:>9,} lines  {secs * 1000:8.1f} ms  ({n / secs:12,.0f} lines/s)")
+    if len(timings) == 2:
+        assert timings["numpy"][1] == timings["python"][1], "numpy and python results differ"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    datagen.add_scale_args(parser)
+    parser.add_argument("--lines", type=int, default=1_000_000, help="lines for the engine-only run")
+    args = parser.parse_args()
+
+    _engine_bench(args.lines)
+
+    scale = datagen.parse_scale(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        from sqlalchemy import update
+
+        from app.db import engine, init_db
+        from app.models import HSNMaster
+        from app.services import hsn_rates, reprice
+
+        print(f"generating {scale} (seed {args.seed})")
+        datagen.populate(engine, scale, args.seed, log=lambda *_: None)
+        init_db()
+
+        # first pass brings the generated amounts to the engine's rounding
+        r = reprice.reprice(engine, "sales")
+        print(f"reprice sales (baseline)  {r}")
+
+        # 12% slab -> 18%: a third of the catalogue changes
+        with engine.begin() as conn:
+            conn.execute(
+                update(HSNMaster).where(HSNMaster.igst_rate == 12.0)
+                .values(cgst_rate=9.0, sgst_rate=9.0, igst_rate=18.0)
+            )
+        hsn_rates.invalidate()
+        for label in ("rate change", "no-op"):
+            r = reprice.reprice(engine, "sales")
+            print(
+                f"reprice sales ({label:<11}) scanned {r['lines_scanned']:,} changed "
+                f"{r['lines_changed']:,} in {r['seconds']:.2f}s "
+                f"({r['lines_scanned'] / r['seconds']:,.0f} lines/s)"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.db import init_db
+from app.metrics import MetricsMiddleware
 from app.api.router import api_router
+from app.services.replenishment import start_scheduler
+from app.services.stock_ledger import start_snapshot_scheduler
 
 app = FastAPI(title="RetailFlow API")
 
@@ -17,10 +20,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+# outermost, so latency covers CORS handling and the full (streamed) body
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 def on_startup():
     init_db()
+    start_scheduler()
+    start_snapshot_scheduler()
 
 app.include_router(api_router)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+import pytest
+
+# the app binds its engine at import time, so point it at a scratch DB first
+_TMP = tempfile.TemporaryDirectory()
+os.environ["RETAILFLOW_DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP.name, 'test.db')}"
+os.environ["RETAILFLOW_SNAPSHOT_CHECK_MINUTES"] = "0"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def receive(client):
+    """
+    receive({sku: qty}) -> the PO those quantities were received against,
+    ordering `ordered` (default: just that) and receiving `on` (default today).
+    """
+    from datetime import date
+
+    vendor = client.post("/api/vendors", json={"vendor_name": "Test Supplier"}).json()
+
+    def _receive(qty_by_sku: dict, ordered: dict | None = None, on: date | None = None) -> dict:
+        ordered = ordered or qty_by_sku
+        po = client.post("/api/purchase-orders", json={
+            "po_date": str(date.today()), "expiry_date": str(date.today()), "tax_mode": "CGST_SGST",
+            "vendor_id": vendor["id"], "retailer_name": "RetailFlow", "retailer_address": "-",
+            "retailer_gstin": "-",
+            "lines": [{"sku_code": s, "qty": q, "rate": 100} for s, q in ordered.items()],
+        })
+        assert po.status_code == 200, po.text
+        grn = client.post("/api/grn", json={
+            "po_id": po.json()["id"], "received_date": str(on or date.today()),
+            "lines": [{"sku_code": s, "received_qty": q, "accepted_qty": q, "rejected_qty": 0}
+                      for s, q in qty_by_sku.items()],
+        })
+        assert grn.status_code == 200, grn.text
+        return po.json()
+
+    return _receive
+
+
+@pytest.fixture(scope="session")
+def stock(client):
+    """stock(sku) -> inventory_stock.available_qty (0 when the SKU has no row)."""
+    from app.db import SessionLocal
+    from app.models import InventoryStock
+
+    def _stock(sku: str) -> float:
+        with SessionLocal() as db:
+            row = db.query(InventoryStock).filter(InventoryStock.sku_code == sku).first()
+            return row.available_qty if row else 0.0
+
+    return _stock
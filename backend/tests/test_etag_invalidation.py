@@ -0,0 +1,74 @@
+from sqlalchemy import update
+
+from app.api import fast_json
+from app.db import SessionLocal
+from app.models import ItemMaster
+
+
+def _etag(client, path: str) -> str:
+    res = client.get(path)
+    assert res.status_code == 200
+    return res.headers["etag"]
+
+
+def _still_fresh(client, path: str, etag: str) -> bool:
+    return client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_every_item_write_path_moves_the_etag(client):
+    etag = _etag(client, "/api/items")
+    assert _still_fresh(client, "/api/items", etag)
+
+    created = client.post("/api/items", json={"sku_code": "ETAG-1"}).json()
+    assert not _still_fresh(client, "/api/items", etag)
+
+    etag = _etag(client, "/api/items")
+    client.post("/api/items/bulk", params={"format": "ndjson"}, content='{"sku_code": "ETAG-2"}\n')
+    assert not _still_fresh(client, "/api/items", etag)
+
+    # a Core write outside the item routes (jobs, scripts) moves it too
+    etag = _etag(client, "/api/items")
+    with SessionLocal() as db:
+        db.execute(update(ItemMaster).where(ItemMaster.id == created["id"]).values(brand="Puma"))
+        db.commit()
+    assert not _still_fresh(client, "/api/items", etag)
+    assert '"Puma"' in client.get("/api/items").text
+
+    etag = _etag(client, "/api/items")
+    client.delete(f"/api/items/{created['id']}")
+    assert not _still_fresh(client, "/api/items", etag)
+
+
+def test_version_moves_once_per_transaction(client):
+    before = client.get("/api/items").headers["etag"]
+    with SessionLocal() as db:
+        for sku in ("ETAG-3", "ETAG-4", "ETAG-5"):
+            db.add(ItemMaster(sku_code=sku))
+            db.flush()
+        db.commit()
+    after = client.get("/api/items").headers["etag"]
+    version = lambda tag: int(tag.strip('"').split("+")[0].rsplit("-", 1)[1])  # noqa: E731
+    assert version(after) == version(before) + 1
+
+
+def test_vendor_tagging_moves_the_vendor_etag(client):
+    vendor = client.post("/api/vendors", json={"vendor_name": "Etag Traders"}).json()
+    etag = _etag(client, "/api/vendors")
+    client.put(f"/api/vendors/{vendor['id']}", json={"vendor_name": "Etag Traders", "tagged_skus": ["ETAG-2"]})
+    assert not _still_fresh(client, "/api/vendors", etag)
+
+
+def test_body_cache_stays_within_its_byte_budget(monkeypatch):
+    monkeypatch.setattr(fast_json, "_bodies", {})
+    monkeypatch.setattr(fast_json, "_bodies_bytes", 0)
+    monkeypatch.setattr(fast_json, "BODY_CACHE_TOTAL_BYTES", 250)
+
+    fast_json._cache_body(("a", "identity"), 1, b"x" * 100, "identity")
+    fast_json._cache_body(("b", "identity"), 1, b"x" * 100, "identity")
+    assert fast_json._cached_body(("a", "identity"), 1) is not None  # "b" is now least recent
+    fast_json._cache_body(("c", "identity"), 1, b"x" * 100, "identity")
+
+    assert set(fast_json._bodies) == {("a", "identity"), ("c", "identity")}
+    assert fast_json._bodies_bytes == 200
+    fast_json._cache_body(("d", "identity"), 1, b"x" * 300, "identity")  # over the whole budget
+    assert ("d", "identity") not in fast_json._bodies
@@ -0,0 +1,41 @@
+import json
+
+
+def _ndjson(rows) -> str:
+    return "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in rows)
+
+
+def test_bulk_import_reports_rows_like_item_create(client):
+    assert client.post("/api/items", json={"sku_code": "BLK-OLD"}).status_code == 200
+    body = _ndjson([
+        {"sku_code": "BLK-1", "brand": "Nike", "min_stock_level": 3, "extra": "ignored"},
+        {"sku_code": " BLK-2 ", "min_stock_level": "7"},  # digit string, as CSV sends it
+        {"sku_code": "BLK-3", "min_stock_level": 4.0},    # coerced by pydantic
+        {"sku_code": "BLK-OLD"},
+        {"sku_code": "BLK-1"},
+        {"sku_code": 12},
+        {"sku_code": "BLK-4", "min_stock_level": "lots"},
+        {"sku_code": "BLK-5", "status": None},
+        {"brand": "Nike"},
+        "{not json",
+        {"sku_code": "   "},
+    ])
+    report = client.post("/api/items/bulk", params={"format": "ndjson"}, content=body).json()
+
+    assert (report["rows"], report["inserted"], report["duplicates"], report["failed"]) == (11, 3, 1, 8)
+    errors = {e["row"]: e for e in report["errors"]}
+    assert errors[4]["error"] == "SKU code already exists"
+    assert errors[5]["error"] == "Duplicate SKU code in upload"
+    assert errors[6]["error"].startswith("sku_code: ")
+    assert errors[7]["error"].startswith("min_stock_level: ")
+    assert errors[8]["error"].startswith("status: ")
+    assert errors[9]["error"].startswith("sku_code: Field required")
+    assert errors[10]["error"].startswith("Invalid JSON")
+    assert errors[11]["error"] == "sku_code is required"
+
+    items = {i["sku_code"]: i for i in client.get("/api/items/search", params={"q": "BLK"}).json()}
+    assert items["BLK-1"]["min_stock_level"] == 3 and items["BLK-1"]["status"] == "DRAFT"
+    assert items["BLK-2"]["min_stock_level"] == 7
+    assert items["BLK-3"]["min_stock_level"] == 4
+    low = {r["sku_code"] for r in client.get("/api/inventory/low-stock").json()}
+    assert {"BLK-1", "BLK-2", "BLK-3"} <= low
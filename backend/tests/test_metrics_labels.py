@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+
+def _requests_total(client) -> list[str]:
+    return [ln for ln in client.get("/api/metrics").text.splitlines() if "requests_total{" in ln]
+
+
+def test_routes_are_labelled_by_template_not_values(client):
+    # the SKU value equals a static segment of the path
+    client.get("/api/vendors/by-sku/vendors")
+    client.get("/api/purchase-orders/7/status")
+    series = "\n".join(_requests_total(client))
+    assert 'route="/api/vendors/by-sku/{sku}"' in series
+    assert 'route="/api/purchase-orders/{po_id}/status"' in series
+    assert "by-sku/vendors" not in series
+
+
+def test_root_path_prefixes_the_label(client):
+    with TestClient(client.app, root_path="/erp") as proxied:
+        proxied.get("/api/hsn")
+        assert any('route="/erp/api/hsn"' in ln for ln in _requests_total(proxied))
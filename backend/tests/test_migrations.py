@@ -0,0 +1,62 @@
+from sqlalchemy import create_engine, func, select, text
+
+from app.db import Base, SessionLocal, _migrate_text_dates, _migrate_vendor_tagged_skus, init_db
+from app.models import SalesDailySku, SchemaMigration, StockMovement
+
+MIGRATIONS = [
+    "0001_text_dates_to_iso", "0002_vendor_sku_table", "0003_stock_ledger",
+    "0004_sales_rollups", "0005_po_receipt_counters",
+]
+
+
+def _scratch():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_legacy_text_dates_become_iso():
+    engine = _scratch()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO sales (bill_number, sale_date) VALUES (:b, :d)"),
+            [{"b": "B1", "d": "31/01/2025"}, {"b": "B2", "d": "2025-02-01T10:30:00"},
+             {"b": "B3", "d": "03-02-2025"}, {"b": "B4", "d": "2025-02-04"}],
+        )
+        conn.execute(text("INSERT INTO grn (grn_number, po_id, received_date) VALUES ('G1', 1, '15/03/2025')"))
+        _migrate_text_dates(conn)
+        dates = conn.execute(text("SELECT sale_date FROM sales ORDER BY bill_number")).scalars().all()
+        received = conn.execute(text("SELECT received_date FROM grn")).scalar_one()
+    assert dates == ["2025-01-31", "2025-02-01", "2025-02-03", "2025-02-04"]
+    assert received == "2025-03-15"
+
+
+def test_legacy_tagged_skus_move_to_vendor_sku():
+    engine = _scratch()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO vendor_master (id, vendor_code, vendor_name, tagged_skus) VALUES (:i, :c, :n, :t)"),
+            [{"i": 1, "c": "V1", "n": "One", "t": "SKU-A, SKU-B,,SKU-A"},
+             {"i": 2, "c": "V2", "n": "Two", "t": "SKU-B"},
+             {"i": 3, "c": "V3", "n": "Three", "t": None}],
+        )
+        _migrate_vendor_tagged_skus(conn)
+        links = conn.execute(text("SELECT vendor_id, sku_code FROM vendor_sku ORDER BY 1, 2")).all()
+    assert links == [(1, "SKU-A"), (1, "SKU-B"), (2, "SKU-B")]
+
+
+def test_init_db_records_every_migration_and_reruns_as_a_no_op(client, receive):
+    receive({"MIGRATE-1": 2})
+    client.post("/api/sales", json={"sale_date": "2025-01-01",
+                                    "lines": [{"sku_code": "MIGRATE-1", "qty": 1, "rate": 100}]})
+
+    def counts():
+        with SessionLocal() as db:
+            return [db.scalar(select(func.count()).select_from(m)) for m in (StockMovement, SalesDailySku)]
+
+    before = counts()
+    init_db()
+    with SessionLocal() as db:
+        assert sorted(db.scalars(select(SchemaMigration.name))) == MIGRATIONS
+    assert counts() == before
+    assert client.get("/api/inventory/reconcile").json() == []
@@ -0,0 +1,8 @@
+from bench.po_query_count import PAGE, count_statements
+
+
+def test_po_list_page_query_count_is_constant():
+    # one PO + vendor join and one selectinload of lines, however many POs exist
+    small, _ = count_statements(10)
+    large, _ = count_statements(PAGE * 4)
+    assert small == large == 2
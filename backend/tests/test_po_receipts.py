@@ -0,0 +1,40 @@
+from datetime import date
+
+
+def _grn(client, po_id: int, lines: dict):
+    return client.post("/api/grn", json={
+        "po_id": po_id, "received_date": str(date.today()),
+        "lines": [{"sku_code": s, "received_qty": q, "accepted_qty": q, "rejected_qty": 0}
+                  for s, q in lines.items()],
+    })
+
+
+def test_receipt_beyond_outstanding_is_rejected(client, receive, stock):
+    po = receive({"RCPT-1": 6}, ordered={"RCPT-1": 10})
+    res = _grn(client, po["id"], {"RCPT-1": 5})
+    assert res.status_code == 400
+    assert "RCPT-1" in res.json()["detail"]
+
+    # nothing moved: counters and stock are as after the first GRN
+    status = client.get(f"/api/purchase-orders/{po['id']}/status").json()
+    assert (status["received_qty"], status["outstanding_qty"]) == (6, 4)
+    assert stock("RCPT-1") == 6
+
+
+def test_sku_not_on_the_po_is_rejected(client, receive, stock):
+    po = receive({"RCPT-2": 1}, ordered={"RCPT-2": 5})
+    res = _grn(client, po["id"], {"RCPT-2": 1, "RCPT-OTHER": 1})
+    assert res.status_code == 400
+    assert "RCPT-OTHER" in res.json()["detail"]
+    assert stock("RCPT-2") == 1 and stock("RCPT-OTHER") == 0
+
+
+def test_po_closes_once_received_and_rejects_further_grns(client, receive):
+    po = receive({"RCPT-3": 2}, ordered={"RCPT-3": 5})
+    assert _grn(client, po["id"], {"RCPT-3": 3}).status_code == 200
+    status = client.get(f"/api/purchase-orders/{po['id']}/status").json()
+    assert status["status"] == "CLOSED" and status["outstanding_qty"] == 0
+
+    res = _grn(client, po["id"], {"RCPT-3": 1})
+    assert res.status_code == 400
+    assert "CLOSED" in res.json()["detail"]
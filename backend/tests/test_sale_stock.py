@@ -0,0 +1,35 @@
+from datetime import date
+
+
+def _sale(client, lines: dict):
+    return client.post("/api/sales", json={
+        "sale_date": str(date.today()),
+        "lines": [{"sku_code": s, "qty": q, "rate": 100} for s, q in lines.items()],
+    })
+
+
+def test_oversell_is_rejected_and_stock_is_untouched(client, receive, stock):
+    receive({"OVERSELL-1": 3, "OVERSELL-2": 5})
+    res = _sale(client, {"OVERSELL-1": 2, "OVERSELL-2": 6})
+    assert res.status_code == 400
+    assert "OVERSELL-2" in res.json()["detail"]
+    # the line that did fit was not deducted either
+    assert (stock("OVERSELL-1"), stock("OVERSELL-2")) == (3, 5)
+
+
+def test_lines_of_one_sku_are_checked_together(client, receive, stock):
+    receive({"OVERSELL-3": 3})
+    res = client.post("/api/sales", json={
+        "sale_date": str(date.today()),
+        "lines": [{"sku_code": "OVERSELL-3", "qty": 2, "rate": 100},
+                  {"sku_code": "OVERSELL-3", "qty": 2, "rate": 100}],
+    })
+    assert res.status_code == 400
+    assert stock("OVERSELL-3") == 3
+
+
+def test_sale_within_stock_deducts_it(client, receive, stock):
+    receive({"OVERSELL-4": 3})
+    assert _sale(client, {"OVERSELL-4": 3}).status_code == 200
+    assert stock("OVERSELL-4") == 0
+    assert _sale(client, {"OVERSELL-4": 1}).status_code == 400
@@ -0,0 +1,43 @@
+from datetime import date
+
+
+def _bill(key: str, sku: str, qty: float) -> dict:
+    return {
+        "idempotency_key": key, "sale_date": str(date.today()), "store_code": "S1",
+        "lines": [{"sku_code": sku, "qty": qty, "rate": 100}],
+    }
+
+
+def test_resent_bills_come_back_as_duplicates(client, receive, stock):
+    receive({"BATCH-1": 10})
+    first = client.post("/api/sales/batch", json={"sales": [_bill("pos1-1", "BATCH-1", 2),
+                                                            _bill("pos1-2", "BATCH-1", 3)]})
+    assert first.status_code == 200, first.text
+    created = first.json()
+    assert created["created"] == 2 and created["duplicates"] == 0
+
+    # the POS lost the response and re-sends both bills plus a new one
+    again = client.post("/api/sales/batch", json={"sales": [_bill("pos1-1", "BATCH-1", 2),
+                                                            _bill("pos1-2", "BATCH-1", 3),
+                                                            _bill("pos1-3", "BATCH-1", 1)]}).json()
+    assert [r["status"] for r in again["results"]] == ["duplicate", "duplicate", "created"]
+    assert [r["sale_id"] for r in again["results"][:2]] == [r["sale_id"] for r in created["results"]]
+    assert stock("BATCH-1") == 4
+
+
+def test_duplicate_key_within_one_batch_is_stored_once(client, receive, stock):
+    receive({"BATCH-2": 5})
+    res = client.post("/api/sales/batch", json={"sales": [_bill("pos2-1", "BATCH-2", 1),
+                                                          _bill("pos2-1", "BATCH-2", 1)]}).json()
+    assert [r["status"] for r in res["results"]] == ["created", "duplicate"]
+    assert stock("BATCH-2") == 4
+
+
+def test_overselling_bill_is_rejected_alone(client, receive, stock):
+    receive({"BATCH-3": 3})
+    res = client.post("/api/sales/batch", json={"sales": [_bill("pos3-1", "BATCH-3", 2),
+                                                          _bill("pos3-2", "BATCH-3", 2),
+                                                          _bill("pos3-3", "BATCH-3", 1)]}).json()
+    assert [r["status"] for r in res["results"]] == ["created", "rejected", "created"]
+    assert "Insufficient stock" in res["results"][1]["detail"]
+    assert stock("BATCH-3") == 0
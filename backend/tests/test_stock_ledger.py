@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+from sqlalchemy import update
+
+from app.db import SessionLocal
+from app.models import InventoryStock
+
+TODAY = date.today()
+
+
+def _sell(client, sku: str, qty: float, on: date) -> None:
+    res = client.post("/api/sales", json={
+        "sale_date": str(on), "lines": [{"sku_code": sku, "qty": qty, "rate": 100}],
+    })
+    assert res.status_code == 200, res.text
+
+
+def _as_of(client, sku: str, on: date):
+    rows = client.get("/api/inventory/as-of", params={"date": str(on), "sku_code": sku}).json()
+    return rows[0]["qty"] if rows else None
+
+
+def test_as_of_replays_movements_around_a_snapshot(client, receive):
+    received, sold, snapped, sold_again = (TODAY - timedelta(days=d) for d in (10, 7, 5, 2))
+    receive({"LEDGER-1": 10}, on=received)
+    _sell(client, "LEDGER-1", 3, sold)
+    assert client.post("/api/inventory/snapshots", params={"date": str(snapped)}).status_code == 200
+    _sell(client, "LEDGER-1", 2, sold_again)
+
+    assert _as_of(client, "LEDGER-1", received - timedelta(days=1)) is None
+    assert _as_of(client, "LEDGER-1", received) == 10
+    assert _as_of(client, "LEDGER-1", sold) == 7
+    assert _as_of(client, "LEDGER-1", snapped) == 7
+    assert _as_of(client, "LEDGER-1", sold_again) == 5
+    assert _as_of(client, "LEDGER-1", TODAY) == 5
+
+
+def test_reconcile_flags_stock_changed_outside_the_ledger(client, receive):
+    receive({"LEDGER-2": 4})
+    assert client.get("/api/inventory/reconcile").json() == []
+
+    with SessionLocal() as db:
+        db.execute(update(InventoryStock).where(InventoryStock.sku_code == "LEDGER-2").values(available_qty=9))
+        db.commit()
+    try:
+        assert client.get("/api/inventory/reconcile").json() == [
+            {"sku_code": "LEDGER-2", "available_qty": 9.0, "ledger_qty": 4.0}
+        ]
+    finally:
+        with SessionLocal() as db:
+            db.execute(update(InventoryStock).where(InventoryStock.sku_code == "LEDGER-2").values(available_qty=4))
+            db.commit()
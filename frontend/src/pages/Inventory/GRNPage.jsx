@@ -19,9 +19,18 @@ export default function GRNPage() {
 
   /* ===================== LOAD DATA ===================== */
 
+  // only OPEN POs can be received; walk their pages via X-Next-Cursor
   const loadPOs = async () => {
-    const res = await axios.get(`${API_BASE}/purchase-orders`);
-    setPoList(res.data || []);
+    const open = [];
+    let cursor = null;
+    do {
+      const res = await axios.get(`${API_BASE}/purchase-orders`, {
+        params: { status: "OPEN", limit: 500, ...(cursor ? { cursor } : {}) },
+      });
+      open.push(...(res.data || []));
+      cursor = res.headers["x-next-cursor"] || null;
+    } while (cursor);
+    setPoList(open);
   };
 
   const loadGrns = async () => {
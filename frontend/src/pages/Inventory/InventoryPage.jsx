@@ -1,40 +1,65 @@
 // frontend/src/pages/Inventory/InventoryPage.jsx
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useState } from "react";
 import axios from "axios";
 
 const API_BASE = "http://127.0.0.1:8000/api";
+const INVENTORY_PAGE_SIZE = 500;
 
 export default function InventoryPage() {
   const [rows, setRows] = useState([]);
+  const [lowSet, setLowSet] = useState(new Set());
+  const [cursor, setCursor] = useState(null); // next page, from X-Next-Cursor
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState("");
 
+  const toRows = (data, low) =>
+    (Array.isArray(data) ? data : []).map((r) => ({
+      ...r,
+      available_qty: Number(r.available_qty ?? 0),
+      min_stock_level: Number(r.min_stock_level ?? 0),
+      is_low: low.has(r.sku_code),
+    }));
+
+  const getPage = (after) =>
+    axios.get(`${API_BASE}/inventory`, {
+      params: { limit: INVENTORY_PAGE_SIZE, ...(after ? { cursor: after } : {}) },
+    });
+
   const load = async () => {
     try {
       setLoading(true);
       setErr("");
 
       const [invRes, lowRes] = await Promise.all([
-        axios.get(`${API_BASE}/inventory`),
+        getPage(null),
         axios.get(`${API_BASE}/inventory/low-stock`),
       ]);
 
-      const inv = Array.isArray(invRes.data) ? invRes.data : [];
       const low = Array.isArray(lowRes.data) ? lowRes.data : [];
-      const lowSet = new Set(low.map((x) => x.sku_code));
-
-      setRows(
-        inv.map((r) => ({
-          ...r,
-          available_qty: Number(r.available_qty ?? 0),
-          min_stock_level: Number(r.min_stock_level ?? 0),
-          is_low: lowSet.has(r.sku_code),
-        }))
-      );
+      const nextLowSet = new Set(low.map((x) => x.sku_code));
+
+      setLowSet(nextLowSet);
+      setRows(toRows(invRes.data, nextLowSet));
+      setCursor(invRes.headers["x-next-cursor"] || null);
     } catch (e) {
       console.error(e);
       setErr("Failed to load inventory.");
       setRows([]);
+      setCursor(null);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const loadMore = async () => {
+    try {
+      setLoading(true);
+      const res = await getPage(cursor);
+      setRows((prev) => [...prev, ...toRows(res.data, lowSet)]);
+      setCursor(res.headers["x-next-cursor"] || null);
+    } catch (e) {
+      console.error(e);
+      setErr("Failed to load more inventory.");
     } finally {
       setLoading(false);
     }
@@ -44,10 +69,8 @@ export default function InventoryPage() {
     load();
   }, []);
 
-  const lowCount = useMemo(
-    () => rows.filter((x) => x.is_low).length,
-    [rows]
-  );
+  // from the low-stock set, not the loaded rows: those are only the pages seen so far
+  const lowCount = lowSet.size;
 
   return (
     <div className="rf-page" style={{ minHeight: "100vh" }}>
@@ -140,6 +163,18 @@ export default function InventoryPage() {
             </tbody>
           </table>
         </div>
+
+        {cursor && (
+          <button
+            type="button"
+            className="rf-text-button"
+            style={{ marginTop: 10 }}
+            onClick={loadMore}
+            disabled={loading}
+          >
+            Load more SKUs
+          </button>
+        )}
       </div>
     </div>
   );
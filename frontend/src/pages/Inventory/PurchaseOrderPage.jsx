@@ -3,6 +3,7 @@ import axios from "axios";
 
 /* ===================== API ===================== */
 const API_BASE = "http://127.0.0.1:8000/api";
+const PO_PAGE_SIZE = 100;
 
 /* ===================== Retailer (shared) ===================== */
 const INITIAL_RETAILER = {
@@ -22,6 +23,7 @@ export default function PurchaseOrderPage() {
   const [items, setItems] = useState([]);
   const [hsnList, setHsnList] = useState([]);
   const [poList, setPoList] = useState([]);
+  const [poCursor, setPoCursor] = useState(null); // next page, from X-Next-Cursor
 
   const [saving, setSaving] = useState(false);
   const [message, setMessage] = useState("");
@@ -70,13 +72,16 @@ export default function PurchaseOrderPage() {
           axios.get(`${API_BASE}/vendors`),
           axios.get(`${API_BASE}/items`),
           axios.get(`${API_BASE}/hsn`),
-          axios.get(`${API_BASE}/purchase-orders`).catch(() => ({ data: [] })),
+          axios
+            .get(`${API_BASE}/purchase-orders`, { params: { limit: PO_PAGE_SIZE } })
+            .catch(() => ({ data: [], headers: {} })),
         ]);
 
         setVendors(vendorsRes.data || []);
         setItems(itemsRes.data || []);
         setHsnList(hsnRes.data || []);
         setPoList(poRes.data || []);
+        setPoCursor(poRes.headers["x-next-cursor"] || null);
       } catch (err) {
         console.error("Failed to load PO masters", err);
       }
@@ -212,7 +217,7 @@ export default function PurchaseOrderPage() {
       };
 
       const res = await axios.post(`${API_BASE}/purchase-orders`, payload);
-      setPoList((prev) => [...prev, res.data]);
+      setPoList((prev) => [res.data, ...prev]); // list is newest first
       setMessage("PO saved successfully.");
     } catch (err) {
       console.error("Failed to save PO", err);
@@ -222,6 +227,18 @@ export default function PurchaseOrderPage() {
     }
   };
 
+  const loadMorePOs = async () => {
+    try {
+      const res = await axios.get(`${API_BASE}/purchase-orders`, {
+        params: { limit: PO_PAGE_SIZE, cursor: poCursor },
+      });
+      setPoList((prev) => [...prev, ...(res.data || [])]);
+      setPoCursor(res.headers["x-next-cursor"] || null);
+    } catch (err) {
+      console.error("Failed to load more POs", err);
+    }
+  };
+
   const handlePrint = () => window.print();
 
     /* ===================== PO LIST HELPERS ===================== */
@@ -588,6 +605,17 @@ export default function PurchaseOrderPage() {
                 </tbody>
               </table>
             </div>
+
+            {poCursor && (
+              <button
+                type="button"
+                className="rf-text-button"
+                style={{ marginTop: 10 }}
+                onClick={loadMorePOs}
+              >
+                Load more POs
+              </button>
+            )}
           </div>
         )}
       </div>
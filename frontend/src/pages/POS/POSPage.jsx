@@ -3,6 +3,7 @@ import { useEffect, useMemo, useState } from "react";
 import axios from "axios";
 
 const API_BASE = "http://127.0.0.1:8000/api";
+const SALES_PAGE_SIZE = 100;
 
 export default function POSPage() {
   const [hsnRates, setHsnRates] = useState([]); // from backend
@@ -28,6 +29,7 @@ export default function POSPage() {
 
   const [lines, setLines] = useState([makeEmptyLine()]);
   const [invoices, setInvoices] = useState([]); // from backend
+  const [salesCursor, setSalesCursor] = useState(null); // next page, from X-Next-Cursor
   const [msg, setMsg] = useState("");
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
@@ -69,11 +71,14 @@ export default function POSPage() {
     );
   };
 
-  const loadSales = async () => {
-    const res = await axios.get(`${API_BASE}/sales`);
+  // newest bills first, one page at a time; pass the cursor to append the next page
+  const loadSales = async (cursor = null) => {
+    const res = await axios.get(`${API_BASE}/sales`, {
+      params: { limit: SALES_PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
     const data = res.data || [];
-    setInvoices(
-      data.map((s) => ({
+    setSalesCursor(res.headers["x-next-cursor"] || null);
+    const page = data.map((s) => ({
         id: s.id,
         billNumber: s.bill_number,
         billDate: s.sale_date,
@@ -84,11 +89,11 @@ export default function POSPage() {
         tax: Number(s.tax_total || 0),
         grandTotal: Number(s.grand_total || 0),
         lineCount: (s.lines || []).length,
-      }))
-    );
+      }));
+    setInvoices((prev) => (cursor ? [...prev, ...page] : page));
 
     // Keep Bill No UX: set next bill based on last saved
-    if (data.length > 0) {
+    if (!cursor && data.length > 0) {
       const last = data[0]?.bill_number;
       if (last) setBillNumber(getNextBillNumber(last));
     }
@@ -121,10 +126,12 @@ export default function POSPage() {
     const rate = Number(line.rate) || 0;
     const base = qty * rate;
 
-    const { cgst, sgst, igst } = getHsnRates(line.hsnCode);
+    // counter sales are intra-state (CGST + SGST), as the server prices them
+    const { cgst, sgst } = getHsnRates(line.hsnCode);
+    const igst = 0;
     const cgstAmt = (base * (Number(cgst) || 0)) / 100;
     const sgstAmt = (base * (Number(sgst) || 0)) / 100;
-    const igstAmt = (base * (Number(igst) || 0)) / 100;
+    const igstAmt = 0;
 
     const tax = cgstAmt + sgstAmt + igstAmt;
     const total = base + tax;
@@ -521,6 +528,16 @@ export default function POSPage() {
             </tbody>
           </table>
         </div>
+        {salesCursor && (
+          <button
+            type="button"
+            className="rf-text-button"
+            style={{ marginTop: 10 }}
+            onClick={() => loadSales(salesCursor)}
+          >
+            Load more bills
+          </button>
+        )}
       </div>
     </div>
   );